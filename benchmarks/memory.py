@@ -0,0 +1,80 @@
+"""
+Compare the memory used by buffered documents with the default (`__dict__`) and the `Meta.slots` layouts
+
+Usage: python -m benchmarks.memory [--documents N]
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Optional, Type
+
+from pylastic.indexes import ElasticIndex
+from pylastic.types import Date, Keyword
+
+
+class DictLogEvent(ElasticIndex):
+    timestamp: Date
+    level: Keyword()
+    service: Keyword()
+    message: str
+    duration_ms: Optional[int] = None
+
+    class Meta:
+        index = "logs"
+
+
+class SlotsLogEvent(ElasticIndex):
+    timestamp: Date
+    level: Keyword()
+    service: Keyword()
+    message: str
+    duration_ms: Optional[int] = None
+
+    class Meta:
+        index = "logs"
+        slots = True
+
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+SERVICES = ("api", "worker", "scheduler")
+
+
+def measure(index_class: Type[ElasticIndex], documents: int) -> int:
+    """
+    Create documents and return the number of bytes allocated to keep them
+    """
+    gc.collect()
+    tracemalloc.start()
+    buffer = [
+        index_class(
+            timestamp=1_700_000_000_000 + i,
+            level=LEVELS[i % 4],
+            service=SERVICES[i % 3],
+            message="request handled",
+            duration_ms=i % 1000,
+        )
+        for i in range(documents)
+    ]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del buffer
+    return allocated
+
+
+def main(documents: int) -> None:
+    results = {
+        layout: measure(index_class, documents)
+        for layout, index_class in (("dict", DictLogEvent), ("slots", SlotsLogEvent))
+    }
+    for layout, allocated in results.items():
+        print(
+            f"{layout:>6}: {allocated / 1024 / 1024:8.2f} MB total, "
+            f"{allocated / documents:6.1f} B per document"
+        )
+    print(f" saved: {1 - results['slots'] / results['dict']:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    main(parser.parse_args().documents)
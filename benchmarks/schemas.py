@@ -0,0 +1,134 @@
+"""
+Synthetic `ElasticIndex` schemas and deterministic document generators
+"""
+import random
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from pylastic.indexes import ElasticIndex
+from pylastic.types import Date, GeoPoint, Keyword, Long, Text
+from pylastic.types.geo_shape import Geoshape
+
+WIDE_FIELDS = 20  # Number of fields of every type in `WideDocument`
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+SERVICES = ("api", "worker", "scheduler", "gateway")
+WORDS = ("request", "handled", "user", "cache", "miss", "timeout", "retry", "query", "index", "shard")
+START = 1_700_000_000_000
+
+
+class LogEvent(ElasticIndex):
+    """
+    Small document: a typical structured log line
+    """
+
+    timestamp: Date
+    level: Keyword()
+    service: Keyword()
+    message: str
+    duration_ms: Optional[int] = None
+
+    class Meta:
+        index = "bench-logs"
+
+
+# Many fields of every type, e.g. a flattened analytics event
+WideDocument: Type[ElasticIndex] = type(ElasticIndex)(
+    "WideDocument",
+    (ElasticIndex,),
+    {
+        "__annotations__": {
+            **{f"keyword_{i}": Keyword() for i in range(WIDE_FIELDS)},
+            **{f"text_{i}": Text for i in range(WIDE_FIELDS)},
+            **{f"long_{i}": Long for i in range(WIDE_FIELDS)},
+            **{f"float_{i}": float for i in range(WIDE_FIELDS)},
+            **{f"flag_{i}": bool for i in range(WIDE_FIELDS)},
+        },
+        "Meta": type("Meta", (), {"index": "bench-wide"}),
+    },
+)
+
+
+class GeoDocument(ElasticIndex):
+    """
+    Geo-heavy document: points in every supported format and a polygon
+    """
+
+    name: Keyword()
+    location: GeoPoint
+    pickup: GeoPoint
+    dropoff: GeoPoint
+    waypoint: GeoPoint
+    area: Geoshape
+
+    class Meta:
+        index = "bench-geo"
+
+
+def get_sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def get_coordinates(rng: random.Random) -> Tuple[float, float]:
+    return round(rng.uniform(-90, 90), 6), round(rng.uniform(-180, 180), 6)
+
+
+def generate_logs(count: int, seed: int) -> List[ElasticIndex]:
+    rng = random.Random(seed)
+    return [
+        LogEvent(
+            timestamp=START + i,
+            level=rng.choice(LEVELS),
+            service=rng.choice(SERVICES),
+            message=get_sentence(rng, 6),
+            duration_ms=rng.randrange(1000),
+        )
+        for i in range(count)
+    ]
+
+
+def generate_wide(count: int, seed: int) -> List[ElasticIndex]:
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        values = {}
+        for i in range(WIDE_FIELDS):
+            values[f"keyword_{i}"] = rng.choice(SERVICES)
+            values[f"text_{i}"] = get_sentence(rng, 4)
+            values[f"long_{i}"] = rng.randrange(1 << 40)
+            values[f"float_{i}"] = rng.random()
+            values[f"flag_{i}"] = rng.random() < 0.5
+        documents.append(WideDocument(**values))
+    return documents
+
+
+def generate_geo(count: int, seed: int) -> List[ElasticIndex]:
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        lat, lon = get_coordinates(rng)
+        pickup_lat, pickup_lon = get_coordinates(rng)
+        dropoff_lat, dropoff_lon = get_coordinates(rng)
+        waypoint_lat, waypoint_lon = get_coordinates(rng)
+        documents.append(
+            GeoDocument(
+                name=f"trip-{i}",
+                location={"lat": lat, "lon": lon},
+                pickup=[pickup_lon, pickup_lat],
+                dropoff=f"POINT ({dropoff_lon} {dropoff_lat})",
+                waypoint=f"{waypoint_lat},{waypoint_lon}",
+                area={
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[lon, lat], [lon + 0.01, lat], [lon + 0.01, lat + 0.01], [lon, lat + 0.01], [lon, lat]]
+                    ],
+                },
+            )
+        )
+    return documents
+
+
+# <name>: (<class>, <generator of `count` documents from a seed>)
+SCHEMAS: Dict[str, Tuple[Type[ElasticIndex], Callable[[int, int], List[ElasticIndex]]]] = {
+    "logs": (LogEvent, generate_logs),
+    "wide": (WideDocument, generate_wide),
+    "geo": (GeoDocument, generate_geo),
+}
@@ -0,0 +1,239 @@
+"""
+Benchmark the serialization and ingest hot paths on synthetic schemas. Every stage reports its throughput (best of
+`--repeat` runs) and peak memory (measured with `tracemalloc` in a separate run, since tracing slows code down).
+`save` runs end-to-end against `StubNode`, so no cluster is needed.
+
+Usage: python -m benchmarks [--documents N] [--repeat N] [--schemas logs,wide,geo] [--stages validate,save]
+                            [--output results.json] [--compare previous.json] [--threshold 0.2]
+
+With `--compare`, results are compared to a previous `--output` file, and the exit code is 1 if the throughput of
+any stage dropped (or its peak memory grew) by more than `--threshold`
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+from benchmarks.schemas import SCHEMAS
+from benchmarks.transport import get_stub_client
+from pylastic.bulk import BulkEncoder, route_encoded_batches
+from pylastic.indexes import ElasticIndex
+from pylastic.serialization import get_serializer
+from pylastic.utils.iterables import get_batches_with_size
+
+BATCH_DOCUMENTS = 1_000  # Documents per `get_batch_create_request` call
+MAX_BATCH_SIZE = 10 * 1024 * 1024
+MAPPING_CALLS = 1_000
+MIN_PEAK_MEMORY = 64 * 1024  # Peak memory (in bytes) below which memory changes are ignored
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A benchmarked operation. `run` returns the number of processed operations (in `unit`s)
+    """
+
+    name: str
+    run: Callable[[Type[ElasticIndex], List[ElasticIndex]], int]
+    unit: str = "documents"
+
+
+def run_get_mapping(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    for _ in range(MAPPING_CALLS):
+        index_class.get_mapping()
+    return MAPPING_CALLS
+
+
+def run_validate(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    for document in documents:
+        document.validate()
+    return len(documents)
+
+
+def run_get_batch_create_request(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    encoder = BulkEncoder()
+    for start in range(0, len(documents), BATCH_DOCUMENTS):
+        ElasticIndex.get_batch_create_request(documents[start : start + BATCH_DOCUMENTS], encoder)
+    return len(documents)
+
+
+def run_get_batches_with_size(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    get_batches_with_size(documents, MAX_BATCH_SIZE)
+    return len(documents)
+
+
+def run_route_encoded_batches(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    for _ in route_encoded_batches(documents, MAX_BATCH_SIZE):
+        pass
+    return len(documents)
+
+
+def run_save(index_class: Type[ElasticIndex], documents: List[ElasticIndex]) -> int:
+    report = get_stub_client().save(documents)
+    if report.failed:
+        raise RuntimeError(f"{report.failed} documents failed to save")
+    return len(documents)
+
+
+STAGES = {
+    stage.name: stage
+    for stage in (
+        Stage("get_mapping", run_get_mapping, unit="calls"),
+        Stage("validate", run_validate),
+        Stage("get_batch_create_request", run_get_batch_create_request),
+        Stage("get_batches_with_size", run_get_batches_with_size),
+        Stage("route_encoded_batches", run_route_encoded_batches),
+        Stage("save", run_save),
+    )
+}
+
+
+def measure(stage: Stage, index_class: Type[ElasticIndex], documents: List[ElasticIndex], repeat: int) -> Dict[str, Any]:
+    """
+    Run a stage once under `tracemalloc` for the peak memory (which also warms up caches),
+    then `repeat` times for timing
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage.run(index_class, documents)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    operations = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        operations = stage.run(index_class, documents)
+        timings.append(time.perf_counter() - started)
+
+    seconds = min(timings)
+    return {
+        "operations": operations,
+        "unit": stage.unit,
+        "seconds": seconds,
+        "per_second": operations / seconds if seconds else None,
+        "peak_memory": peak,
+    }
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(schemas: Sequence[str], stages: Sequence[str], documents: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """
+    Run the benchmarks
+
+    :return: JSON-serializable results: `{"meta": {...}, "results": {<schema>: {<stage>: {...}}}}`
+    """
+    results = {}
+    for schema in schemas:
+        index_class, generate = SCHEMAS[schema]
+        generated = generate(documents, seed)
+        results[schema] = {}
+        for name in stages:
+            results[schema][name] = result = measure(STAGES[name], index_class, generated, repeat)
+            print(format_result(schema, name, result), flush=True)
+
+    return {
+        "meta": {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "serializer": get_serializer(None).__class__.__name__,
+            "documents": documents,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def format_result(schema: str, stage: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{schema:>6} {stage:<26} {result['per_second']:>14,.0f} {result['unit']}/s "
+        f"{result['peak_memory'] / 1024 / 1024:>9.2f} MB peak"
+    )
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare results with previous ones. Stages missing from either are skipped
+
+    :param threshold: Max allowed relative drop of the throughput and growth of the peak memory, e.g. 0.2 for 20%
+    :return: Descriptions of the regressions
+    """
+    regressions = []
+    print(f"\nCompared to {previous['meta'].get('commit') or 'previous results'}:")
+    for schema, stages in current["results"].items():
+        for stage, result in stages.items():
+            before = previous["results"].get(schema, {}).get(stage)
+            if before is None or not before["per_second"] or not result["per_second"]:
+                continue
+
+            speed = result["per_second"] / before["per_second"]
+            # Stages that allocate next to nothing can't regress meaningfully
+            memory = max(result["peak_memory"], MIN_PEAK_MEMORY) / max(before["peak_memory"], MIN_PEAK_MEMORY)
+            flags = []
+            if speed < 1 - threshold:
+                flags.append("slower")
+            if memory > 1 + threshold:
+                flags.append("more memory")
+            print(f"{schema:>6} {stage:<26} speed {speed:>6.2f}x  memory {memory:>6.2f}x  {', '.join(flags)}".rstrip())
+            if flags:
+                regressions.append(f"{schema}/{stage}: {', '.join(flags)}")
+
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20_000, help="Documents per schema")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage, the best one is reported")
+    parser.add_argument("--schemas", default=",".join(SCHEMAS), help="Comma-separated schemas")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the document generators")
+    parser.add_argument("--output", help="Path to write the results to (JSON)")
+    parser.add_argument("--compare", help="Path to previous results (JSON) to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    schemas = [schema for schema in args.schemas.split(",") if schema]
+    stages = [stage for stage in args.stages.split(",") if stage]
+    for name, known in (("schema", SCHEMAS), ("stage", STAGES)):
+        unknown = [value for value in (schemas if name == "schema" else stages) if value not in known]
+        if unknown:
+            parser.error(f"Unknown {name}(s): {', '.join(unknown)}. Expected: {', '.join(known)}")
+
+    # Read before running, so that a missing file doesn't waste a run
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+
+    results = run(schemas, stages, args.documents, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if previous is not None:
+        regressions = compare(results, previous, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {'; '.join(regressions)}", file=sys.stderr)
+            return 1
+
+    return 0
@@ -0,0 +1,54 @@
+"""
+Offline transport: an `elastic_transport` node that answers requests without a cluster, so that `ElasticClient`
+can be benchmarked end-to-end (serialization, compression and response parsing included)
+"""
+import gzip
+import json
+from typing import Optional
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+
+from pylastic.client import ElasticClient
+
+RESPONSE_HEADERS = {"content-type": "application/json", "x-elastic-product": "Elasticsearch"}
+
+
+class StubNode(BaseNode):
+    """
+    Node that acknowledges every request. `_bulk` requests get an item per document, like a real cluster would send
+    with `filter_path`
+    """
+
+    _CLIENT_META_HTTP_CLIENT = ("stub", "0.0")
+
+    def perform_request(self, method: str, target: str, body: Optional[bytes] = None, headers=None, request_timeout=None):
+        path = target.split("?", 1)[0]
+        if path == "/_bulk":
+            if headers is not None and headers.get("content-encoding") == "gzip":
+                body = gzip.decompress(body)
+            # Every document takes two lines: the action and the source
+            documents = body.count(b"\n") // 2 if body else 0
+            response = {"took": 1, "errors": False, "items": [{"index": {"status": 201}}] * documents}
+        elif path.endswith("/_refresh"):
+            response = {"_shards": {"total": 1, "successful": 1, "failed": 0}}
+        else:
+            response = {"acknowledged": True}
+
+        data = json.dumps(response).encode()
+        meta = ApiResponseMeta(
+            status=200,
+            http_version="1.1",
+            headers=HttpHeaders({**RESPONSE_HEADERS, "content-length": str(len(data))}),
+            duration=0.0,
+            node=self.config,
+        )
+        return meta, data
+
+
+def get_stub_client(**kwargs) -> ElasticClient:
+    """
+    Create a client whose requests are answered by `StubNode`
+    """
+    return ElasticClient(
+        host="localhost", port=9200, username="elastic", password="", scheme="http", node_class=StubNode, **kwargs
+    )
@@ -0,0 +1,402 @@
+import asyncio
+from typing import Optional, List, Type, Sequence, Iterable
+
+from elasticsearch import AsyncElasticsearch, BadRequestError
+from elasticsearch.exceptions import ApiError
+from elastic_transport._response import ApiResponse  # noqa
+
+from pylastic.bulk import (
+    BulkBatch,
+    BulkEncoder,
+    BulkReport,
+    get_refresh_policy,
+    parse_bulk_response,
+    route_encoded_batches,
+)
+from pylastic.client import get_hosts, get_target_index, get_unique_indexes
+from pylastic.indexes import ElasticIndex
+from pylastic.request_template import RequestTemplate
+from pylastic.search import SearchResult
+from pylastic.search.results import get_search_kwargs
+from pylastic.serialization import JSONSerializer, get_serializer, get_transport_serializers
+from pylastic.utils.backoff import get_backoff_delay
+from pylastic.utils.cache import KnownIndexes
+from pylastic.utils.iterables import is_iterable, join_within_length
+
+
+class AsyncElasticClient:
+    """
+    Asynchronous ElasticSearch Client.
+
+    Mirrors `ElasticClient`, but is built on `AsyncElasticsearch`, so every method is a coroutine.
+    Requires the `elasticsearch[async]` extra.
+    """
+
+    es_client: AsyncElasticsearch
+
+    def __init__(
+        self,
+        host: str | List[str],
+        port: int,
+        username: str,
+        password: str,
+        scheme: str = "https",
+        connections_per_node: int = None,
+        serializer: Optional[JSONSerializer | str] = None,
+        known_index_ttl: Optional[float] = 300,
+        **kwargs,
+    ):
+        """
+        Instantiate asynchronous ElasticSearch client
+
+        :param host: ES Host
+        :param port: ES Port
+        :param username: ES Username to use (Basic Auth)
+        :param password: ES Password to use (BasicAuth)
+        :param scheme: HTTP/HTTPS
+        :param connections_per_node: Number of connections per node
+        :param serializer: JSON serializer (or its name: `json`, `orjson`) used for every request body.
+         Defaults to the fastest installed one
+        :param known_index_ttl: How long (in seconds) an index created or found by this client is assumed to exist,
+         so that `create_index_for` (and `save`) don't try to create it again. Forever if `None`
+        """
+        self.serializer = get_serializer(serializer)
+        self.known_indexes = KnownIndexes(ttl=known_index_ttl)
+        kwargs.setdefault("serializers", get_transport_serializers(self.serializer))
+        if connections_per_node is not None:
+            kwargs["connections_per_node"] = connections_per_node
+
+        self.es_client = AsyncElasticsearch(
+            hosts=get_hosts(host, port, scheme),
+            basic_auth=(username, password),
+            **kwargs,
+        )
+
+    async def close(self) -> None:
+        await self.es_client.close()
+
+    async def __aenter__(self) -> "AsyncElasticClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def create_index(
+        self, index: Type[ElasticIndex], index_name: Optional[str] = None, exists_ok: bool = False
+    ) -> bool:
+        """
+        Create an Elasticsearch index from a `ElasticIndex` subclass (**not an instance**).
+
+        For data stream classes (`Meta.is_datastream`), the index template is created or updated first, and then the data stream is created.
+
+        :param index: `ElasticIndex` subclass. Class **must** have `Meta.index` set or `index_name` argument must be specified.
+        :param index_name: Custom index name to use
+        :param exists_ok: Whether to suppress `resource_already_exists_exception` error
+        :return: Whether the index was successfully created in the cluster
+        """
+        if (
+            not hasattr(index, "get_static_index")
+            or not index.get_static_index()
+            and index_name is None
+        ):
+            raise RuntimeError(
+                f"Unable to create an elastic index with dynamic definition from a class. "
+                f"Pass a class instance"
+            )
+
+        index_name = index_name or index.get_static_index()
+        if index._get_meta_attribute("is_datastream", False):
+            # The template must exist before the data stream is created
+            await self.execute(index.get_index_template_request())
+
+        try:
+            response = await self.execute(index.get_static_index_creation_request(index_name))
+            self.known_indexes.add(index_name)
+            return response["acknowledged"]
+
+        except BadRequestError as bad_request:
+            if bad_request.error == 'resource_already_exists_exception':
+                self.known_indexes.add(index_name)
+                if exists_ok:
+                    return True
+
+            raise
+
+    async def execute(self, template: RequestTemplate):
+        """
+        Execute a request
+
+        :param template: Request template to execute.
+        """
+        response: ApiResponse = await self.es_client.perform_request(**template.to_kwargs())
+
+        return response
+
+    async def create_index_for(
+        self,
+        objects: ElasticIndex | Sequence[ElasticIndex],
+        ignore_400: bool = True,
+        concurrency: int = 4,
+    ) -> List[str]:
+        """
+        Create the indexes the objects belong to. Indexes that are known to exist (see `known_index_ttl`) are skipped,
+        and the rest are created concurrently
+
+        :param objects: `ElasticIndex` subclass instance(s)
+        :param ignore_400: Whether to suppress `BadRequestError` (e.g. an invalid mapping).
+         Indexes that already exist are never an error
+        :param concurrency: Max number of creation requests sent at once
+        :return: Names of all indexes the objects belong to
+        """
+        if not is_iterable(objects):
+            objects = [objects]
+
+        unique_indexes = get_unique_indexes(objects)
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def _create(index: str) -> None:
+            async with semaphore:
+                try:
+                    await self.create_index(unique_indexes[index], index_name=index, exists_ok=True)
+                except BadRequestError:
+                    if not ignore_400:
+                        raise
+
+        await asyncio.gather(
+            *(_create(index) for index in unique_indexes if index not in self.known_indexes)
+        )
+        return list(unique_indexes)
+
+    async def refresh_index(
+        self,
+        index: ElasticIndex | str | Sequence[ElasticIndex] | Sequence[str],
+        max_path_length: int = 4_000,
+    ) -> bool:
+        """
+        Refresh index. Index names are merged into as few requests as possible, see `ElasticClient.refresh_index`
+
+        :param index: Index to refresh
+        :param max_path_length: Max length of the request path
+        :return: Whether the operation was successful. If multiple indexes are specified,
+        `True` will be returned only if every operation finished successfully
+        """
+
+        async def _refresh(index_name):
+            response = await self.execute(ElasticIndex.get_index_refresh_template(index_name))
+            return not bool(response["_shards"]["failed"])
+
+        if not is_iterable(index):
+            index = [index]
+
+        targets = join_within_length(
+            map(get_target_index, index),
+            max_path_length - len("//_refresh"),
+        )
+        results = await asyncio.gather(*[_refresh(target) for target in targets])
+        return all(results)
+
+    async def save(
+        self,
+        objects: ElasticIndex | Iterable[ElasticIndex],
+        create_indexes: bool = True,
+        max_request_size: int = 99,
+        refresh_after: bool = False,
+        refresh: bool | str = False,
+        max_batch_documents: Optional[int] = None,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+    ) -> BulkReport:
+        """
+        Save one or more `ElasticIndex` subclass objects.
+        `objects` is consumed lazily (in a worker thread, along with encoding), see `ElasticClient.save`
+
+        :param objects: A single instance or an iterable of instances of classes, inherited from `ElasticIndex`
+        :param create_indexes: Whether to create indexes if they don't exist
+        :param max_request_size: Max request size in MB. Note that Elastic limits the max request size to 100MB.
+        :param refresh_after: Whether to run a manual refresh after the saving completes
+        :param refresh: Refresh policy passed to every `_bulk` request: `False`, `"wait_for"` or `True`.
+         Unlike `refresh_after`, no separate requests are sent. See the README for the throughput cost of each policy
+        :param max_batch_documents: Max number of documents in a single request. Unlimited if `None`
+        :param concurrency: Max number of bulk requests in flight. The next batch is only taken once there's a free slot,
+         so at most `concurrency` full batches are held in memory
+        :param max_retries: How many times documents rejected by an overloaded cluster are re-sent
+        :param initial_backoff: Max delay (in seconds) before the first retry
+        :param max_backoff: Max delay between retries in seconds
+        :return: Report with the number of saved documents and the documents that could not be saved
+        """
+        if not is_iterable(objects):
+            objects = [objects]
+
+        refresh = get_refresh_policy(refresh)
+        batches = route_encoded_batches(
+            objects,
+            max_request_size * 1024 * 1024,
+            max_documents=max_batch_documents,
+            encoder=BulkEncoder(serializer=self.serializer),
+        )
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        tasks = set()
+        errors = []
+        indexes = set()
+        report = BulkReport()
+
+        async def _send(batch: BulkBatch):
+            try:
+                report.update(
+                    await self.send_batch(batch, max_retries, initial_backoff, max_backoff, refresh)
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                semaphore.release()
+
+        while True:
+            await semaphore.acquire()
+            # Documents are encoded in a worker thread, so that the event loop isn't blocked while a batch is built
+            batch = None if errors else await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                semaphore.release()
+                break
+
+            if batch.index not in indexes:
+                if create_indexes:
+                    await self.create_index_for(batch.documents[:1], ignore_400=True)
+                indexes.add(batch.index)
+
+            task = asyncio.create_task(_send(batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
+
+        if refresh_after and indexes:
+            await self.refresh_index(list(indexes))
+
+        return report
+
+    async def send_batch(
+        self,
+        batch: BulkBatch,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+        refresh: Optional[str] = None,
+    ) -> BulkReport:
+        """
+        Send a batch, re-sending the documents that were rejected because the cluster is overloaded
+
+        :param batch: Batch to send
+        :param max_retries: How many times rejected documents are re-sent, see `save`
+        :param initial_backoff: Max delay (in seconds) before the first retry
+        :param max_backoff: Max delay between retries in seconds
+        :param refresh: Value of the `refresh` parameter, see `get_refresh_policy`
+        :return: Report of the batch's documents
+        """
+        report = BulkReport()
+        for attempt in range(max_retries + 1):
+            try:
+                response = await self.execute(batch.get_request(refresh=refresh))
+            except ApiError as api_error:
+                if api_error.status_code != 429 or attempt == max_retries:
+                    raise
+                retryable = batch
+            else:
+                succeeded, failures = parse_bulk_response(batch, response.body)
+                report.succeeded += succeeded
+
+                if attempt == max_retries:
+                    report.failures.extend(failures)
+                    break
+
+                report.failures.extend(f for f in failures if not f.retryable)
+                retryable = batch.subset(f.position for f in failures if f.retryable)
+
+            if not retryable:
+                break
+
+            report.retried += len(retryable)
+            batch = retryable
+            await asyncio.sleep(get_backoff_delay(attempt, initial_backoff, max_backoff))
+
+        return report
+
+    async def clear(self, index: Type[ElasticIndex], ignore_error_codes: Optional[List] = None) -> None:
+        """
+        Clear an index. Partitioned classes are cleared like in `ElasticClient.clear`
+
+        :param index: `ElasticIndex` subclass or instance
+        :param ignore_error_codes: List of HTTP error codes to ignore
+        """
+        if isinstance(index, ElasticIndex):
+            index_name = index.get_index()
+        elif index._get_meta_attribute("partitioning") is not None:
+            return await self._clear_partitions(index, ignore_error_codes)
+        else:
+            index_name = index.get_static_index()
+
+        if index._get_meta_attribute("is_datastream", False):
+            deletion_request = ElasticIndex.get_datastream_deletion_request(index_name)
+        else:
+            deletion_request = ElasticIndex.get_index_deletion_request(index_name)
+
+        try:
+            await self.execute(deletion_request)
+        except ApiError as api_error:
+            if ignore_error_codes and api_error.status_code not in ignore_error_codes:
+                raise api_error
+        finally:
+            self.known_indexes.discard(index_name)
+
+        await self.create_index(index, index_name=index_name, exists_ok=True)
+
+    async def _clear_partitions(self, index: Type[ElasticIndex], ignore_error_codes: Optional[List] = None) -> None:
+        pattern = index.get_index_pattern()
+        response = await self.execute(ElasticIndex.get_index_resolution_request(pattern))
+        names = [entry["name"] for entry in response["indices"]]
+        try:
+            for target in join_within_length(names, 4_000 - len("/")):
+                try:
+                    await self.execute(ElasticIndex.get_index_deletion_request(target))
+                except ApiError as api_error:
+                    if ignore_error_codes and api_error.status_code not in ignore_error_codes:
+                        raise api_error
+        finally:
+            self.known_indexes.discard_matching(pattern)
+
+    async def search(
+        self,
+        index: str | Type[ElasticIndex],
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        **kwargs,
+    ):
+        """
+        Perform search.
+
+        :param index: Index(es) to search or an `ElasticIndex` subclass (see `ElasticClient.search`)
+        :param index_name: Index(es) to search if `index` is a class without `Meta.index`
+        :param source_fields: Fields to fetch if `index` is a class. Defaults to all declared fields
+        :param kwargs: Additional kwargs accepted by the `AsyncElasticsearch` `.search()` method
+        :return: `SearchResult` if `index` is a class, raw response body otherwise
+        """
+        if isinstance(index, str):
+            return (await self.es_client.search(index=index, **kwargs)).body
+
+        response = await self.es_client.search(
+            **get_search_kwargs(index, index_name, source_fields, **kwargs)
+        )
+        return SearchResult(index, response.body)
+
+    async def count(self, index: str, **kwargs):
+        """
+        Count the number of documents matching a query
+
+        :param index: Index(es) to count documents in
+        :param kwargs: Additional kwargs accepted by the `AsyncElasticsearch` `.count()` method
+        """
+        return (await self.es_client.count(index=index, **kwargs)).body
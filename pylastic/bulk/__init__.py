@@ -0,0 +1,5 @@
+from .encoder import BulkEncoder
+from .batch import BatchRouter, BulkBatch, get_refresh_policy, route_encoded_batches
+from .response import BulkItemFailure, BulkReport, parse_bulk_response
+from .columns import get_column_batches, prepare_columns, to_list, validate_columns
+from .indexer import BulkIndexer
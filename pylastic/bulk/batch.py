@@ -0,0 +1,172 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from pylastic.bulk.encoder import BulkEncoder
+from pylastic.bulk.response import BULK_FILTER_PATH
+from pylastic.request_template import RequestTemplate
+
+REFRESH_POLICIES = {False: None, "false": None, True: "true", "true": "true", "wait_for": "wait_for"}
+
+
+def get_refresh_policy(refresh: Union[bool, str, None]) -> Optional[str]:
+    """
+    Get the value of the `refresh` parameter of `_bulk`
+    https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-refresh.html
+
+    :param refresh: `False`/`"false"`/`None` (don't refresh), `"wait_for"` (wait for the next scheduled refresh)
+     or `True`/`"true"` (refresh the affected shards immediately)
+    :return: Parameter value or `None` if it shouldn't be sent
+    """
+    if refresh is None:
+        return None
+    try:
+        return REFRESH_POLICIES[refresh]
+    except (KeyError, TypeError):
+        raise ValueError(
+            f'Unknown refresh policy {refresh!r}, expected one of: false, "wait_for", true'
+        ) from None
+
+
+@dataclass
+class BulkBatch:
+    """
+    A batch of documents along with their encoded NDJSON. Every document is encoded once,
+    and the bytes are reused to build the request.
+    """
+
+    index: Optional[str] = None
+    documents: List["ElasticIndex"] = field(default_factory=list)
+    chunks: List[bytes] = field(default_factory=list)
+    nbytes: int = 0
+
+    def add(self, document: "ElasticIndex", chunk: bytes) -> None:
+        self.documents.append(document)
+        self.chunks.append(chunk)
+        self.nbytes += len(chunk)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def subset(self, positions: Iterable[int]) -> "BulkBatch":
+        """
+        Get a batch with documents at the given positions. Encoded documents are reused
+        """
+        batch = BulkBatch(index=self.index)
+        for position in positions:
+            batch.add(self.documents[position], self.chunks[position])
+        return batch
+
+    def get_body(self) -> bytes:
+        return b"".join(self.chunks)
+
+    def get_request(self, refresh: Optional[str] = None) -> RequestTemplate:
+        """
+        Build a `_bulk` request from the encoded documents
+
+        :param refresh: Value of the `refresh` parameter, see `get_refresh_policy`
+        """
+        query_params = {"filter_path": BULK_FILTER_PATH}
+        if refresh is not None:
+            query_params["refresh"] = refresh
+
+        return RequestTemplate(
+            method="POST",
+            path="/_bulk",
+            query_params=query_params,
+            body=self.get_body(),
+            headers={"content-type": "application/x-ndjson"},
+            index=self.index,
+            documents=len(self),
+        )
+
+
+class BatchRouter:
+    """
+    Routes encoded documents to per-index batches. A batch is handed out as soon as it's full, and while the open batches
+    together hold more than `max_buffered_bytes`, the largest one is handed out early. So the buffered memory is bounded
+    no matter how many indexes (e.g. partitions) documents go to
+    """
+
+    def __init__(
+        self,
+        max_size_bytes: int,
+        max_documents: Optional[int] = None,
+        max_buffered_bytes: Optional[int] = None,
+    ):
+        """
+        :param max_size_bytes: Max body size of a batch in bytes
+        :param max_documents: Max number of documents in a batch. Unlimited if `None`
+        :param max_buffered_bytes: Max total size of the open batches in bytes. Defaults to `max_size_bytes`
+        """
+        self.max_size_bytes = max_size_bytes
+        self.max_documents = max_documents
+        self.max_buffered_bytes = max_size_bytes if max_buffered_bytes is None else max_buffered_bytes
+        self.batches: Dict[str, BulkBatch] = {}
+        self.buffered_bytes = 0
+
+    def add(self, index: str, document: Any, chunk: bytes) -> Sequence[BulkBatch]:
+        """
+        Add an encoded document
+
+        :return: Batches that are ready to be sent (usually none)
+        """
+        ready = ()
+        batch = self.batches.get(index)
+        if batch is not None and (
+            batch.nbytes + len(chunk) > self.max_size_bytes
+            or (self.max_documents is not None and len(batch) >= self.max_documents)
+        ):
+            ready = [self.pop(index)]
+            batch = None
+
+        if batch is None:
+            batch = self.batches[index] = BulkBatch(index=index)
+
+        batch.add(document, chunk)
+        self.buffered_bytes += len(chunk)
+        if self.buffered_bytes > self.max_buffered_bytes:
+            ready = list(ready)
+            while self.buffered_bytes > self.max_buffered_bytes:
+                ready.append(self.pop(max(self.batches, key=lambda name: self.batches[name].nbytes)))
+        return ready
+
+    def pop(self, index: str) -> BulkBatch:
+        batch = self.batches.pop(index)
+        self.buffered_bytes -= batch.nbytes
+        return batch
+
+    def pop_all(self) -> List[BulkBatch]:
+        batches = list(self.batches.values())
+        self.batches.clear()
+        self.buffered_bytes = 0
+        return batches
+
+
+def route_encoded_batches(
+    documents: Iterable["ElasticIndex"],
+    max_size_bytes: int,
+    max_documents: Optional[int] = None,
+    encoder: Optional[BulkEncoder] = None,
+    max_buffered_bytes: Optional[int] = None,
+) -> Iterator[BulkBatch]:
+    """
+    Route documents to per-index batches as they arrive (see `BatchRouter`). A batch is yielded as soon as it's full,
+    the largest batch is yielded early when all open batches together exceed `max_buffered_bytes`, and the remaining
+    batches are yielded once `documents` is exhausted. `documents` is consumed lazily and can be a generator.
+
+    :param documents: Documents to batch. Can come from different indexes
+    :param max_size_bytes: Max body size in bytes
+    :param max_documents: Max number of documents in a batch. Unlimited if `None`
+    :param encoder: Encoder to use
+    :param max_buffered_bytes: Max total size of the open batches in bytes. Defaults to `max_size_bytes`
+    :return: Generator of batches with `BulkBatch.index` set
+    """
+    if encoder is None:
+        encoder = BulkEncoder()
+
+    router = BatchRouter(max_size_bytes, max_documents, max_buffered_bytes)
+    for document in documents:
+        index = document.get_index()
+        yield from router.add(index, document, encoder.encode(document, index=index))
+
+    yield from router.pop_all()
@@ -0,0 +1,159 @@
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Type
+
+from pylastic.bulk.batch import BatchRouter, BulkBatch
+from pylastic.bulk.encoder import BulkEncoder
+from pylastic.indexes.validation import validate_column
+from pylastic.types import Date
+from pylastic.types.base import ElasticType
+from pylastic.utils.arrays import is_numpy_array, numpy
+
+
+def to_list(column: Any) -> list:
+    """
+    Convert a column to a list of Python objects. Array-likes (e.g. NumPy arrays) are converted with `tolist()` in one call
+    """
+    if isinstance(column, list):
+        return column
+
+    if hasattr(column, "tolist"):
+        return column.tolist()
+
+    if hasattr(column, "to_pylist"):
+        # Arrow arrays
+        return column.to_pylist()
+
+    return list(column)
+
+
+def _is_date_field(field: "FieldSchema") -> bool:
+    field_type = type(field.type) if isinstance(field.type, ElasticType) else field.type
+    return isinstance(field_type, type) and issubclass(field_type, Date)
+
+
+def to_timestamps(column: Any) -> list:
+    """
+    Convert a NumPy `datetime64` column to timestamps in milliseconds with `Date.validate_array`.
+    `tolist()` would return nanoseconds (for `datetime64[ns]`, the pandas default) or naive datetimes that are read
+    as local time, while `datetime64` values are UTC. `NaT` values become `None`
+    """
+    mask, normalized = Date.validate_array(column)
+    timestamps = normalized.tolist()
+    for position in numpy.flatnonzero(~mask).tolist():
+        timestamps[position] = None
+    return timestamps
+
+
+def prepare_columns(
+    index_class: Type["ElasticIndex"], columns: Mapping[str, Sequence[Any]]
+) -> Dict[str, list]:
+    """
+    Check columns against the fields declared by the index class and convert them to lists.
+    Missing columns of fields with a default value are filled with it.
+    NumPy `datetime64` columns of `Date` fields are converted to timestamps in milliseconds, see `to_timestamps`
+
+    :param index_class: `ElasticIndex` subclass
+    :param columns: Dictionary of <field name>: <values>
+    :return: Dictionary of <field name>: <list of values or NumPy array> in the order of declared fields
+    :raises ValueError: If columns are unknown, missing or have different lengths
+    """
+    schema = index_class.get_schema()
+    declared = {f.name for f in schema.fields}
+    if unknown := [name for name in columns if name not in declared]:
+        raise ValueError(
+            f"{index_class.__name__} has no fields {', '.join(unknown)}"
+        )
+
+    # NumPy arrays are kept as they are, so that they can be validated without a Python-level loop
+    lists = {
+        name: column if is_numpy_array(column) else to_list(column)
+        for name, column in columns.items()
+    }
+    lengths = {len(column) for column in lists.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+    rows = lengths.pop() if lengths else 0
+
+    prepared = {}
+    for field in schema.fields:
+        if field.name in lists:
+            column = lists[field.name]
+            if is_numpy_array(column) and column.dtype.kind == "M" and _is_date_field(field):
+                column = to_timestamps(column)
+            prepared[field.name] = column
+        elif field.has_default:
+            prepared[field.name] = [field.default] * rows
+        else:
+            raise ValueError(
+                f"Column for the required field {index_class.__name__}.{field.name} is missing"
+            )
+
+    return prepared
+
+
+def validate_columns(index_class: Type["ElasticIndex"], columns: Dict[str, list]) -> None:
+    """
+    Validate prepared columns (see `prepare_columns`), one column at a time
+
+    :raises ValueError: If any value is invalid
+    """
+    schema = index_class.get_schema()
+    for field in schema.fields:
+        if invalid := validate_column(field, columns[field.name]):
+            raise ValueError(
+                f"Invalid values of {index_class.__name__}.{field.name} in rows "
+                f"{', '.join(map(str, invalid[:10]))}{'...' if len(invalid) > 10 else ''}"
+            )
+
+    if schema.id_field != "_id" and any(v is None for v in columns[schema.id_field]):
+        raise ValueError(f"If a custom ID field is specified, it must be populated")
+
+
+def get_column_batches(
+    index_class: Type["ElasticIndex"],
+    index_name: str,
+    columns: Dict[str, list],
+    max_size_bytes: int,
+    max_documents: Optional[int] = None,
+    encoder: Optional[BulkEncoder] = None,
+    index_names: Optional[Sequence[str]] = None,
+    max_buffered_bytes: Optional[int] = None,
+) -> Iterator[BulkBatch]:
+    """
+    Encode prepared columns (see `prepare_columns`) row by row into batches without creating index class instances.
+    `BulkBatch.documents` contains row numbers instead of documents.
+
+    :param index_class: `ElasticIndex` subclass
+    :param index_name: Index to save rows to
+    :param columns: Prepared columns
+    :param max_size_bytes: Max body size in bytes
+    :param max_documents: Max number of documents in a batch. Unlimited if `None`
+    :param encoder: Encoder to use
+    :param index_names: Index of every row, if rows go to different indexes (e.g. partitions). Overrides `index_name`
+    :param max_buffered_bytes: Max total size of the open batches in bytes, see `BatchRouter`
+    """
+    if encoder is None:
+        encoder = BulkEncoder()
+
+    schema = index_class.get_schema()
+    names = schema.source_names
+    body_columns: List[list] = [to_list(columns[name]) for name in schema.body_fields]
+    ids = to_list(columns[schema.id_field]) if schema.id_field in columns else None
+    if body_columns:
+        rows = zip(*body_columns)
+    else:
+        rows = repeat((), len(ids or ()))
+
+    op_type = index_class.get_op_type()
+    router = BatchRouter(max_size_bytes, max_documents, max_buffered_bytes)
+    for row, values in enumerate(rows):
+        index = index_names[row] if index_names is not None else index_name
+        chunk = encoder.encode_source(
+            index,
+            ids[row] if ids is not None else None,
+            dict(zip(names, values)),
+            op_type=op_type,
+        )
+        yield from router.add(index, row, chunk)
+
+    yield from router.pop_all()
@@ -0,0 +1,155 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from pylastic.request_template import RequestTemplate
+from pylastic.serialization import JSONSerializer, get_serializer
+
+
+class BulkEncoder:
+    """
+    Streaming NDJSON encoder for `_bulk` request bodies
+    https://www.elastic.co/guide/en/elasticsearch/reference/8.8/docs-bulk.html#docs-bulk
+
+    Documents are encoded straight to UTF-8 bytes and appended to a reusable buffer, so building a request
+    is linear in the number of documents. The action line prefix (`{"index":{"_index":"..."`) is computed once per index.
+    """
+
+    def __init__(
+        self, op_type: str = "index", serializer: Optional[JSONSerializer | str] = None
+    ):
+        """
+        Instantiate the encoder
+
+        :param op_type: Bulk operation to use for documents that don't require a specific one (`index` or `create`).
+         Documents of data streams are always written with `create`
+        :param serializer: JSON serializer (or its name) to use. Defaults to the fastest installed one
+        """
+        self.op_type = op_type
+        self.serializer = get_serializer(serializer)
+        self.dumps = self.serializer.dumps
+        self.documents = 0
+        self._buffer = bytearray()
+        self._action_prefixes: Dict[Tuple[Optional[str], str], bytes] = {}
+
+    def get_action_prefix(self, index: str, op_type: Optional[str] = None) -> bytes:
+        """
+        Get the cached opening part of an action line for the index
+
+        :param index: Target index
+        :param op_type: Bulk operation. Defaults to `self.op_type`
+        """
+        try:
+            return self._action_prefixes[op_type, index]
+        except KeyError:
+            prefix = b'{"' + (op_type or self.op_type).encode() + b'":{"_index":' + self.dumps(index)
+            self._action_prefixes[op_type, index] = prefix
+            return prefix
+
+    def encode_action(
+        self, index: str, id_: Optional[Any] = None, op_type: Optional[str] = None
+    ) -> bytes:
+        """
+        Encode an action line (including the trailing newline)
+
+        :param index: Target index
+        :param id_: Document ID. If `None`, ES will generate one
+        :param op_type: Bulk operation. Defaults to `self.op_type`
+        """
+        if id_ is None:
+            return self.get_action_prefix(index, op_type) + b"}}\n"
+
+        return self.get_action_prefix(index, op_type) + b',"_id":' + self.dumps(id_) + b"}}\n"
+
+    def encode(self, document: "ElasticIndex", index: Optional[str] = None) -> bytes:
+        """
+        Encode a document to its action and source lines without touching the buffer
+
+        :param document: Document to encode
+        :param index: Index name, if it's already known. Defaults to `document.get_index()`
+        :return: NDJSON bytes for this document
+        """
+        return self.encode_source(
+            index or document.get_index(),
+            document.get_id(),
+            document.get_body(),
+            op_type=document.get_op_type(),
+        )
+
+    def encode_source(
+        self, index: str, id_: Optional[Any], source: dict, op_type: Optional[str] = None
+    ) -> bytes:
+        """
+        Encode the action and source lines of a document that is given as a dictionary
+
+        :param index: Target index
+        :param id_: Document ID. If `None`, ES will generate one
+        :param source: Document body
+        :param op_type: Bulk operation. Defaults to `self.op_type`
+        """
+        return self.encode_action(index, id_, op_type) + self.dumps(source) + b"\n"
+
+    def iter_encoded(self, documents: Iterable["ElasticIndex"]) -> Iterator[bytes]:
+        """
+        Lazily encode documents one by one. Chunks can be passed to the transport as they're produced.
+        """
+        for document in documents:
+            yield self.encode(document)
+
+    def write(self, chunk: bytes, documents: int = 1) -> int:
+        """
+        Append already encoded NDJSON to the buffer
+
+        :param chunk: Encoded bytes
+        :param documents: Number of documents `chunk` contains
+        :return: Number of bytes written
+        """
+        self._buffer += chunk
+        self.documents += documents
+        return len(chunk)
+
+    def add(self, document: "ElasticIndex") -> int:
+        """
+        Encode a document and append it to the buffer
+
+        :return: Number of bytes written
+        """
+        return self.write(self.encode(document))
+
+    def extend(self, documents: Iterable["ElasticIndex"]) -> int:
+        """
+        Encode documents and append them to the buffer
+
+        :return: Number of bytes written
+        """
+        return sum(map(self.add, documents))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Exact size of the encoded body in bytes
+        """
+        return len(self._buffer)
+
+    def __len__(self) -> int:
+        return self.nbytes
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buffer)
+
+    def clear(self) -> None:
+        """
+        Reset the buffer so that the encoder can be reused for the next batch. Cached action prefixes are kept
+        """
+        self._buffer.clear()
+        self.documents = 0
+
+    def get_request(self) -> RequestTemplate:
+        """
+        Build a `_bulk` request from the buffer contents
+        """
+        return RequestTemplate(
+            method="POST",
+            path="/_bulk",
+            body=self.getvalue(),
+            headers={"content-type": "application/x-ndjson"},
+            documents=self.documents,
+        )
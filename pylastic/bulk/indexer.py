@@ -0,0 +1,241 @@
+import time
+from queue import Empty, Queue
+from threading import Condition, Event, Lock, Thread
+from typing import Dict, List, Optional
+
+from pylastic.bulk.batch import BulkBatch, get_refresh_policy
+from pylastic.bulk.encoder import BulkEncoder
+from pylastic.bulk.response import BulkItemFailure, BulkReport
+from pylastic.utils.concurrency import BoundedExecutor
+
+_CLOSE = object()
+
+
+class BulkIndexer:
+    """
+    Buffer that accepts documents from any number of threads and saves them from a background thread.
+
+    Documents are encoded by the thread that adds them and routed to per-index batches. A batch is sent when it reaches
+    `max_batch_size_mb` or `max_batch_documents`, or once its oldest document has waited for `flush_interval` seconds.
+    If the cluster can't keep up, the queue fills up and `add` blocks (backpressure).
+
+    ```
+    with client.bulk_indexer(flush_interval=0.5) as indexer:
+        for event in consumer:
+            indexer.add(Event(...))
+    print(indexer.report.failed)
+    ```
+    """
+
+    def __init__(
+        self,
+        client: "ElasticClient",
+        max_batch_size_mb: int = 10,
+        max_batch_documents: Optional[int] = 5_000,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10_000,
+        concurrency: int = 1,
+        create_indexes: bool = True,
+        refresh: bool | str = False,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+    ):
+        """
+        :param client: `ElasticClient` to send requests with
+        :param max_batch_size_mb: Max request size in MB
+        :param max_batch_documents: Max number of documents in a single request. Unlimited if `None`
+        :param flush_interval: Max time (in seconds) a document is buffered before it's sent
+        :param max_queue_size: Max number of documents waiting to be batched. `add` blocks when the queue is full
+        :param concurrency: Number of bulk requests sent in parallel
+        :param create_indexes: Whether to create indexes before their first batch is sent
+        :param refresh: Refresh policy of the `_bulk` requests, see `ElasticClient.save`
+        :param max_retries: How many times rejected documents are re-sent, see `ElasticClient.save`
+        :param initial_backoff: Max delay (in seconds) before the first retry
+        :param max_backoff: Max delay between retries in seconds
+        """
+        self.client = client
+        self.max_batch_bytes = max_batch_size_mb * 1024 * 1024
+        self.max_batch_documents = max_batch_documents
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.create_indexes = create_indexes
+        self.refresh = get_refresh_policy(refresh)
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.report = BulkReport()
+        self.encoder = BulkEncoder(serializer=client.serializer)
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._condition = Condition()  # Guards `_closed` and `_producers`
+        self._report_lock = Lock()
+        self._closed = False
+        self._producers = 0  # Threads that are putting an item into the queue
+        self._batches: Dict[str, BulkBatch] = {}
+        self._started: Dict[str, float] = {}  # When the first document of every open batch was added
+        self._executor = (
+            BoundedExecutor(max_workers=concurrency, max_in_flight_bytes=concurrency * self.max_batch_bytes)
+            if concurrency > 1
+            else None
+        )
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BulkIndexer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, document: "ElasticIndex", timeout: Optional[float] = None) -> None:
+        """
+        Add a document. Blocks while the queue is full
+
+        :param document: `ElasticIndex` subclass instance
+        :param timeout: Max time to wait for room in the queue. Forever if `None`
+        :raises queue.Full: If there's no room after `timeout` seconds
+        :raises RuntimeError: If the indexer is closed
+        """
+        index = document.get_index()
+        self._put((index, document, self.encoder.encode(document, index=index)), timeout, "add documents to")
+
+    def flush(self) -> None:
+        """
+        Send all buffered documents and wait until they're saved
+
+        :raises RuntimeError: If the indexer is closed
+        """
+        done = Event()
+        self._put(done, None, "flush")
+        done.wait()
+
+    def close(self) -> BulkReport:
+        """
+        Send all buffered documents, wait until they're saved and stop the background thread.
+
+        :return: Report of every document added to the indexer. Documents of requests that failed altogether are
+         reported as failures with the exception in `BulkItemFailure.error`
+        """
+        with self._condition:
+            if self._closed:
+                return self.report
+            self._closed = True
+            # Puts that are in progress must land before `_CLOSE`. They finish, since the background thread keeps
+            # consuming the queue until it gets `_CLOSE`
+            self._condition.wait_for(lambda: not self._producers)
+
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        return self.report
+
+    def _put(self, item: object, timeout: Optional[float], action: str) -> None:
+        # The lock isn't held while waiting for room in the queue, so that every producer's `timeout` is honored
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Cannot {action} a closed indexer")
+            self._producers += 1
+
+        try:
+            self._queue.put(item, timeout=timeout)
+        finally:
+            with self._condition:
+                self._producers -= 1
+                if not self._producers:
+                    self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            timeout = None
+            if self._started:
+                timeout = max(min(self._started.values()) + self.flush_interval - time.monotonic(), 0)
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                item = None
+
+            if item is _CLOSE:
+                self._send_all()
+                if self._executor is not None:
+                    self._executor.shutdown()
+                return
+
+            if isinstance(item, Event):
+                self._send_all()
+                if self._executor is not None:
+                    self._executor.wait()
+                item.set()
+                continue
+
+            if item is not None:
+                self._add(*item)
+            # Checked after every item: under sustained load the queue is never empty, and quiet indexes
+            # would otherwise wait for a busy one
+            self._send_expired()
+
+    def _add(self, index: str, document: "ElasticIndex", chunk: bytes) -> None:
+        batch = self._batches.get(index)
+        if batch is not None and (
+            batch.nbytes + len(chunk) > self.max_batch_bytes
+            or (self.max_batch_documents is not None and len(batch) >= self.max_batch_documents)
+        ):
+            self._send(self._pop(index))
+            batch = None
+
+        if batch is None:
+            batch = self._batches[index] = BulkBatch(index=index)
+            self._started[index] = time.monotonic()
+
+        batch.add(document, chunk)
+
+    def _pop(self, index: str) -> BulkBatch:
+        del self._started[index]
+        return self._batches.pop(index)
+
+    def _send_expired(self) -> None:
+        deadline = time.monotonic() - self.flush_interval
+        for index in [index for index, started in self._started.items() if started <= deadline]:
+            self._send(self._pop(index))
+
+    def _send_all(self) -> None:
+        batches = list(self._batches.values())
+        self._batches.clear()
+        self._started.clear()
+        for batch in batches:
+            self._send(batch)
+
+    def _send(self, batch: BulkBatch) -> None:
+        if self._executor is None:
+            self._save(batch)
+        else:
+            # Blocks while too many batches are in flight
+            self._executor.submit(self._save, batch, size=batch.nbytes)
+
+    def _save(self, batch: BulkBatch) -> None:
+        try:
+            if self.create_indexes:
+                self.client.create_index_for(batch.documents[:1], ignore_400=True)
+            report = self.client.send_batch(
+                batch, self.max_retries, self.initial_backoff, self.max_backoff, self.refresh
+            )
+        except Exception as e:  # noqa
+            report = BulkReport(failures=get_request_failures(batch, e))
+
+        with self._report_lock:
+            self.report.update(report)
+
+
+def get_request_failures(batch: BulkBatch, error: Exception) -> List[BulkItemFailure]:
+    """
+    Report every document of a batch whose request failed as a whole
+    """
+    status = getattr(error, "status_code", 0)
+    if not isinstance(status, int):
+        status = 0
+
+    details = {"type": error.__class__.__name__, "reason": str(error)}
+    return [
+        BulkItemFailure(document=document, index=batch.index, status=status, error=details, position=position)
+        for position, document in enumerate(batch.documents)
+    ]
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+# Only keep what's needed to match failed items to documents. Successful items shrink to `{"index":{"status":201}}`
+BULK_FILTER_PATH = "errors,took,items.*.status,items.*.error"
+
+RETRYABLE_STATUSES = {429}
+RETRYABLE_ERRORS = {"es_rejected_execution_exception"}
+
+
+@dataclass
+class BulkItemFailure:
+    """
+    A document that Elasticsearch failed to save
+    """
+
+    document: "ElasticIndex"
+    index: Optional[str]
+    status: int
+    error: Optional[dict] = None
+    position: int = 0  # Position of the document in the batch it was sent with
+
+    @property
+    def error_type(self) -> Optional[str]:
+        if isinstance(self.error, dict):
+            return self.error.get("type")
+        return None
+
+    @property
+    def retryable(self) -> bool:
+        """
+        Whether the document was rejected because the cluster was overloaded
+        """
+        return self.status in RETRYABLE_STATUSES or self.error_type in RETRYABLE_ERRORS
+
+
+@dataclass
+class BulkReport:
+    """
+    Result of saving documents with `_bulk` requests
+    """
+
+    succeeded: int = 0
+    retried: int = 0  # Number of documents that were re-sent
+    failures: List[BulkItemFailure] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return len(self.failures)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def update(self, other: "BulkReport") -> None:
+        """
+        Add the results from another report to this one
+        """
+        self.succeeded += other.succeeded
+        self.retried += other.retried
+        self.failures.extend(other.failures)
+
+
+def parse_bulk_response(batch: "BulkBatch", body: Any) -> Tuple[int, List[BulkItemFailure]]:
+    """
+    Match `_bulk` response items to the documents of the batch they were sent with
+
+    :param batch: Batch that was sent
+    :param body: Response body
+    :return: Number of successfully saved documents and a list of failures
+    """
+    if not body.get("errors"):
+        return len(batch), []
+
+    failures = []
+    for position, item in enumerate(body.get("items") or []):
+        # Every item is a single-key dictionary, e.g. `{"index": {...}}`
+        result = next(iter(item.values()))
+        status = result.get("status", 200)
+        if status < 300 and "error" not in result:
+            continue
+
+        failures.append(
+            BulkItemFailure(
+                document=batch.documents[position],
+                index=batch.index,
+                status=status,
+                error=result.get("error"),
+                position=position,
+            )
+        )
+
+    return len(batch) - len(failures), failures
@@ -1,10 +1,99 @@
-from typing import Optional, List, Type, Sequence, Dict
+import time
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Optional, List, Type, Sequence, Iterable, Iterator, Callable, Mapping, Dict
 from elasticsearch import Elasticsearch, BadRequestError
+from pylastic.bulk import (
+    BulkBatch,
+    BulkEncoder,
+    BulkIndexer,
+    BulkReport,
+    get_refresh_policy,
+    get_column_batches,
+    parse_bulk_response,
+    prepare_columns,
+    to_list,
+    route_encoded_batches,
+    validate_columns,
+)
 from pylastic.indexes import ElasticIndex
+from pylastic.instrumentation import (
+    Instrumentation,
+    RequestEvent,
+    get_endpoint,
+    get_instrumentation,
+    get_path_index,
+    set_response_info,
+)
 from pylastic.request_template import RequestTemplate
+from pylastic.search import SearchResult
+from pylastic.search.batcher import SearchBatcher
+from pylastic.search.iterators import iter_pages
+from pylastic.search.results import get_search_kwargs
+from pylastic.search.slices import SliceSpec, iter_slices_merged
+from pylastic.serialization import JSONSerializer, get_serializer, get_transport_serializers
 from elastic_transport._response import ApiResponse  # noqa
 from elasticsearch.exceptions import ApiError
-from pylastic.utils.iterables import is_iterable, group_by_index, get_batches_with_size
+from pylastic.utils.backoff import get_backoff_delay
+from pylastic.utils.cache import KnownIndexes, QueryCache
+from pylastic.utils.compression import GzipCompressor
+from pylastic.utils.concurrency import BoundedExecutor
+from pylastic.utils.iterables import is_iterable, join_within_length
+
+
+def get_hosts(host: str | List[str], port: int, scheme: str = "https") -> List[str]:
+    """
+    Build node URLs from one or more hosts
+
+    :param host: Host or list of hosts
+    :param port: ES Port
+    :param scheme: HTTP/HTTPS
+    """
+    if isinstance(host, str):
+        hosts = [host]
+    else:
+        hosts = host
+
+    return [f"{scheme}://{h.strip('https://').strip('http://')}:{port}" for h in hosts]
+
+
+def get_unique_indexes(objects: Iterable[ElasticIndex]) -> Dict[str, Type[ElasticIndex]]:
+    """
+    Get the names of the indexes the objects belong to (in the order of first appearance) and the class
+    of the first object of every index
+    """
+    unique_indexes = {}
+    for obj in objects:
+        index = obj.get_index()
+        if index not in unique_indexes:
+            unique_indexes[index] = obj.__class__
+    return unique_indexes
+
+
+def get_body_size(meta: Any) -> Optional[int]:
+    """
+    Get the size of a response body from its `content-length`, unless it's unknown or the body was compressed
+    """
+    headers = getattr(meta, "headers", None)
+    if headers is None or headers.get("content-encoding"):
+        return None
+
+    length = headers.get("content-length")
+    return int(length) if isinstance(length, (str, int)) and str(length).isdigit() else None
+
+
+def get_target_index(index: ElasticIndex | Type[ElasticIndex] | str) -> str:
+    """
+    Get the index (expression) a request should target: the index of an instance, which may be computed by
+    `get_index()`, and the pattern that covers every index of a class
+    """
+    if isinstance(index, str):
+        return index
+    if isinstance(index, type):
+        return index.get_index_pattern()
+    return index.get_index()
 
 
 class ElasticClient:
@@ -22,6 +111,11 @@ class ElasticClient:
         password: str,
         scheme: str = "https",
         connections_per_node: int = None,
+        serializer: Optional[JSONSerializer | str] = None,
+        query_cache: Optional[QueryCache] = None,
+        known_index_ttl: Optional[float] = 300,
+        compressor: Optional[GzipCompressor] = None,
+        instrumentation: Optional[Instrumentation | Sequence[Instrumentation]] = None,
         **kwargs,
     ):
         """
@@ -33,16 +127,35 @@ class ElasticClient:
         :param password: ES Password to use (BasicAuth)
         :param scheme: HTTP/HTTPS
         :param connections_per_node: Number of connections per node
+        :param serializer: JSON serializer (or its name: `json`, `orjson`) used for every request body.
+         Defaults to the fastest installed one
+        :param query_cache: Cache for `search` and `count` responses. Disabled if `None`.
+         Entries of an index are dropped when this client saves to, refreshes, clears or creates it
+        :param known_index_ttl: How long (in seconds) an index created or found by this client is assumed to exist,
+         so that `create_index_for` (and `save`) don't try to create it again. Forever if `None`
+        :param compressor: Compressor of the bodies of requests sent with `execute` (including `save` and `SearchBatcher`).
+         Bodies are sent uncompressed if `None`. Its counters show how many bytes were saved. Searches, counts and
+         point in time reads don't go through `execute`, so their bodies are never compressed by it.
+         Can't be combined with `http_compress=True`, which already compresses every body
+        :param instrumentation: Hook(s) called before and after every request sent with `execute` (including `save` and
+         `SearchBatcher`), e.g. a `MetricsAggregator`
         """
-        if isinstance(host, str):
-            hosts = [host]
-        else:
-            hosts = host
+        if compressor is not None and kwargs.get("http_compress"):
+            # The transport would gzip the already compressed body again
+            raise ValueError("`compressor` can't be used with `http_compress=True`")
+
+        self.serializer = get_serializer(serializer)
+        self.query_cache = query_cache
+        self.compressor = compressor
+        self.instrumentation = get_instrumentation(instrumentation)
+        self.known_indexes = KnownIndexes(ttl=known_index_ttl)
+        kwargs.setdefault("serializers", get_transport_serializers(self.serializer))
+        if connections_per_node is not None:
+            kwargs["connections_per_node"] = connections_per_node
 
         self.es_client = Elasticsearch(
-            hosts=[f"{scheme}://{h.strip('https://').strip('http://')}:{port}" for h in hosts],
+            hosts=get_hosts(host, port, scheme),
             basic_auth=(username, password),
-            connections_per_node=connections_per_node,
             **kwargs,
         )
 
@@ -53,6 +166,8 @@ class ElasticClient:
         Create an Elasticsearch index from a `ElasticIndex` subclass (**not an instance**).
         This method also will set up index lifecycle policies (ILP) if they're configured for the index.
 
+        For data stream classes (`Meta.is_datastream`), the index template is created or updated first, and then the data stream is created.
+
         :param index: `ElasticIndex` subclass. Class **must** have `Meta.index` set or `index_name` argument must be specified.
         :param index_name: Custom index name to use
         :param exists_ok: Whether to suppress `resource_already_exists_exception` error
@@ -68,13 +183,23 @@ class ElasticClient:
                 f"Pass a class instance"
             )
 
+        index_name = index_name or index.get_static_index()
+        if index._get_meta_attribute("is_datastream", False):
+            # The template must exist before the data stream is created
+            self.execute(index.get_index_template_request())
+
         try:
             response = self.execute(index.get_static_index_creation_request(index_name))
+            # Wildcard searches may now read the new index
+            self._invalidate_cache(index_name)
+            self.known_indexes.add(index_name)
             return response["acknowledged"]
 
         except BadRequestError as bad_request:
-            if bad_request.error == 'resource_already_exists_exception' and exists_ok:
-                return True
+            if bad_request.error == 'resource_already_exists_exception':
+                self.known_indexes.add(index_name)
+                if exists_ok:
+                    return True
 
             raise
 
@@ -86,117 +211,663 @@ class ElasticClient:
 
         :return:
         """
-        response: ApiResponse = self.es_client.perform_request(**template.to_kwargs())
+        kwargs = template.to_kwargs()
+        if kwargs["body"] is not None and (self.compressor is not None or self.instrumentation):
+            # Runs in the thread that sends the request, e.g. a `save` worker
+            self._encode_body(kwargs)
+
+        if not self.instrumentation:
+            response: ApiResponse = self.es_client.perform_request(**kwargs)
+            return response
+
+        event = RequestEvent(
+            template=template,
+            method=kwargs["method"],
+            path=kwargs["path"],
+            endpoint=get_endpoint(kwargs["method"], kwargs["path"]),
+            index=template.index or get_path_index(kwargs["path"]),
+            documents=template.documents,
+            request_bytes=len(kwargs["body"]) if kwargs["body"] is not None else 0,
+        )
+        for hook in self.instrumentation:
+            hook.before_request(event)
+
+        started = time.perf_counter()
+        try:
+            response = self.es_client.perform_request(**kwargs)
+        except Exception as e:
+            event.duration = time.perf_counter() - started
+            event.error = e
+            set_response_info(event, getattr(e, "meta", None), getattr(e, "body", None))
+            for hook in self.instrumentation:
+                hook.on_error(event)
+            raise
+
+        event.duration = time.perf_counter() - started
+        set_response_info(event, response.meta, response.body)
+        for hook in self.instrumentation:
+            hook.after_request(event)
 
         return response
 
+    def _encode_body(self, kwargs: dict) -> None:
+        body = kwargs["body"]
+        if isinstance(body, str):
+            body = body.encode()
+        elif not isinstance(body, (bytes, bytearray)):
+            body = self.serializer.dumps(body)
+
+        kwargs["body"] = body
+        if self.compressor is None:
+            return
+
+        compressed = self.compressor.compress(body)
+        if compressed is not None:
+            kwargs["body"] = compressed
+            kwargs["headers"] = {
+                **kwargs["headers"],
+                "content-encoding": self.compressor.content_encoding,
+            }
+
     def create_index_for(
-        self, objects: ElasticIndex | Sequence[ElasticIndex], ignore_400: bool = True
+        self,
+        objects: ElasticIndex | Sequence[ElasticIndex],
+        ignore_400: bool = True,
+        concurrency: int = 4,
     ) -> List[str]:
+        """
+        Create the indexes the objects belong to. Indexes that are known to exist (see `known_index_ttl`) are skipped,
+        and the rest are created in parallel
+
+        :param objects: `ElasticIndex` subclass instance(s)
+        :param ignore_400: Whether to suppress `BadRequestError` (e.g. an invalid mapping).
+         Indexes that already exist are never an error
+        :param concurrency: Max number of creation requests sent at once
+        :return: Names of all indexes the objects belong to
+        """
         if not is_iterable(objects):
             objects = [objects]
 
-        unique_indexes = []
-        for obj in objects:
-            if (index := obj.get_index()) not in unique_indexes:
-                # Create an index for every unique index
-                try:
-                    self.create_index(obj.__class__, index_name=index)
-                except BadRequestError:
-                    pass
-                unique_indexes.append(index)
-
-        return unique_indexes
+        unique_indexes = get_unique_indexes(objects)
+        missing = {
+            index: index_class
+            for index, index_class in unique_indexes.items()
+            if index not in self.known_indexes
+        }
+
+        def _create(index: str) -> None:
+            try:
+                self.create_index(missing[index], index_name=index, exists_ok=True)
+            except BadRequestError:
+                if not ignore_400:
+                    raise
+
+        if len(missing) == 1 or concurrency <= 1:
+            for index in missing:
+                _create(index)
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(missing))) as executor:
+                # `list` re-raises the first error
+                list(executor.map(_create, missing))
+
+        return list(unique_indexes)
 
     def refresh_index(
-        self, index: ElasticIndex | str | Sequence[ElasticIndex] | Sequence[str]
+        self,
+        index: ElasticIndex | str | Sequence[ElasticIndex] | Sequence[str],
+        max_path_length: int = 4_000,
     ) -> bool:
         """
         Refresh index.
+        Multiple indexes are refreshed with as few requests as possible: their names are joined with commas,
+        as long as the request path is no longer than `max_path_length` (ES rejects request lines over 4KB by default)
 
-        :param index: Index to refresh
+        :param index: Index to refresh: a name, an `ElasticIndex` instance (its `get_index()`) or subclass (all of its
+         indexes)
+        :param max_path_length: Max length of the request path
         :return: Whether the operation was successful. If multiple indexes are specified,
         `True` will be returned only if every operation finished successfully
         """
 
         def _refresh(index_name):
-            return not bool(
-                self.execute(ElasticIndex.get_index_refresh_template(index_name))[
-                    "_shards"
-                ]["failed"]
-            )
+            try:
+                return not bool(
+                    self.execute(ElasticIndex.get_index_refresh_template(index_name))[
+                        "_shards"
+                    ]["failed"]
+                )
+            finally:
+                # After the request, so that a search sent while it's in flight isn't cached
+                self._invalidate_cache(index_name)
 
         # `str` is not considered iterable in this function by design
         if not is_iterable(index):
             index = [index]
 
-        return all(
-            [_refresh(i if isinstance(i, str) else i.get_static_index()) for i in index]
+        targets = join_within_length(
+            map(get_target_index, index),
+            max_path_length - len("//_refresh"),
         )
+        return all([_refresh(target) for target in targets])
 
     def save(
         self,
-        objects: ElasticIndex | Sequence[ElasticIndex],
+        objects: ElasticIndex | Iterable[ElasticIndex],
         create_indexes: bool = True,
         max_request_size: int = 99,
         refresh_after: bool = False,
-    ) -> None:
+        refresh: bool | str = False,
+        max_batch_documents: Optional[int] = None,
+        concurrency: int = 1,
+        max_in_flight_size: Optional[int] = None,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+    ) -> BulkReport:
         """
         Save one or more `ElasticIndex` subclass objects.
+        `objects` is consumed lazily: documents are routed to per-index batches as they arrive and every batch is sent as soon
+        as it's full, so any iterable (e.g. a generator over a DB cursor) can be saved with flat memory usage.
 
-        :param objects: A single instance or a list of instances of classes, inherited from `ElasticIndex`
-        :param create_indexes: Whether to create indexes if they don't exist (introduces overhead because before the insertion begins,
-         a check request for every unique index will be sent)
+        :param objects: A single instance or an iterable of instances of classes, inherited from `ElasticIndex`
+        :param create_indexes: Whether to create indexes if they don't exist (introduces overhead because before the first batch
+         of every unique index is sent, a creation request will be sent)
         :param max_request_size: Max request size in MB. Note that Elastic limits the max request size to 100MB.
         :param refresh_after: Whether to run a manual refresh after the saving completes
+        :param refresh: Refresh policy passed to every `_bulk` request: `False`, `"wait_for"` or `True`.
+         Unlike `refresh_after`, no separate requests are sent. See the README for the throughput cost of each policy
+        :param max_batch_documents: Max number of documents in a single request. Unlimited if `None`
+        :param concurrency: Number of bulk requests to send in parallel. The underlying `Elasticsearch` client is shared
+         between the worker threads, so make sure `connections_per_node` is at least this number
+        :param max_in_flight_size: Max total size (in MB) of the batches that are being sent or waiting for a worker.
+         Defaults to `concurrency * max_request_size`
+        :param max_retries: How many times documents rejected by an overloaded cluster (HTTP 429 or
+         `es_rejected_execution_exception`) are re-sent. Only the rejected documents are re-sent
+        :param initial_backoff: Max delay (in seconds) before the first retry. It's doubled with every attempt, and the actual delay is random
+        :param max_backoff: Max delay between retries in seconds
+        :return: Report with the number of saved documents and the documents that could not be saved
         """
         if not is_iterable(objects):
             objects = [objects]
 
-        if create_indexes:
-            self.create_index_for(objects, ignore_400=True)
+        batches = route_encoded_batches(
+            objects,
+            max_request_size * 1024 * 1024,
+            max_documents=max_batch_documents,
+            # A single encoder is reused for every batch so that cached action lines are shared
+            encoder=BulkEncoder(serializer=self.serializer),
+        )
+
+        def _create_index(batch: BulkBatch) -> None:
+            self.create_index_for(batch.documents[:1], ignore_400=True)
+
+        return self._save_batches(
+            batches,
+            create_index=_create_index if create_indexes else None,
+            refresh_after=refresh_after,
+            refresh=get_refresh_policy(refresh),
+            concurrency=concurrency,
+            max_in_flight_size=(max_in_flight_size or concurrency * max_request_size)
+            * 1024
+            * 1024,
+            max_retries=max_retries,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+        )
+
+    def bulk_indexer(self, **kwargs) -> BulkIndexer:
+        """
+        Create a `BulkIndexer` that saves documents added from any thread in the background.
+        Use it as a context manager, or call `close()` to send the remaining documents
+
+        :param kwargs: `BulkIndexer` parameters, e.g. `max_batch_documents`, `flush_interval`, `max_queue_size`
+        """
+        return BulkIndexer(self, **kwargs)
+
+    def save_columns(
+        self,
+        index: Type[ElasticIndex],
+        columns: Mapping[str, Sequence],
+        index_name: Optional[str] = None,
+        validate: bool = True,
+        create_indexes: bool = True,
+        max_request_size: int = 99,
+        refresh_after: bool = False,
+        refresh: bool | str = False,
+        max_batch_documents: Optional[int] = None,
+        concurrency: int = 1,
+        max_in_flight_size: Optional[int] = None,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+    ) -> BulkReport:
+        """
+        Save documents given as columns (lists, NumPy arrays, ...) without creating an `ElasticIndex` instance per row.
+        Columns are checked against the fields declared by `index`, validated one column at a time and encoded to NDJSON directly.
+
+        :param index: `ElasticIndex` subclass the columns belong to
+        :param columns: Dictionary of <field name>: <values>. Columns of fields that have a default value can be omitted
+        :param index_name: Index to save documents to. Defaults to `Meta.index`, or to the partition of every row
+         if `Meta.partitioning` is set
+        :param validate: Whether to validate values before sending them
+        :return: Report with the number of saved documents and the documents that could not be saved.
+         `BulkItemFailure.document` is the row number
+        See `save` for the other parameters.
+        """
+        partitioning = index._get_meta_attribute("partitioning") if index_name is None else None
+        if partitioning is not None:
+            # Rows are routed to `<base>-<partition>`, like `save` does, so a static index isn't needed
+            base = index.get_partition_base()
+            if base is None:
+                raise RuntimeError(
+                    f"{index.__name__} is partitioned but has neither `Meta.index` nor `Meta.index_prefix`"
+                )
+        else:
+            index_name = index_name or index.get_static_index()
+            if index_name is None:
+                raise RuntimeError(
+                    f"{index.__name__} has no static index, `index_name` must be specified"
+                )
+
+        prepared = prepare_columns(index, columns)
+        if validate:
+            validate_columns(index, prepared)
+
+        batches = get_column_batches(
+            index,
+            index_name,
+            prepared,
+            max_request_size * 1024 * 1024,
+            max_documents=max_batch_documents,
+            encoder=BulkEncoder(serializer=self.serializer),
+            index_names=(
+                partitioning.get_indexes(base, to_list(prepared[partitioning.field]))
+                if partitioning is not None
+                else None
+            ),
+        )
 
-        documents_by_index: Dict[str, List[ElasticIndex]] = group_by_index(objects)
-        for index, documents in documents_by_index.items():
-            batches = get_batches_with_size(documents, max_request_size * 1024 * 1024)
+        def _create_index(batch: BulkBatch) -> None:
+            if batch.index in self.known_indexes:
+                return
+            try:
+                self.create_index(index, index_name=batch.index)
+            except BadRequestError:
+                pass
+
+        return self._save_batches(
+            batches,
+            create_index=_create_index if create_indexes else None,
+            refresh_after=refresh_after,
+            refresh=get_refresh_policy(refresh),
+            concurrency=concurrency,
+            max_in_flight_size=(max_in_flight_size or concurrency * max_request_size)
+            * 1024
+            * 1024,
+            max_retries=max_retries,
+            initial_backoff=initial_backoff,
+            max_backoff=max_backoff,
+        )
+
+    def _save_batches(
+        self,
+        batches: Iterable[BulkBatch],
+        create_index: Optional[Callable[[BulkBatch], None]],
+        refresh_after: bool,
+        refresh: Optional[str],
+        concurrency: int,
+        max_in_flight_size: int,
+        max_retries: int,
+        initial_backoff: float,
+        max_backoff: float,
+    ) -> BulkReport:
+        """
+        Send batches sequentially or from a thread pool, see `save`
+
+        :param create_index: Function that's called with the first batch of every index before it's sent
+        :param max_in_flight_size: Max total size of the batches in flight, in bytes
+        """
+        indexes = set()
+        report = BulkReport()
+
+        def _send(batch: BulkBatch) -> BulkReport:
+            return self.send_batch(batch, max_retries, initial_backoff, max_backoff, refresh)
+
+        def _prepare(batch: BulkBatch) -> None:
+            if batch.index not in indexes:
+                if create_index is not None:
+                    create_index(batch)
+                indexes.add(batch.index)
+
+        if concurrency <= 1:
             for batch in batches:
-                self.execute(ElasticIndex.get_batch_create_request(batch))
+                _prepare(batch)
+                report.update(_send(batch))
+        else:
+            errors = []
+            lock = Lock()
+
+            def _on_done(future):
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    return
+
+                with lock:
+                    report.update(future.result())
+
+            with BoundedExecutor(
+                max_workers=concurrency, max_in_flight_bytes=max_in_flight_size
+            ) as executor:
+                for batch in batches:
+                    if errors:
+                        break
+
+                    _prepare(batch)
+                    executor.submit(_send, batch, size=batch.nbytes).add_done_callback(
+                        _on_done
+                    )
+
+            if errors:
+                raise errors[0]
+
+        if refresh_after and indexes:
+            self.refresh_index(list(indexes))
+
+        return report
+
+    def send_batch(
+        self,
+        batch: BulkBatch,
+        max_retries: int = 3,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30,
+        refresh: Optional[str] = None,
+    ) -> BulkReport:
+        """
+        Send a batch, re-sending the documents that were rejected because the cluster is overloaded.
+        Cached responses of the batch's index are dropped afterwards, even if the request failed
+
+        :param batch: Batch to send
+        :param max_retries: How many times rejected documents are re-sent, see `save`
+        :param initial_backoff: Max delay (in seconds) before the first retry
+        :param max_backoff: Max delay between retries in seconds
+        :param refresh: Value of the `refresh` parameter, see `get_refresh_policy`
+        :return: Report of the batch's documents
+        """
+        try:
+            return self._send_batch(batch, max_retries, initial_backoff, max_backoff, refresh)
+        finally:
+            # Even a failed request may have written some documents
+            self._invalidate_cache(batch.index)
 
-            if refresh_after:
-                self.refresh_index(index)
+    def _send_batch(
+        self,
+        batch: BulkBatch,
+        max_retries: int,
+        initial_backoff: float,
+        max_backoff: float,
+        refresh: Optional[str],
+    ) -> BulkReport:
+        report = BulkReport()
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.execute(batch.get_request(refresh=refresh))
+            except ApiError as api_error:
+                if api_error.status_code != 429 or attempt == max_retries:
+                    raise
+                retryable = batch
+            else:
+                succeeded, failures = parse_bulk_response(batch, response.body)
+                report.succeeded += succeeded
+
+                if attempt == max_retries:
+                    report.failures.extend(failures)
+                    break
+
+                report.failures.extend(f for f in failures if not f.retryable)
+                retryable = batch.subset(f.position for f in failures if f.retryable)
+
+            if not retryable:
+                break
+
+            report.retried += len(retryable)
+            batch = retryable
+            time.sleep(get_backoff_delay(attempt, initial_backoff, max_backoff))
+
+        return report
 
     def clear(self, index: Type[ElasticIndex], ignore_error_codes: Optional[List] = None) -> None:
         """
-        Clear an index
+        Clear an index.
+        For a partitioned class (`Meta.partitioning`), all its partitions are deleted. They aren't re-created, since
+        partitions are created when documents are saved to them
 
         :param index: `ElasticIndex` subclass or instance
         :param ignore_error_codes: List of HTTP error codes to ignore
         """
         if isinstance(index, ElasticIndex):
             index_name = index.get_index()
+        elif index._get_meta_attribute("partitioning") is not None:
+            return self._clear_partitions(index, ignore_error_codes)
+        else:
+            index_name = index.get_static_index()
+
+        if index._get_meta_attribute("is_datastream", False):
+            deletion_request = ElasticIndex.get_datastream_deletion_request(index_name)
         else:
-            index_name = index.Meta.index
+            deletion_request = ElasticIndex.get_index_deletion_request(index_name)
 
         # Delete an index
         try:
-            self.execute(ElasticIndex.get_index_deletion_request(index_name))
+            self.execute(deletion_request)
         except ApiError as api_error:
             if ignore_error_codes and api_error.status_code not in ignore_error_codes:
                 raise api_error
+        finally:
+            self._invalidate_cache(index_name)
+            self.known_indexes.discard(index_name)
 
         # Then recreate it
-        self.create_index(index, exists_ok=True)
+        self.create_index(index, index_name=index_name, exists_ok=True)
         # ES forum mentions that deleting all documents in the index by query is seriously inefficient, so it's better to delete the index
         # and recreate it instead
 
-    def search(self, index: str, **kwargs):
+    def _clear_partitions(self, index: Type[ElasticIndex], ignore_error_codes: Optional[List] = None) -> None:
+        pattern = index.get_index_pattern()
+        # Wildcard deletes are rejected by default (`action.destructive_requires_name`), so partitions are listed first
+        response = self.execute(ElasticIndex.get_index_resolution_request(pattern))
+        names = [entry["name"] for entry in response["indices"]]
+        try:
+            for target in join_within_length(names, 4_000 - len("/")):
+                try:
+                    self.execute(ElasticIndex.get_index_deletion_request(target))
+                except ApiError as api_error:
+                    if ignore_error_codes and api_error.status_code not in ignore_error_codes:
+                        raise api_error
+        finally:
+            self._invalidate_cache(pattern)
+            self.known_indexes.discard_matching(pattern)
+
+    def search(
+        self,
+        index: str | Type[ElasticIndex],
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        **kwargs,
+    ):
         """
         Perform search.
 
-        :param index: Index(es) to search
+        :param index: Index(es) to search or an `ElasticIndex` subclass. If it's a class, the response is returned as
+         a `SearchResult` that creates instances of the class from hits when they're accessed, and `_source` is limited to the declared fields
+        :param index_name: Index(es) to search if `index` is a class without `Meta.index`
+        :param source_fields: Fields to fetch if `index` is a class. Defaults to all declared fields
+        :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.search()` method
+        :return: `SearchResult` if `index` is a class, raw response body otherwise
+        """
+        if isinstance(index, str):
+            return self._cached("search", {"index": index, **kwargs}, copy=True)
+
+        # Instances hold nested `_source` values by reference, so they must not share the cached response
+        return SearchResult(
+            index, self._cached("search", get_search_kwargs(index, index_name, source_fields, **kwargs), copy=True)
+        )
+
+    def search_batcher(
+        self, max_batch_size: int = 50, max_wait: Optional[float] = 0.005
+    ) -> SearchBatcher:
+        """
+        Create a `SearchBatcher` that sends searches submitted to it in `_msearch` requests (one round-trip per batch).
+        Responses of batched searches are not cached
+
+        :param max_batch_size: Max number of searches in a single request
+        :param max_wait: Max time (in seconds) a search waits for other searches. If `None`, searches are only sent
+         when a batch is full or when the batcher is flushed or closed
+        """
+        return SearchBatcher(self, max_batch_size=max_batch_size, max_wait=max_wait)
+
+    def iter_documents(
+        self,
+        index: Type[ElasticIndex],
+        query: Optional[dict] = None,
+        page_size: int = 1_000,
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        keep_alive: str = "1m",
+        prefetch: bool = True,
+        **kwargs,
+    ) -> Iterator[ElasticIndex]:
+        """
+        Iterate over all documents matching a query, no matter how many there are.
+        Opens a point in time, pages through it with `search_after` and closes it when the iteration ends
+        (or the generator is closed). The next page is fetched in the background while the current one is being processed.
+
+        :param index: `ElasticIndex` subclass to create instances of
+        :param query: Query. Defaults to `match_all`
+        :param page_size: Number of documents per request
+        :param index_name: Index(es) to read if the class has no `Meta.index`
+        :param source_fields: Fields to fetch. Defaults to all declared fields
+        :param keep_alive: How long ES keeps the point in time between requests
+        :param prefetch: Whether to fetch the next page in the background
+        :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.search()` method (e.g. `sort`)
+        :return: Generator of `index` instances
+        """
+        search_kwargs = get_search_kwargs(index, index_name, source_fields, **kwargs)
+        pages = iter_pages(
+            self.es_client,
+            search_kwargs.pop("index"),
+            query=query,
+            page_size=page_size,
+            keep_alive=keep_alive,
+            prefetch=prefetch,
+            **search_kwargs,
+        )
+        from_hit = index.from_hit
+        try:
+            for page in pages:
+                yield from map(from_hit, page)
+        finally:
+            # Closes the point in time even if the caller stops early
+            pages.close()
+
+    @contextmanager
+    def open_slices(
+        self,
+        index: Type[ElasticIndex],
+        slices: int,
+        query: Optional[dict] = None,
+        page_size: int = 1_000,
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        keep_alive: str = "5m",
+        **kwargs,
+    ) -> Iterator[List[SliceSpec]]:
+        """
+        Open a point in time split into `slices` partitions that can be read independently, e.g.
+
+        ```
+        with client.open_slices(MyIndex, slices=8) as specs:
+            with ProcessPoolExecutor() as pool:
+                pool.map(export_slice, specs)
+        ```
+        where every worker reads its slice with `spec.iter_documents(es_client)`.
+        The point in time is closed when the context exits.
+
+        :param index: `ElasticIndex` subclass to create instances of
+        :param slices: Number of slices. Usually no more than the number of shards
+        :param query: Query. Defaults to `match_all`
+        :param page_size: Number of documents per request
+        :param index_name: Index(es) to read if the class has no `Meta.index`
+        :param source_fields: Fields to fetch. Defaults to all declared fields
+        :param keep_alive: How long ES keeps the point in time between requests
+        :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.search()` method
+        :return: Picklable slice specs
+        """
+        if slices < 1:
+            raise ValueError(f"Number of slices must be positive, got {slices}")
+
+        search_kwargs = get_search_kwargs(index, index_name, source_fields, **kwargs)
+        pit_id = self.es_client.open_point_in_time(
+            index=search_kwargs.pop("index"), keep_alive=keep_alive
+        ).body["id"]
+        try:
+            yield [
+                SliceSpec(
+                    index_class=index,
+                    pit_id=pit_id,
+                    slice_id=slice_id,
+                    max_slices=slices,
+                    query=query,
+                    page_size=page_size,
+                    keep_alive=keep_alive,
+                    search_kwargs=search_kwargs,
+                )
+                for slice_id in range(slices)
+            ]
+        finally:
+            self.es_client.close_point_in_time(id=pit_id)
+
+    def iter_documents_sliced(
+        self,
+        index: Type[ElasticIndex],
+        slices: int = 4,
+        query: Optional[dict] = None,
+        page_size: int = 1_000,
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        keep_alive: str = "5m",
+        **kwargs,
+    ) -> Iterator[ElasticIndex]:
+        """
+        Same as `iter_documents`, but reads `slices` partitions of the point in time concurrently (one thread per slice).
+        Documents are yielded in no particular order.
+        Use `open_slices` to distribute the slices between processes instead.
+
+        :param index: `ElasticIndex` subclass to create instances of
+        :param slices: Number of slices (and threads)
+        :param query: Query. Defaults to `match_all`
+        :param page_size: Number of documents per request
+        :param index_name: Index(es) to read if the class has no `Meta.index`
+        :param source_fields: Fields to fetch. Defaults to all declared fields
+        :param keep_alive: How long ES keeps the point in time between requests
         :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.search()` method
+        :return: Generator of `index` instances
         """
-        return self.es_client.search(index=index, **kwargs).body
+        with self.open_slices(
+            index,
+            slices,
+            query=query,
+            page_size=page_size,
+            index_name=index_name,
+            source_fields=source_fields,
+            keep_alive=keep_alive,
+            **kwargs,
+        ) as specs:
+            documents = iter_slices_merged(self.es_client, specs)
+            try:
+                yield from documents
+            finally:
+                documents.close()
 
     def count(self, index: str, **kwargs):
         """
@@ -205,4 +876,30 @@ class ElasticClient:
         :param index: Index(es) to count documents in
         :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.count()` method
         """
-        return self.es_client.count(index=index, **kwargs).body
+        return self._cached("count", {"index": index, **kwargs}, copy=True)
+
+    def _cached(self, operation: str, request: dict, copy: bool = False) -> dict:
+        """
+        Call an `Elasticsearch` method, returning the cached response if `query_cache` is set
+
+        :param operation: Name of the method, e.g. `search`
+        :param request: Method kwargs, including `index`
+        :param copy: Whether to return a deep copy of a cached response, so that the caller can modify it
+        """
+        method = getattr(self.es_client, operation)
+        if self.query_cache is None:
+            return method(**request).body
+
+        kwargs = {key: value for key, value in request.items() if key != "index"}
+        key = self.query_cache.get_key(operation, request.get("index") or "", kwargs)
+        if (body := self.query_cache.get(key)) is None:
+            # Taken before the request, so that a write that lands while it's in flight keeps the response out
+            generation = self.query_cache.generation
+            response = method(**request)
+            body = response.body
+            self.query_cache.put(key, body, generation=generation, size=get_body_size(response.meta))
+        return deepcopy(body) if copy else body
+
+    def _invalidate_cache(self, index: Optional[str]) -> None:
+        if self.query_cache is not None and index:
+            self.query_cache.invalidate(index)
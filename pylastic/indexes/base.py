@@ -1,16 +1,24 @@
-import dataclasses
-import json
-import sys
-from dataclasses import dataclass, fields
-from typing import Union, get_origin, get_args, Dict, Type, Any, Optional, Sequence
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence, Iterable, List
 
+from pylastic.bulk.encoder import BulkEncoder
+from pylastic.indexes.partitioning import Partitioning
+from pylastic.indexes.schema import IndexSchema
 from pylastic.request_template import RequestTemplate
 from pylastic.types.base import ElasticType
 
 
 class ElasticIndexMetaclass(type):
     def __new__(cls, name, bases, dct):
-        return dataclass(super().__new__(cls, name, bases, dct))  # noqa
+        index_class = super().__new__(cls, name, bases, dct)
+        if "__dataclass_fields__" in dct:
+            # `dataclass(slots=True)` re-creates the class from an already processed one
+            return index_class
+
+        slots = getattr(getattr(index_class, "Meta", None), "slots", False)
+        index_class = dataclass(index_class, slots=slots)  # noqa
+        index_class.__schema__ = IndexSchema.build(index_class)
+        return index_class
 
 
 class ElasticIndex(metaclass=ElasticIndexMetaclass):
@@ -20,10 +28,17 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
     Inherit indexes from it and manipulate them in ORM-like ways
     """
 
+    # Allows subclasses with `Meta.slots` set to have no `__dict__`
+    __slots__ = ()
+
     class Meta:
         index: str = None
         is_datastream: bool = False
+        index_prefix: str = None
+        timestamp_field: str = None
+        partitioning: "Partitioning" = None
         id_field: str = "_id"
+        slots: bool = False
 
     def __init__(self, *args, **kwargs):
         # This method is just to shut type checks up
@@ -34,6 +49,14 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
     def is_datastream(self) -> bool:
         return getattr(self.Meta, "is_datastream", False)
 
+    @classmethod
+    def get_op_type(cls) -> str | None:
+        """
+        Get the bulk operation documents must be written with: data streams are append-only and only accept `create`.
+        `None` means any operation can be used
+        """
+        return "create" if cls._get_meta_attribute("is_datastream", False) else None
+
     @classmethod
     @property
     def id_field(cls) -> str | None:
@@ -44,25 +67,50 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
 
     def get_index(self) -> str | None:
         """
-        Get index name
-        Note that this method is not static, so you can override it in a subclass and create custom index names based on field values
+        Get index (or data stream) name
+        Note that this method is not static, so you can override it in a subclass and create custom index names based on field values.
+        Names of data streams must match `get_index_pattern()`
 
-        :return: Name of the index or `None`, if not specified or not applicable (if `is_datastream` is set)
+        :return: Name of the index or `None`, if not specified
         """
-        if self.is_datastream:
-            return None
+        partitioning = self._get_meta_attribute("partitioning")
+        if partitioning is not None:
+            return partitioning.get_index(self.get_partition_base(), self)
 
-        return self.Meta.index
+        return self.get_static_index()
+
+    @classmethod
+    def get_partition_base(cls) -> str | None:
+        """
+        Get the prefix of partition names (see `Meta.partitioning`): `Meta.index` or `Meta.index_prefix`
+        """
+        return cls._get_meta_attribute("index") or cls._get_meta_attribute("index_prefix")
 
     @classmethod
     def get_static_index(cls) -> str | None:
         """
-        Get `cls.Meta.index` field or `None`
+        Get `cls.Meta.index` field or `None`.
+        For data streams without `Meta.index`, the name is `<Meta.index_prefix>-default`
         """
-        try:
-            return cls.Meta.index
-        except AttributeError:
-            return None
+        index = cls._get_meta_attribute("index")
+        if index is None and cls._get_meta_attribute("is_datastream", False):
+            if prefix := cls._get_meta_attribute("index_prefix"):
+                return f"{prefix}-default"
+        return index
+
+    @classmethod
+    def get_index_pattern(cls) -> str | None:
+        """
+        Get the pattern matching every index (or data stream) of the class: `<Meta.index>-*` for partitioned classes,
+        `<Meta.index_prefix>-*` for data streams with a prefix, the static index otherwise. Searches by class read it
+        """
+        if cls._get_meta_attribute("partitioning") is not None:
+            return f"{cls.get_partition_base()}-*"
+
+        if cls._get_meta_attribute("is_datastream", False) and cls._get_meta_attribute("index") is None:
+            if prefix := cls._get_meta_attribute("index_prefix"):
+                return f"{prefix}-*"
+        return cls.get_static_index()
 
     @classmethod
     def get_mapping(cls) -> dict:
@@ -100,93 +148,82 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
         :return: Full mapping
         """
 
-        def resolve_type(type_: Type | ElasticType) -> dict | None:
-            if isinstance(type_, ElasticType) or issubclass(type_, ElasticType):
-                return ElasticType.get_mapping_of(type_)
-
-            match type_.__name__:
-                case "str":
-                    return {"type": "text"}
-                case "int":
-                    return {"type": "integer"}
-                case "float":
-                    return {"type": "float"}
-                case "bool":
-                    return {"type": "boolean"}
-                case "dict":
-                    return {"type": "object"}
-                case "list":
-                    return {"type": "object"}
-                case _:
-                    return None
-
-        properties = {}
-        for name, type_ in cls._get_fields_with_types().items():
-            # _id field should be excluded from the mapping
-            if name == cls.id_field:
-                continue
-
-            es_type = resolve_type(type_)
-            properties[name] = es_type
-
-        return {"mappings": {"properties": properties}}
+        return cls.get_schema().get_mapping()
 
     def get_body(self) -> dict:
-        return {
-            field: getattr(self, field)
-            for field in self._get_fields_with_types()
-            if field != self.id_field
-        }
+        return self.get_schema().get_body(self)
+
+    @classmethod
+    def from_hit(cls, hit: dict) -> "ElasticIndex":
+        """
+        Create an instance from a search hit without calling `__init__`.
+        `_id` is assigned to `Meta.id_field` (if it's set). Fields missing from `_source` (e.g. because of source filtering)
+        get their default value or `None`
+
+        :param hit: Hit from a search response (`{"_id": ..., "_source": {...}, ...}`)
+        """
+        schema = cls.get_schema()
+        source = hit.get("_source") or {}
+        # Only data streams with `Meta.timestamp_field` have renamed fields
+        renamed = schema.source_names != schema.body_fields
+
+        obj = cls.__new__(cls)
+        for field in schema.fields:
+            key = schema.get_source_name(field.name) if renamed else field.name
+            value = source.get(key, field.default if field.has_default else None)
+            object.__setattr__(obj, field.name, value)
+
+        if schema.id_field != "_id" and "_id" in hit:
+            object.__setattr__(obj, schema.id_field, hit["_id"])
+
+        return obj
+
+    @classmethod
+    def get_schema(cls) -> IndexSchema:
+        """
+        Get the schema built for this class. It's rebuilt if `Meta.id_field` was changed after the class was defined
+        """
+        schema = cls.__schema__
+        if schema.id_field != cls.id_field:
+            schema = cls.__schema__ = IndexSchema.build(cls)
+        return schema
 
     @classmethod
     def _get_fields_with_types(cls) -> Dict[str, "ElasticType"]:
         """
         Get a dictionary of <field name>: <field type>
         """
-        mapping = {}
-        for field in fields(cls):
-            field_type: ElasticType = field.type
-            if get_origin(field_type) is Union:
-                field_type = get_args(field_type)[0]
-
-            mapping[field.name] = field_type
-        return mapping
+        return cls.get_schema().field_types
 
     def validate(self):
-        # Validate fields
-        for field in fields(self):
-            value = getattr(self, field.name)
-            field_type: ElasticType | Type = field.type
-            default = field.default
-            if get_origin(field_type) is Union:
-                field_type = get_args(field_type)[0]
-
-            if value is None and default != dataclasses.MISSING:
-                continue
-
-            if not issubclass(field_type, ElasticType):
-                # Since it's a built-in type, attempt to transform it
-                field_type(value)
-                continue
+        """
+        Validate field values. The check is generated for every class, see `pylastic.indexes.validation`
+
+        :raises ValueError: If a value cannot be converted to the field's `ElasticType` or the ID is invalid
+        """
+        self.get_schema().validate(self)
+
+    @staticmethod
+    def validate_many(objects: Iterable["ElasticIndex"]) -> List[int]:
+        """
+        Validate multiple objects without raising
+
+        :param objects: `ElasticIndex` subclass instances. Can be of different classes
+        :return: Positions of invalid objects
+        """
+        failed = []
+        validators = {}
+        for position, obj in enumerate(objects):
+            cls = obj.__class__
+            if (validate := validators.get(cls)) is None:
+                validate = validators[cls] = cls.get_schema().validate
 
             try:
-                field_type.is_valid_value(value, raise_exception=True)
-            except Exception as e:
-                raise ValueError(
-                    f"{e.__class__.__name__} validating "
-                    f"{self.__class__.__name__}.{field.name} ({value}): {e}"
-                ) from e
-
-        if self.id_field != "_id":
-            # https://www.elastic.co/guide/en/elasticsearch/reference/current/mapping-id-field.html
-            if self.get_id() is None:
-                raise ValueError(
-                    f"If a custom ID field is specified, it must be populated"
-                )
-
-            if sys.getsizeof(self.get_id()) > 512:
-                raise ValueError(f"Elasticsearch limits ID field length to 512 bytes")
-            # TODO: remove _id field from mappings
+                validate(obj)
+            except Exception:  # noqa
+                failed.append(position)
+
+        return failed
 
     @classmethod
     def _get_meta_attribute(cls, attr, default: Any = None) -> Any:
@@ -210,12 +247,44 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
     def get_static_index_creation_request(
         cls, index_name: str = None
     ) -> RequestTemplate:
+        if cls._get_meta_attribute("is_datastream", False):
+            # Mappings and settings come from the index template, see `get_index_template_request`
+            return RequestTemplate(
+                method="PUT", path=f"/_data_stream/{index_name or cls.get_static_index()}"
+            )
+
         return RequestTemplate(
             method="PUT",
             path=f"/{index_name or cls.get_static_index()}",
             body={**cls.get_mapping(), "settings": cls.get_index_settings()},
         )
 
+    @classmethod
+    def get_index_template_request(cls) -> RequestTemplate:
+        """
+        Build a request that creates (or updates) the composable index template of a data stream class
+        https://www.elastic.co/guide/en/elasticsearch/reference/current/index-templates.html
+
+        The template is named after `Meta.index_prefix` (or `Meta.index`) and matches `get_index_pattern()`.
+        Its priority is `Meta.template_priority` (200 by default, so that it wins over the built-in `logs-*-*` and `metrics-*-*` templates)
+        """
+        name = cls._get_meta_attribute("index_prefix") or cls._get_meta_attribute("index")
+        if not cls._get_meta_attribute("is_datastream", False) or name is None:
+            raise RuntimeError(
+                f"{cls.__name__} is not a data stream with `Meta.index_prefix` or `Meta.index`"
+            )
+
+        return RequestTemplate(
+            method="PUT",
+            path=f"/_index_template/{name}",
+            body={
+                "index_patterns": [cls.get_index_pattern()],
+                "data_stream": {},
+                "priority": cls._get_meta_attribute("template_priority", 200),
+                "template": {**cls.get_mapping(), "settings": cls.get_index_settings()},
+            },
+        )
+
     def get_index_creation_request(self) -> RequestTemplate:
         return self.get_static_index_creation_request(index_name=self.get_index())
 
@@ -236,20 +305,33 @@ class ElasticIndex(metaclass=ElasticIndexMetaclass):
 
     @staticmethod
     def get_batch_create_request(
-        documents: Sequence["ElasticIndex"],
+        documents: Sequence["ElasticIndex"], encoder: Optional[BulkEncoder] = None
     ) -> RequestTemplate:
+        """
+        Build a `_bulk` request that indexes the documents
+
+        :param documents: Documents to index
+        :param encoder: Encoder to (re)use. Its buffer will be cleared
+        """
         # https://www.elastic.co/guide/en/elasticsearch/reference/8.8/docs-bulk.html#docs-bulk
-        body = ""
-        for d in documents:
-            body += (
-                json.dumps({"index": {"_index": d.get_index(), "_id": d.get_id()}})
-                + "\n"
-                + json.dumps(d.get_body())
-                + "\n"
-            )
-        body += "\n"
-        return RequestTemplate(body=body, method="POST", path="/_bulk")
+        if encoder is None:
+            encoder = BulkEncoder()
+        encoder.clear()
+        encoder.extend(documents)
+        return encoder.get_request()
 
     @staticmethod
     def get_index_deletion_request(index_name: str) -> RequestTemplate:
         return RequestTemplate(method='DELETE', path=f'/{index_name}')
+
+    @staticmethod
+    def get_datastream_deletion_request(name: str) -> RequestTemplate:
+        return RequestTemplate(method='DELETE', path=f'/_data_stream/{name}')
+
+    @staticmethod
+    def get_index_resolution_request(pattern: str) -> RequestTemplate:
+        """
+        Build a request that lists the indexes, aliases and data streams matching a pattern
+        https://www.elastic.co/guide/en/elasticsearch/reference/current/indices-resolve-index-api.html
+        """
+        return RequestTemplate(method='GET', path=f'/_resolve/index/{pattern}')
@@ -0,0 +1,174 @@
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Dict, Hashable, Iterable, List
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_MS_PER_HOUR = 3_600_000
+_MS_PER_DAY = 86_400_000
+
+
+class Partitioning(ABC):
+    """
+    Declarative index partitioning, set as `Meta.partitioning`.
+    Documents are written to `<Meta.index>-<suffix>`, where the suffix is computed from the value of `field`.
+
+    Values are mapped to cheap bucket keys, and every suffix is formatted once per bucket and cached,
+    so routing a document costs a key computation and a dictionary lookup.
+    """
+
+    def __init__(self, field: str):
+        """
+        :param field: Field the partition is computed from
+        """
+        self.field = field
+        self._get_value = attrgetter(field)
+        self._suffixes: Dict[Hashable, str] = {}
+
+    @abstractmethod
+    def get_bucket_key(self, value: Any) -> Hashable:
+        """
+        Map a field value to a key that's the same for all values of a partition
+        """
+
+    @abstractmethod
+    def format_bucket(self, key: Hashable) -> str:
+        """
+        Format the index name suffix of a bucket. Called once per bucket
+        """
+
+    def get_suffix(self, value: Any) -> str:
+        """
+        Get the index name suffix for a field value
+        """
+        if value is None:
+            raise ValueError(f"`{self.field}` must be set to compute the index name")
+
+        key = self.get_bucket_key(value)
+        try:
+            return self._suffixes[key]
+        except KeyError:
+            suffix = self._suffixes[key] = self.format_bucket(key)
+            return suffix
+
+    def get_index(self, base: str, document: Any) -> str:
+        """
+        Get the index name of a document
+
+        :param base: Index name prefix (`Meta.index`)
+        :param document: `ElasticIndex` instance
+        """
+        return f"{base}-{self.get_suffix(self._get_value(document))}"
+
+    def get_indexes(self, base: str, values: Iterable[Any]) -> List[str]:
+        """
+        Get the index names for many field values, e.g. a column
+
+        :param base: Index name prefix (`Meta.index`)
+        :param values: Values of `field`
+        """
+        names: Dict[str, str] = {}
+        get_suffix = self.get_suffix
+        result = []
+        for value in values:
+            suffix = get_suffix(value)
+            # Reuse one string object per partition
+            try:
+                result.append(names[suffix])
+            except KeyError:
+                name = names[suffix] = f"{base}-{suffix}"
+                result.append(name)
+        return result
+
+
+class TimePartition(Partitioning):
+    """
+    Partition documents by a date field, e.g. into daily indexes: `TimePartition("created", interval="day")`
+    results in `events-2023.01.31`.
+
+    Values can be `datetime`/`date` objects or timestamps in milliseconds (see `pylastic.types.Date`). Buckets are in UTC:
+    timezone-aware datetimes are converted to UTC, naive ones are used as is.
+    """
+
+    FORMATS = {
+        "hour": "%Y.%m.%d.%H",
+        "day": "%Y.%m.%d",
+        "week": "%G.%V",
+        "month": "%Y.%m",
+        "year": "%Y",
+    }
+
+    def __init__(self, field: str, interval: str = "day", format: str = None):
+        """
+        :param field: Date field
+        :param interval: One of `hour`, `day`, `week` (ISO week), `month`, `year`
+        :param format: `strftime` format of the suffix. Defaults to a format matching the interval
+        """
+        if interval not in self.FORMATS:
+            raise ValueError(
+                f"Unknown interval {interval!r}, expected one of: {', '.join(self.FORMATS)}"
+            )
+
+        super().__init__(field)
+        self.interval = interval
+        self.format = format or self.FORMATS[interval]
+        self.hourly = interval == "hour"
+
+    def get_bucket_key(self, value: Any) -> int:
+        """
+        Get the number of hours (for the `hour` interval) or days since the epoch.
+        Weeks, months and years are built from days, so that there's one cheap key per day
+        """
+        if isinstance(value, (int, float)):
+            return int(value // (_MS_PER_HOUR if self.hourly else _MS_PER_DAY))
+
+        if isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc)
+            days = value.toordinal() - _EPOCH_ORDINAL
+            return days * 24 + value.hour if self.hourly else days
+
+        if isinstance(value, date):
+            days = value.toordinal() - _EPOCH_ORDINAL
+            return days * 24 if self.hourly else days
+
+        if isinstance(value, str) and value.isdigit():
+            return self.get_bucket_key(int(value))
+
+        raise ValueError(f"Cannot compute a time partition of `{self.field}` = {value!r}")
+
+    def format_bucket(self, key: int) -> str:
+        if self.hourly:
+            return (_EPOCH + timedelta(hours=key)).strftime(self.format)
+        return (_EPOCH + timedelta(days=key)).strftime(self.format)
+
+
+class HashPartition(Partitioning):
+    """
+    Spread documents over a fixed number of indexes by a stable hash of a field:
+    `HashPartition("user_id", partitions=8)` results in `events-0` ... `events-7`
+    """
+
+    def __init__(self, field: str, partitions: int):
+        """
+        :param field: Field to hash
+        :param partitions: Number of indexes
+        """
+        if partitions < 1:
+            raise ValueError(f"Number of partitions must be positive, got {partitions}")
+
+        super().__init__(field)
+        self.partitions = partitions
+
+    def get_bucket_key(self, value: Any) -> int:
+        # `hash()` of strings differs between processes, so CRC32 is used instead
+        if isinstance(value, int):
+            return value % self.partitions
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        return zlib.crc32(value) % self.partitions
+
+    def format_bucket(self, key: int) -> str:
+        return str(key)
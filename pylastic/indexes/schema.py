@@ -0,0 +1,170 @@
+import dataclasses
+import types
+from copy import deepcopy
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple, Type, Union, get_args, get_origin, get_type_hints
+
+from pylastic.indexes.validation import create_validator
+from pylastic.types.base import ElasticType
+
+# Field every data stream document must have
+TIMESTAMP_FIELD = "@timestamp"
+
+
+def unwrap_optional(type_: Any) -> Tuple[Any, bool]:
+    """
+    Get the actual type of `Optional[type]` (or `Union[type, ...]`)
+
+    :return: The first type of a union and whether `None` is allowed
+    """
+    if get_origin(type_) in (Union, types.UnionType):
+        args = get_args(type_)
+        return args[0], type(None) in args
+
+    return type_, False
+
+
+def resolve_es_type(type_: Type | ElasticType) -> dict | None:
+    """
+    Get the mapping of a field type. See `ElasticIndex.get_mapping` for details
+    """
+    if isinstance(type_, ElasticType):
+        return ElasticType.get_mapping_of(type_)
+
+    if not isinstance(type_, type):
+        # Generic aliases, e.g. `list[str]`
+        type_ = get_origin(type_)
+        if not isinstance(type_, type):
+            return None
+
+    if issubclass(type_, ElasticType):
+        return ElasticType.get_mapping_of(type_)
+
+    match type_.__name__:
+        case "str":
+            return {"type": "text"}
+        case "int":
+            return {"type": "integer"}
+        case "float":
+            return {"type": "float"}
+        case "bool":
+            return {"type": "boolean"}
+        case "dict":
+            return {"type": "object"}
+        case "list":
+            return {"type": "object"}
+        case _:
+            return None
+
+
+def get_source_name_getter(index_class: type) -> Callable[[str], str]:
+    """
+    Get a function that maps field names to their names in `_source`.
+    Data stream classes store `Meta.timestamp_field` as `@timestamp`
+    """
+    meta = index_class.Meta
+    timestamp_field = getattr(meta, "timestamp_field", None)
+    if not getattr(meta, "is_datastream", False) or timestamp_field is None:
+        return lambda name: name
+
+    return lambda name: TIMESTAMP_FIELD if name == timestamp_field else name
+
+
+@dataclass(frozen=True)
+class FieldSchema:
+    name: str
+    type: Type | ElasticType  # Resolved type, i.e. `X` for `Optional[X]`
+    optional: bool
+    default: Any = dataclasses.MISSING
+
+    @property
+    def has_default(self) -> bool:
+        return self.default is not dataclasses.MISSING
+
+
+@dataclass(frozen=True)
+class IndexSchema:
+    """
+    Everything about an `ElasticIndex` subclass that can be computed without an instance.
+    It's built once per class, so that per-document operations don't have to reflect over dataclass fields.
+    """
+
+    fields: Tuple[FieldSchema, ...]
+    id_field: str
+    mapping: Dict[str, Any]
+    body_fields: Tuple[str, ...]
+    source_names: Tuple[str, ...]  # Names of `body_fields` in `_source`
+    get_body_values: Callable[[Any], Tuple[Any, ...]]
+    validate: Callable[[Any], None]
+
+    @classmethod
+    def build(cls, index_class: type) -> "IndexSchema":
+        """
+        Build a schema of a (dataclass) `ElasticIndex` subclass
+        """
+        try:
+            hints = get_type_hints(index_class)
+        except Exception:  # noqa
+            # Unresolvable forward references, fall back to raw annotations
+            hints = {}
+
+        fields = []
+        for field in dataclasses.fields(index_class):
+            type_, optional = unwrap_optional(hints.get(field.name, field.type))
+            fields.append(FieldSchema(field.name, type_, optional, field.default))
+
+        id_field = getattr(index_class.Meta, "id_field", "_id")
+        body_fields = tuple(f.name for f in fields if f.name != id_field)
+        get_source_name = get_source_name_getter(index_class)
+        source_names = tuple(map(get_source_name, body_fields))
+
+        properties = {}
+        for field in fields:
+            # _id field should be excluded from the mapping
+            if field.name == id_field:
+                continue
+            properties[get_source_name(field.name)] = resolve_es_type(field.type)
+
+        if len(body_fields) == 1:
+            getter = attrgetter(body_fields[0])
+
+            def get_body_values(obj):
+                return (getter(obj),)
+
+        elif body_fields:
+            get_body_values = attrgetter(*body_fields)
+        else:
+
+            def get_body_values(obj):
+                return ()
+
+        return cls(
+            fields=tuple(fields),
+            id_field=id_field,
+            mapping={"mappings": {"properties": properties}},
+            body_fields=body_fields,
+            source_names=source_names,
+            get_body_values=get_body_values,
+            validate=create_validator(fields, id_field, index_class.__qualname__),
+        )
+
+    @property
+    def field_types(self) -> Dict[str, Type | ElasticType]:
+        return {f.name: f.type for f in self.fields}
+
+    def get_mapping(self) -> dict:
+        # The schema is shared, so callers get a copy they're free to modify
+        return deepcopy(self.mapping)
+
+    def get_body(self, obj: Any) -> dict:
+        return dict(zip(self.source_names, self.get_body_values(obj)))
+
+    def get_source_name(self, field_name: str) -> str:
+        """
+        Get the name of a field in `_source`
+        """
+        try:
+            return self.source_names[self.body_fields.index(field_name)]
+        except ValueError:
+            return field_name
@@ -0,0 +1,138 @@
+import sys
+from typing import Any, Callable, Dict, List, Sequence, get_origin
+
+from pylastic.types.base import ElasticType
+from pylastic.utils.arrays import is_numpy_array, numpy
+
+
+def _get_check_lines(name: str, field_type: Any, globals_: Dict[str, Any]) -> List[str]:
+    """
+    Generate lines that validate `value` against a field type
+    """
+    if isinstance(field_type, ElasticType):
+        field_type = type(field_type)
+
+    if not isinstance(field_type, type):
+        # Generic aliases, e.g. `list[str]`
+        field_type = get_origin(field_type)
+        if not isinstance(field_type, type):
+            return []
+
+    type_name = f"_type_{name}"
+    globals_[type_name] = field_type
+
+    if not issubclass(field_type, ElasticType):
+        # Since it's a built-in type, attempt to transform it (unless it's already of this type)
+        return [
+            f"if value.__class__ is not {type_name}:",
+            f"    {type_name}(value)",
+        ]
+
+    return [
+        "try:",
+        f"    valid = {type_name}.get_valid_object(value)",
+        "except Exception as e:",
+        f"    raise ValueError(_error_message(self, {name!r}, value, e)) from e",
+        "if valid is None:",
+        f"    e = ValueError(f'Value \"{{value}}\" cannot be converted to type {{{type_name}.__name__}}')",
+        f"    raise ValueError(_error_message(self, {name!r}, value, e)) from e",
+    ]
+
+
+def _error_message(obj: Any, field: str, value: Any, error: Exception) -> str:
+    return (
+        f"{error.__class__.__name__} validating "
+        f"{obj.__class__.__name__}.{field} ({value}): {error}"
+    )
+
+
+def create_validator(
+    fields: Sequence["FieldSchema"], id_field: str, qualname: str = "ElasticIndex"
+) -> Callable[[Any], None]:
+    """
+    Generate a function that validates an instance of an index class, the way `dataclasses` generates `__init__`.
+    Checks are unrolled for every field, so no per-field dispatch happens at validation time.
+
+    :param fields: Fields of the index class
+    :param id_field: Name of the ID field
+    :param qualname: Name of the index class (used for the generated function name)
+    :return: Function that accepts an instance and raises a `ValueError` (or the error of a built-in type constructor) if it's invalid
+    """
+    globals_: Dict[str, Any] = {"_error_message": _error_message, "_getsizeof": sys.getsizeof}
+    body = []
+    for field in fields:
+        check = _get_check_lines(field.name, field.type, globals_)
+        if not check:
+            continue
+
+        body.append(f"value = self.{field.name}")
+        if field.has_default:
+            body.append("if value is not None:")
+            body.extend("    " + line for line in check)
+        else:
+            body.extend(check)
+
+    if id_field != "_id":
+        # https://www.elastic.co/guide/en/elasticsearch/reference/current/mapping-id-field.html
+        body.extend(
+            [
+                f"id_ = getattr(self, {id_field!r}, None)",
+                "if id_ is None:",
+                "    raise ValueError('If a custom ID field is specified, it must be populated')",
+                "if _getsizeof(id_) > 512:",
+                "    raise ValueError('Elasticsearch limits ID field length to 512 bytes')",
+            ]
+        )
+
+    source = "def validate(self):\n" + "".join(
+        f"    {line}\n" for line in body or ["pass"]
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, globals_, namespace)  # noqa
+
+    validate = namespace["validate"]
+    validate.__qualname__ = f"{qualname}.validate"
+    validate.__source__ = source
+    return validate
+
+
+def validate_column(field: "FieldSchema", values: Sequence[Any]) -> List[int]:
+    """
+    Validate all values of a field in one pass. `ElasticType` fields are validated with `ElasticType.validate_array`
+
+    :param field: Field the values belong to
+    :param values: Column of values (a sequence or a NumPy array)
+    :return: Positions of invalid values
+    """
+    field_type = field.type
+    if isinstance(field_type, ElasticType):
+        field_type = type(field_type)
+
+    if not isinstance(field_type, type):
+        field_type = get_origin(field_type)
+        if not isinstance(field_type, type):
+            return []
+
+    if issubclass(field_type, ElasticType):
+        mask, _ = field_type.validate_array(values)
+        if is_numpy_array(mask):
+            invalid = numpy.flatnonzero(~mask).tolist()
+        else:
+            invalid = [position for position, valid in enumerate(mask) if not valid]
+    else:
+        if is_numpy_array(values):
+            values = values.tolist()
+
+        invalid = []
+        for position, value in enumerate(values):
+            if value.__class__ is field_type:
+                continue
+            try:
+                field_type(value)
+            except Exception:  # noqa
+                invalid.append(position)
+
+    if field.has_default:
+        invalid = [position for position in invalid if values[position] is not None]
+
+    return invalid
@@ -0,0 +1,253 @@
+import bisect
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence
+
+from pylastic.request_template import RequestTemplate
+
+# Upper bounds (in milliseconds) of the latency histogram buckets. The last bucket is unbounded
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 30_000, 60_000)
+
+
+def get_endpoint(method: str, path: str) -> str:
+    """
+    Normalize a request path, so that requests to different indexes are grouped together:
+    `PUT /events-2023.01.31/_doc/1` -> `PUT /{index}/_doc/{id}`, `POST /_bulk` -> `POST /_bulk`
+    """
+    parts = path.split("?", 1)[0].strip("/").split("/")
+    normalized = []
+    for position, part in enumerate(parts):
+        if not part or part.startswith("_"):
+            normalized.append(part)
+        else:
+            normalized.append("{index}" if position == 0 else "{id}")
+    return f"{method.upper()} /{'/'.join(normalized)}"
+
+
+def get_path_index(path: str) -> Optional[str]:
+    """
+    Get the target index (expression) of a request path, e.g. `events` from `/events/_refresh`
+    """
+    first = path.split("?", 1)[0].strip("/").split("/", 1)[0]
+    return first if first and not first.startswith("_") else None
+
+
+@dataclass
+class RequestEvent:
+    """
+    A request sent with `ElasticClient.execute`. Passed to every `Instrumentation` callback;
+    the fields that describe the outcome are set before `after_request`/`on_error` are called
+    """
+
+    template: RequestTemplate
+    method: str
+    path: str
+    endpoint: str  # Normalized path, see `get_endpoint`
+    index: Optional[str]  # Target index (expression), if known
+    documents: Optional[int]  # Number of documents of a bulk request
+    request_bytes: int  # Size of the body that's sent, after compression
+    response_bytes: Optional[int] = None  # Size of the response body, if the server reported it
+    duration: Optional[float] = None  # Client-side wall time in seconds
+    took: Optional[int] = None  # Server-side time in milliseconds, if the response has it
+    status: Optional[int] = None
+    error: Optional[BaseException] = None
+
+
+def set_response_info(event: RequestEvent, meta: Any, body: Any) -> None:
+    """
+    Fill in the fields of an event that come from the response (or the error) of a request
+    """
+    if meta is None:
+        return
+
+    status = getattr(meta, "status", None)
+    event.status = status if isinstance(status, int) else None
+    headers = getattr(meta, "headers", None)
+    length = headers.get("content-length") if headers is not None else None
+    if isinstance(length, (str, int)) and str(length).isdigit():
+        event.response_bytes = int(length)
+    if isinstance(body, dict) and isinstance(body.get("took"), int):
+        event.took = body["took"]
+
+
+class Instrumentation:
+    """
+    Base class of request hooks (`ElasticClient(instrumentation=...)`). All callbacks are no-ops, override the ones
+    you need. Callbacks are called from the thread that sends the request, so they must be thread-safe,
+    and exceptions they raise are propagated to the caller
+    """
+
+    def before_request(self, event: RequestEvent) -> None:
+        """
+        Called right before a request is sent
+        """
+
+    def after_request(self, event: RequestEvent) -> None:
+        """
+        Called after a successful response is received
+        """
+
+    def on_error(self, event: RequestEvent) -> None:
+        """
+        Called when a request fails. `event.error` is the exception that's about to be raised
+        """
+
+
+class LatencyHistogram:
+    """
+    Histogram of request latencies with fixed `LATENCY_BUCKETS`. Not thread-safe on its own
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0  # In milliseconds
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, milliseconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.min = milliseconds if self.min is None else min(self.min, milliseconds)
+        self.max = milliseconds if self.max is None else max(self.max, milliseconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimate a percentile as the upper bound of the bucket it falls into (capped by the max latency)
+
+        :param percent: Percentile from 0 to 100
+        """
+        if not self.count:
+            return None
+
+        rank = max(self.count * percent / 100, 1)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "inf"], self.counts)),
+        }
+
+
+class MetricsAggregator(Instrumentation):
+    """
+    In-memory, thread-safe aggregator of request metrics: latency histograms per endpoint and per index,
+    bytes sent and received, errors, and bulk throughput.
+
+    ```
+    metrics = MetricsAggregator()
+    client = ElasticClient(..., instrumentation=metrics)
+    client.save(documents)
+    print(metrics.get_stats()["bulk"]["documents_per_second"])
+    ```
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Drop all collected metrics
+        """
+        with self._lock:
+            self.endpoints: Dict[str, LatencyHistogram] = {}
+            self.indexes: Dict[str, LatencyHistogram] = {}
+            self.errors: Dict[str, int] = {}
+            self.request_bytes = 0
+            self.response_bytes = 0
+            self.bulk_documents = 0
+            self.bulk_requests = 0
+            self.bulk_time = 0.0  # Sum of the durations of bulk requests
+            self._bulk_started: Optional[float] = None
+            self._bulk_finished: Optional[float] = None
+
+    def after_request(self, event: RequestEvent) -> None:
+        self._add(event)
+
+    def on_error(self, event: RequestEvent) -> None:
+        self._add(event)
+
+    def _add(self, event: RequestEvent) -> None:
+        milliseconds = (event.duration or 0) * 1000
+        finished = time.monotonic()
+        with self._lock:
+            self._get_histogram(self.endpoints, event.endpoint).add(milliseconds)
+            if event.index is not None:
+                self._get_histogram(self.indexes, event.index).add(milliseconds)
+
+            self.request_bytes += event.request_bytes
+            self.response_bytes += event.response_bytes or 0
+            if event.error is not None:
+                self.errors[event.endpoint] = self.errors.get(event.endpoint, 0) + 1
+            elif event.documents is not None:
+                self.bulk_requests += 1
+                self.bulk_documents += event.documents
+                self.bulk_time += event.duration or 0
+                started = finished - (event.duration or 0)
+                if self._bulk_started is None or started < self._bulk_started:
+                    self._bulk_started = started
+                self._bulk_finished = finished
+
+    @staticmethod
+    def _get_histogram(histograms: Dict[str, LatencyHistogram], key: str) -> LatencyHistogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram()
+        return histogram
+
+    @property
+    def documents_per_second(self) -> Optional[float]:
+        """
+        Bulk throughput: saved documents divided by the wall time from the start of the first successful bulk request
+        to the end of the last one, so concurrent requests are taken into account
+        """
+        if self._bulk_started is None or self._bulk_finished <= self._bulk_started:
+            return None
+        return self.bulk_documents / (self._bulk_finished - self._bulk_started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable snapshot of the metrics. Latencies are in milliseconds
+        """
+        with self._lock:
+            return {
+                "endpoints": {key: histogram.to_dict() for key, histogram in self.endpoints.items()},
+                "indexes": {key: histogram.to_dict() for key, histogram in self.indexes.items()},
+                "errors": dict(self.errors),
+                "request_bytes": self.request_bytes,
+                "response_bytes": self.response_bytes,
+                "bulk": {
+                    "requests": self.bulk_requests,
+                    "documents": self.bulk_documents,
+                    "time": self.bulk_time,
+                    "documents_per_second": self.documents_per_second,
+                },
+            }
+
+
+def get_instrumentation(
+    instrumentation: Optional[Instrumentation | Sequence[Instrumentation]],
+) -> List[Instrumentation]:
+    """
+    Normalize the `instrumentation` argument of the client to a list of hooks
+    """
+    if instrumentation is None:
+        return []
+    if isinstance(instrumentation, Instrumentation):
+        return [instrumentation]
+    return list(instrumentation)
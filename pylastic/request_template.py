@@ -16,6 +16,9 @@ class RequestTemplate:
     body: Optional[dict | str] = None
     headers: Optional[dict] = None
     method: str = "GET"
+    # Not sent, only used for instrumentation (see `pylastic.instrumentation`)
+    index: Optional[str] = None  # Target index if it's not in the path (e.g. `_bulk`)
+    documents: Optional[int] = None  # Number of documents in the body of a bulk request
 
     def get_query_params_string(self) -> str:
         if not self.query_params:
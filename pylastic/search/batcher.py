@@ -0,0 +1,252 @@
+import dataclasses
+import time
+from concurrent.futures import Future
+from threading import Condition, Thread
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from elasticsearch.exceptions import HTTP_EXCEPTIONS, ApiError
+
+from pylastic.request_template import RequestTemplate
+from pylastic.search.results import SearchResult, get_search_kwargs
+
+# `.search()` kwargs that are sent in the `_msearch` header line instead of the body
+HEADER_KEYS = frozenset(
+    {
+        "index",
+        "routing",
+        "preference",
+        "request_cache",
+        "search_type",
+        "allow_no_indices",
+        "expand_wildcards",
+        "ignore_unavailable",
+        "ccs_minimize_roundtrips",
+        "allow_partial_search_results",
+    }
+)
+# `.search()` kwargs that are named differently in the request body
+BODY_ALIASES = {"source": "_source", "from_": "from"}
+# `.search()` kwargs that are sent as `_source_includes`/`_source_excludes` query params. `_msearch` has no per-search
+# query params, so they're sent as `_source` in the body, which they override (like they do in a standalone search)
+SOURCE_FILTER_KEYS = {"source_includes": "includes", "source_excludes": "excludes"}
+
+
+class _PendingSearch(NamedTuple):
+    header: Dict[str, Any]
+    body: Dict[str, Any]
+    index_class: Optional[Type["ElasticIndex"]]
+    future: Future
+    submitted_at: float
+
+
+def split_search_kwargs(kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Split `Elasticsearch.search()` kwargs into an `_msearch` header and body
+    """
+    header, body, source_filter = {}, {}, {}
+    for key, value in kwargs.items():
+        if key in HEADER_KEYS:
+            header[key] = value
+        elif key in SOURCE_FILTER_KEYS:
+            source_filter[SOURCE_FILTER_KEYS[key]] = value
+        else:
+            body[BODY_ALIASES.get(key, key)] = value
+
+    if source_filter:
+        body["_source"] = source_filter
+    return header, body
+
+
+def get_item_error(meta: Any, item: Dict[str, Any]) -> ApiError:
+    """
+    Build the exception that a `.search()` call would raise for a failed `_msearch` item
+    """
+    status = item.get("status", 500)
+    error = item.get("error")
+    message = error["type"] if isinstance(error, dict) and "type" in error else str(error)
+    if dataclasses.is_dataclass(meta):
+        meta = dataclasses.replace(meta, status=status)
+    return HTTP_EXCEPTIONS.get(status, ApiError)(message=message, meta=meta, body=item)
+
+
+class SearchBatcher:
+    """
+    Collects searches into `_msearch` requests
+    https://www.elastic.co/guide/en/elasticsearch/reference/current/search-multi-search.html
+
+    A batch is sent when it has `max_batch_size` searches, when its oldest search has waited for `max_wait` seconds
+    (checked by a background thread) or when `flush()` is called. Every caller gets back a `Future` that's resolved
+    with its own response, or with the exception a standalone search would've raised.
+
+    Can be shared between threads, or used as a context manager that sends the remaining searches on exit:
+
+    ```
+    with client.search_batcher(max_wait=None) as batcher:
+        futures = [batcher.submit(MyIndex, query=query) for query in queries]
+    results = [future.result() for future in futures]
+    ```
+    """
+
+    def __init__(
+        self,
+        client: "ElasticClient",
+        max_batch_size: int = 50,
+        max_wait: Optional[float] = 0.005,
+    ):
+        """
+        :param client: Client to send the requests with. They go through `ElasticClient.execute`, so they're compressed
+         and instrumented like any other request
+        :param max_batch_size: Max number of searches in a single request
+        :param max_wait: Max time (in seconds) a search waits for other searches. If `None`, searches are only sent
+         when a batch is full or on `flush()`/`close()`
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"Batch size must be positive, got {max_batch_size}")
+
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[_PendingSearch] = []
+        self._condition = Condition()
+        self._closed = False
+        self._thread = None
+        if max_wait is not None:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __enter__(self) -> "SearchBatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(
+        self,
+        index: str | Type["ElasticIndex"],
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> Future:
+        """
+        Add a search to the next batch. Arguments are the same as in `ElasticClient.search`
+
+        :return: `Future` resolved with a `SearchResult` if `index` is a class, raw response body otherwise
+        """
+        if isinstance(index, str):
+            index_class = None
+            kwargs["index"] = index
+        else:
+            index_class = index
+            kwargs = get_search_kwargs(index, index_name, source_fields, **kwargs)
+
+        header, body = split_search_kwargs(kwargs)
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit a search to a closed batcher")
+
+            self._pending.append(
+                _PendingSearch(header, body, index_class, future, time.monotonic())
+            )
+            batch = self._take() if len(self._pending) >= self.max_batch_size else None
+            self._condition.notify_all()
+
+        if batch:
+            self._send(batch)
+        return future
+
+    def search(
+        self,
+        index: str | Type["ElasticIndex"],
+        index_name: Optional[str] = None,
+        source_fields: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> SearchResult | dict:
+        """
+        Add a search to the next batch and wait for its response. Requires `max_wait` to be set (or another thread
+        to call `flush()`)
+        """
+        return self.submit(index, index_name, source_fields, **kwargs).result()
+
+    def flush(self) -> None:
+        """
+        Send all pending searches
+        """
+        while True:
+            with self._condition:
+                batch = self._take()
+            if not batch:
+                return
+            self._send(batch)
+
+    def close(self) -> None:
+        """
+        Stop the background thread and send all pending searches
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _take(self) -> List[_PendingSearch]:
+        batch = self._pending[: self.max_batch_size]
+        del self._pending[: self.max_batch_size]
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+                # The oldest search may change while waiting if a full batch was sent by `submit`
+                while (
+                    self._pending
+                    and not self._closed
+                    and (remaining := self._pending[0].submitted_at + self.max_wait - time.monotonic()) > 0
+                ):
+                    self._condition.wait(remaining)
+                batch = self._take()
+
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch: List[_PendingSearch]) -> None:
+        batch = [search for search in batch if search.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        dumps = self.client.serializer.dumps
+        lines = []
+        for search in batch:
+            lines.append(dumps(search.header))
+            lines.append(dumps(search.body))
+        request = RequestTemplate(
+            method="POST",
+            path="/_msearch",
+            body=b"\n".join(lines) + b"\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        try:
+            response = self.client.execute(request)
+            responses = response.body["responses"]
+            if len(responses) != len(batch):
+                raise ValueError(f"Expected {len(batch)} responses to `_msearch`, got {len(responses)}")
+
+            for search, item in zip(batch, responses):
+                if "error" in item:
+                    search.future.set_exception(get_item_error(response.meta, item))
+                elif search.index_class is not None:
+                    search.future.set_result(SearchResult(search.index_class, item))
+                else:
+                    search.future.set_result(item)
+        except BaseException as e:  # noqa
+            # Callers would wait forever for futures that aren't resolved
+            for search in batch:
+                if not search.future.done():
+                    search.future.set_exception(e)
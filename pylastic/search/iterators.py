@@ -0,0 +1,76 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def iter_pages(
+    es_client: "Elasticsearch",
+    index_name: str,
+    query: Optional[dict] = None,
+    page_size: int = 1_000,
+    keep_alive: str = "1m",
+    sort: Optional[List[Any]] = None,
+    prefetch: bool = True,
+    pit_id: Optional[str] = None,
+    **kwargs,
+) -> Iterator[List[dict]]:
+    """
+    Read all hits matching a query page by page using a point in time (PIT) and `search_after`
+    https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#search-after
+
+    Unless `pit_id` is given, the PIT is opened on the first iteration and closed when the generator is exhausted or closed.
+
+    :param es_client: `Elasticsearch` client
+    :param index_name: Index(es) to read
+    :param query: Query. Defaults to `match_all`
+    :param page_size: Number of hits per page
+    :param keep_alive: How long ES keeps the PIT between requests
+    :param sort: Sort. Defaults to `_shard_doc` (the most efficient tiebreaker)
+    :param prefetch: Whether to fetch the next page in a background thread while the current one is being processed
+    :param pit_id: ID of an already opened PIT to use. The caller is responsible for closing it
+    :param kwargs: Additional kwargs accepted by the `Elasticsearch` `.search()` method (e.g. `source`)
+    :return: Generator of pages (lists of raw hits)
+    """
+    owns_pit = pit_id is None
+    if owns_pit:
+        pit_id = es_client.open_point_in_time(index=index_name, keep_alive=keep_alive).body["id"]
+    request = {
+        "query": query or {"match_all": {}},
+        "size": page_size,
+        "sort": sort or ["_shard_doc"],
+        "track_total_hits": False,
+        **kwargs,
+    }
+
+    def _fetch(search_after: Optional[List[Any]]) -> Dict[str, Any]:
+        return es_client.search(
+            pit={"id": pit_id, "keep_alive": keep_alive},
+            **request,
+            **({"search_after": search_after} if search_after is not None else {}),
+        ).body
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    search_after = None
+    try:
+        pending: Optional[Future] = executor.submit(_fetch, None) if executor else None
+        while True:
+            body = pending.result() if executor else _fetch(search_after)
+            # The PIT ID may change between requests, the latest one must be used
+            pit_id = body.get("pit_id", pit_id)
+            hits = body["hits"]["hits"]
+            if not hits:
+                break
+
+            search_after = hits[-1]["sort"]
+            has_more = len(hits) == page_size
+            if has_more and executor:
+                pending = executor.submit(_fetch, search_after)
+
+            yield hits
+
+            if not has_more:
+                break
+    finally:
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if owns_pit:
+            es_client.close_point_in_time(id=pit_id)
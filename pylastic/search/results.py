@@ -0,0 +1,115 @@
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, Type, TypeVar, overload
+
+T = TypeVar("T", bound="ElasticIndex")
+
+
+def get_source_fields(
+    index_class: Type["ElasticIndex"], source_fields: Optional[Sequence[str]] = None
+) -> List[str]:
+    """
+    Get the `_source` fields to request for an index class
+
+    :param index_class: `ElasticIndex` subclass
+    :param source_fields: Subset of the declared fields. Defaults to all declared fields (except the ID field)
+    :raises ValueError: If `source_fields` contains undeclared fields
+    """
+    schema = index_class.get_schema()
+    if source_fields is None:
+        return list(schema.source_names)
+
+    declared = {f.name for f in schema.fields}
+    if unknown := [name for name in source_fields if name not in declared]:
+        raise ValueError(f"{index_class.__name__} has no fields {', '.join(unknown)}")
+
+    return [schema.get_source_name(name) for name in source_fields]
+
+
+def get_search_kwargs(
+    index_class: Type["ElasticIndex"],
+    index_name: Optional[str] = None,
+    source_fields: Optional[Sequence[str]] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Build kwargs of `Elasticsearch.search` for an index class: the index name and `_source` filtering.
+    `source` passed explicitly in `kwargs` takes precedence
+    """
+    index_name = index_name or index_class.get_index_pattern()
+    if index_name is None:
+        raise RuntimeError(
+            f"{index_class.__name__} has no static index, `index_name` must be specified"
+        )
+
+    kwargs.setdefault("source", get_source_fields(index_class, source_fields))
+    return {"index": index_name, **kwargs}
+
+
+class SearchResult(Generic[T], Sequence[T]):
+    """
+    Search response with hits hydrated into `ElasticIndex` instances when they're accessed
+    """
+
+    def __init__(self, index_class: Type[T], body: dict):
+        """
+        :param index_class: `ElasticIndex` subclass to create instances of
+        :param body: Raw search response
+        """
+        self.index_class = index_class
+        self.body = body
+        self.hits: List[dict] = body.get("hits", {}).get("hits", [])
+        self._documents: List[Optional[T]] = [None] * len(self.hits)
+
+    @property
+    def total(self) -> Optional[int]:
+        """
+        Total number of matching documents (may be a lower bound, see `track_total_hits`)
+        """
+        total = self.body.get("hits", {}).get("total")
+        return total.get("value") if isinstance(total, dict) else total
+
+    @property
+    def took(self) -> Optional[int]:
+        return self.body.get("took")
+
+    @property
+    def max_score(self) -> Optional[float]:
+        return self.body.get("hits", {}).get("max_score")
+
+    @property
+    def aggregations(self) -> dict:
+        return self.body.get("aggregations", {})
+
+    def _get(self, position: int) -> T:
+        document = self._documents[position]
+        if document is None:
+            document = self._documents[position] = self.index_class.from_hit(
+                self.hits[position]
+            )
+        return document
+
+    @overload
+    def __getitem__(self, position: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._get(i) for i in range(*position.indices(len(self)))]
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("search result index out of range")
+        return self._get(position)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __iter__(self) -> Iterator[T]:
+        return (self._get(i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"<SearchResult {self.index_class.__name__}: {len(self)} of {self.total}>"
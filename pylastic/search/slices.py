@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from queue import Queue
+from threading import Event, Thread
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+
+from pylastic.search.iterators import iter_pages
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class SliceSpec:
+    """
+    One partition of a sliced point in time (PIT)
+    https://www.elastic.co/guide/en/elasticsearch/reference/current/paginate-search-results.html#slice-scroll
+
+    Specs are picklable (as long as `index_class` is importable), so they can be sent to other processes,
+    where each process reads its slice with its own client.
+    """
+
+    index_class: Type["ElasticIndex"]
+    pit_id: str
+    slice_id: int
+    max_slices: int
+    query: Optional[dict] = None
+    page_size: int = 1_000
+    keep_alive: str = "1m"
+    search_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def iter_pages(self, es_client: "Elasticsearch", prefetch: bool = True) -> Iterator[List[dict]]:
+        """
+        Read raw hits of this slice page by page
+        """
+        return iter_pages(
+            es_client,
+            None,
+            query=self.query,
+            page_size=self.page_size,
+            keep_alive=self.keep_alive,
+            prefetch=prefetch,
+            pit_id=self.pit_id,
+            slice={"id": self.slice_id, "max": self.max_slices},
+            **self.search_kwargs,
+        )
+
+    def iter_documents(
+        self, es_client: "Elasticsearch", prefetch: bool = True
+    ) -> Iterator["ElasticIndex"]:
+        """
+        Read documents of this slice
+        """
+        from_hit = self.index_class.from_hit
+        pages = self.iter_pages(es_client, prefetch=prefetch)
+        try:
+            for page in pages:
+                yield from map(from_hit, page)
+        finally:
+            pages.close()
+
+
+def iter_slices_merged(
+    es_client: "Elasticsearch", slices: Sequence[SliceSpec], max_buffered_pages: Optional[int] = None
+) -> Iterator["ElasticIndex"]:
+    """
+    Read slices concurrently (one thread per slice) and merge their documents into one iterator.
+    Documents of different slices are interleaved in no particular order.
+
+    :param es_client: `Elasticsearch` client shared by the threads
+    :param slices: Slices to read
+    :param max_buffered_pages: Max number of pages read ahead of the consumer. Defaults to twice the number of slices
+    """
+    queue: Queue = Queue(maxsize=max_buffered_pages or 2 * len(slices))
+    stop = Event()
+
+    def _read(spec: SliceSpec) -> None:
+        try:
+            # Threads already read ahead through the queue, so pages aren't prefetched
+            for page in spec.iter_pages(es_client, prefetch=False):
+                if stop.is_set():
+                    return
+                queue.put((spec, page))
+        except BaseException as e:  # noqa
+            queue.put((spec, e))
+        finally:
+            queue.put((spec, _DONE))
+
+    threads = [Thread(target=_read, args=(spec,), daemon=True) for spec in slices]
+    for thread in threads:
+        thread.start()
+
+    running = len(threads)
+    try:
+        while running:
+            spec, item = queue.get()
+            if item is _DONE:
+                running -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield from map(spec.index_class.from_hit, item)
+    finally:
+        stop.set()
+        # Unblock threads waiting for free space in the queue
+        while any(thread.is_alive() for thread in threads):
+            while not queue.empty():
+                queue.get_nowait()
+            for thread in threads:
+                thread.join(timeout=0.01)
@@ -0,0 +1,149 @@
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from elasticsearch.serializer import JsonSerializer as TransportJsonSerializer
+from elasticsearch.serializer import NdjsonSerializer as TransportNdjsonSerializer
+
+from pylastic.types.date import Date
+from pylastic.utils.arrays import numpy
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def default(obj: Any) -> Any:
+    """
+    Convert an object that JSON can't represent natively:
+    - `datetime` and `date` -> timestamp in milliseconds (see `pylastic.types.Date`)
+    - NumPy scalars and arrays -> Python numbers and lists
+    - Objects with `__geo_interface__` (e.g. shapely points) -> GeoJSON
+    - Objects with `lat` and `lon` attributes -> `{"lat": ..., "lon": ...}`
+    - `Decimal` -> float, `UUID` -> str, sets and tuples -> lists
+
+    :raises TypeError: If the object is not supported
+    """
+    if isinstance(obj, date):
+        return Date.get_valid_object(obj)
+
+    if numpy is not None:
+        if isinstance(obj, numpy.generic):
+            return obj.item()
+        if isinstance(obj, numpy.ndarray):
+            return obj.tolist()
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    if isinstance(obj, UUID):
+        return str(obj)
+
+    if isinstance(obj, (set, frozenset, tuple)):
+        # Tuples (including named tuples) are arrays, like the standard library encodes them
+        return list(obj)
+
+    if hasattr(obj, "__geo_interface__"):
+        return obj.__geo_interface__
+
+    if hasattr(obj, "lat") and hasattr(obj, "lon"):
+        return {"lat": obj.lat, "lon": obj.lon}
+
+    raise TypeError(f"Unable to serialize {obj!r} (type: {type(obj).__name__})")
+
+
+class JSONSerializer:
+    """
+    Standard library JSON serializer. Used when no faster encoder is installed
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(
+            obj, default=default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8", "surrogatepass")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    `orjson` serializer (https://github.com/ijl/orjson)
+    """
+
+    name = "orjson"
+
+    # Dates go through `default` to be stored as timestamps, like the standard library serializer does
+    OPTIONS = (
+        (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        if orjson
+        else 0
+    )
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=default, option=self.OPTIONS)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+SERIALIZERS = {JSONSerializer.name: JSONSerializer, OrjsonSerializer.name: OrjsonSerializer}
+
+
+def get_serializer(serializer: Optional[JSONSerializer | str] = None) -> JSONSerializer:
+    """
+    Get a serializer
+
+    :param serializer: Serializer instance or name (`json`, `orjson`). If `None`, the fastest installed one is used
+    """
+    if isinstance(serializer, JSONSerializer):
+        return serializer
+
+    if serializer is None:
+        serializer = OrjsonSerializer.name if orjson else JSONSerializer.name
+
+    if serializer == OrjsonSerializer.name and orjson is None:
+        raise RuntimeError("`orjson` serializer requires the `orjson` package")
+
+    try:
+        return SERIALIZERS[serializer]()
+    except KeyError:
+        raise ValueError(f"Unknown serializer: {serializer}") from None
+
+
+class _TransportJsonSerializer(TransportJsonSerializer):
+    def __init__(self, serializer: JSONSerializer):
+        self.serializer = serializer
+
+    def json_dumps(self, data: Any) -> bytes:
+        return self.serializer.dumps(data)
+
+    def json_loads(self, data: bytes) -> Any:
+        # Responses with `Content-Type: application/json` can be empty
+        if data == b"":
+            return None
+        return self.serializer.loads(data)
+
+
+class _TransportNdjsonSerializer(TransportNdjsonSerializer, _TransportJsonSerializer):
+    def json_dumps(self, data: Any) -> bytes:
+        return _TransportJsonSerializer.json_dumps(self, data)
+
+    def json_loads(self, data: bytes) -> Any:
+        return _TransportJsonSerializer.json_loads(self, data)
+
+
+def get_transport_serializers(serializer: JSONSerializer) -> Dict[str, Any]:
+    """
+    Wrap a serializer for the `serializers` argument of `Elasticsearch`, so that search, index creation and other
+    request bodies are encoded the same way bulk bodies are
+    """
+    return {
+        "application/json": _TransportJsonSerializer(serializer),
+        "application/x-ndjson": _TransportNdjsonSerializer(serializer),
+    }
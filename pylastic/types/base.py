@@ -1,4 +1,6 @@
-from typing import Any, Optional
+from typing import Any, List, Optional, Sequence, Tuple
+
+from pylastic.utils.arrays import is_numpy_array
 
 
 class ElasticType:
@@ -51,6 +53,32 @@ class ElasticType:
         """
         return value
 
+    @classmethod
+    def validate_array(cls, values: Sequence[Any]) -> Tuple[Sequence[bool], Sequence[Any]]:
+        """
+        Validate many values at once. Subclasses override this method with array-based implementations.
+
+        :param values: Values to validate (a sequence or a NumPy array)
+        :return: Validity mask and normalized values (results of `get_valid_object`). If `values` is a NumPy array,
+        subclasses may return NumPy arrays, and normalized values where the mask is `False` are undefined
+        """
+        if is_numpy_array(values):
+            values = values.tolist()
+
+        mask: List[bool] = []
+        normalized: List[Any] = []
+        get_valid_object = cls.get_valid_object
+        for value in values:
+            try:
+                valid = get_valid_object(value)
+            except Exception:  # noqa
+                valid = None
+
+            mask.append(valid is not None)
+            normalized.append(valid)
+
+        return mask, normalized
+
     @staticmethod
     def get_mapping_of(class_or_instance) -> dict:
         """
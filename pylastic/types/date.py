@@ -1,8 +1,13 @@
 from datetime import date, datetime
 from time import mktime
-from typing import Any, Optional
+from typing import Any, List, Optional, Sequence, Tuple
 
 from pylastic.types.base import ElasticType
+from pylastic.utils.arrays import is_numpy_array, numpy
+
+
+def _from_str(value: str) -> Optional[int]:
+    return int(value) if value.isdigit() else None
 
 
 class Date(ElasticType):
@@ -21,7 +26,7 @@ class Date(ElasticType):
             return int(value.timestamp() * 1_000)
 
         if isinstance(value, date):
-            return mktime(value.timetuple())
+            return int(mktime(value.timetuple()) * 1_000)
 
         if isinstance(value, (float, int)):
             return int(value)
@@ -30,3 +35,45 @@ class Date(ElasticType):
             return int(value)
 
         return None
+
+    # Converters for exact value types, so that `validate_array` doesn't go through the `isinstance` chain for every value
+    _converters = {
+        int: int,
+        float: int,
+        str: _from_str,
+        datetime: lambda value: int(value.timestamp() * 1_000),
+        date: lambda value: int(mktime(value.timetuple()) * 1_000),
+    }
+
+    @classmethod
+    def validate_array(cls, values: Sequence[Any]) -> Tuple[Sequence[bool], Sequence[Any]]:
+        """
+        Validate and convert many dates to timestamps in milliseconds.
+        NumPy `datetime64` and numeric arrays are converted without a Python-level loop
+        """
+        if is_numpy_array(values):
+            kind = values.dtype.kind
+            if kind == "M":
+                return ~numpy.isnat(values), values.astype("datetime64[ms]").astype(numpy.int64)
+            if kind in "iu":
+                return numpy.ones(len(values), dtype=bool), values.astype(numpy.int64)
+            if kind == "f":
+                mask = numpy.isfinite(values)
+                return mask, numpy.where(mask, values, 0).astype(numpy.int64)
+
+            values = values.tolist()
+
+        mask: List[bool] = []
+        normalized: List[Any] = []
+        converters = cls._converters
+        for value in values:
+            try:
+                converter = converters.get(value.__class__)
+                valid = converter(value) if converter else cls.get_valid_object(value)
+            except Exception:  # noqa
+                valid = None
+
+            mask.append(valid is not None)
+            normalized.append(valid)
+
+        return mask, normalized
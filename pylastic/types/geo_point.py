@@ -1,6 +1,7 @@
-from typing import Any, Optional
+from typing import Any, List, Optional, Sequence, Tuple
 
 from pylastic.types.base import ElasticType
+from pylastic.utils.arrays import is_numpy_array, numpy
 from pylastic.utils.coordinates import is_valid_longitude, is_valid_latitude
 
 
@@ -8,14 +9,14 @@ class GeoPoint(ElasticType):
     class Meta:
         type = "geo_point"
 
-    @classmethod
-    def get_valid_object(cls, value: Any) -> Optional[Any]:
+    @staticmethod
+    def get_lat_lon(value: Any) -> Tuple[Any, Any]:
         """
-        Construct a GeoPoint
-        https://www.elastic.co/guide/en/elasticsearch/reference/current/geo-point.html
-
+        Extract latitude and longitude from any supported geo point definition.
         Check the order (lat, lon) vs (lon, lat)! Different geo field definition formats might have them in the different
         order!
+
+        :return: (lat, lon). Either can be `None` if the definition is not recognized
         """
         lat, lon = None, None
 
@@ -26,7 +27,7 @@ class GeoPoint(ElasticType):
             ):
                 lon, lat = value["coordinates"]
 
-            if value.get("lat") and value.get("lon"):
+            if value.get("lat") is not None and value.get("lon") is not None:
                 lat, lon = value["lat"], value["lon"]
 
         elif isinstance(value, list):
@@ -42,11 +43,55 @@ class GeoPoint(ElasticType):
             if not lon or not lat:
                 lat, lon = value.replace(" ", "").split(",")
 
+        return lat, lon
+
+    @classmethod
+    def get_valid_object(cls, value: Any) -> Optional[Any]:
+        """
+        Construct a GeoPoint
+        https://www.elastic.co/guide/en/elasticsearch/reference/current/geo-point.html
+        """
+        lat, lon = cls.get_lat_lon(value)
+
         if (
-            not all([lat, lon])
+            lat is None
+            or lon is None
             or not is_valid_longitude(float(lon))
             or not is_valid_latitude(float(lat))
         ):
             return None
 
         return value
+
+    @classmethod
+    def validate_array(cls, values: Sequence[Any]) -> Tuple[Sequence[bool], Sequence[Any]]:
+        """
+        Validate many geo points at once.
+        A NumPy array of shape (N, 2) is treated as [lon, lat] pairs and checked without a Python-level loop.
+        Otherwise, coordinates are extracted point by point and range-checked together
+        """
+        if is_numpy_array(values) and values.ndim == 2 and values.shape[1] == 2:
+            lon, lat = values[:, 0].astype(float), values[:, 1].astype(float)
+            mask = (numpy.abs(lat) <= 90) & (numpy.abs(lon) <= 180)
+            return mask, values
+
+        if is_numpy_array(values):
+            values = values.tolist()
+
+        mask: List[bool] = []
+        get_lat_lon = cls.get_lat_lon
+        for value in values:
+            try:
+                lat, lon = get_lat_lon(value)
+                valid = (
+                    lat is not None
+                    and lon is not None
+                    and -90 <= float(lat) <= 90
+                    and -180 <= float(lon) <= 180
+                )
+            except Exception:  # noqa
+                valid = False
+
+            mask.append(valid)
+
+        return mask, [value if valid else None for value, valid in zip(values, mask)]
@@ -1,4 +1,12 @@
+from math import isfinite
+from numbers import Integral, Real
+from typing import Any, List, Optional, Sequence, Tuple
+
 from pylastic.types.base import ElasticType
+from pylastic.utils.arrays import is_numpy_array, numpy
+
+LONG_MIN = -(2**63)
+LONG_MAX = 2**63 - 1
 
 
 class Long(ElasticType):
@@ -10,3 +18,62 @@ class Long(ElasticType):
 
     class Meta:
         type = "long"
+
+    @classmethod
+    def get_valid_object(cls, value: Any) -> Optional[Any]:
+        """
+        Construct a Long. Floats are truncated and numeric strings are parsed (ES `coerce` behaviour)
+
+        Returns the value as an `int` if it's within the signed 64-bit range. Bools are rejected
+        """
+        if isinstance(value, bool):
+            return None
+
+        # `Integral` and `Real` include NumPy scalars, e.g. `numpy.int64`
+        if isinstance(value, Integral):
+            number = int(value)
+        elif isinstance(value, Real):
+            if not isfinite(value):
+                return None
+            number = int(value)
+        elif isinstance(value, str):
+            try:
+                number = int(value)
+            except ValueError:
+                return None
+        else:
+            return None
+
+        return number if LONG_MIN <= number <= LONG_MAX else None
+
+    @classmethod
+    def validate_array(cls, values: Sequence[Any]) -> Tuple[Sequence[bool], Sequence[Any]]:
+        """
+        Validate many longs at once. Numeric NumPy arrays are checked without a Python-level loop
+        """
+        if is_numpy_array(values):
+            kind = values.dtype.kind
+            if kind == "i":
+                return numpy.ones(len(values), dtype=bool), values.astype(numpy.int64)
+            if kind == "u":
+                mask = values <= LONG_MAX
+                return mask, numpy.where(mask, values, 0).astype(numpy.int64)
+            if kind == "f":
+                # 2**63 is exactly representable as a float, and every float below it fits
+                mask = numpy.isfinite(values) & (values >= LONG_MIN) & (values < 2.0**63)
+                return mask, numpy.where(mask, values, 0).astype(numpy.int64)
+
+            values = values.tolist()
+
+        mask: List[bool] = []
+        normalized: List[Any] = []
+        for value in values:
+            if value.__class__ is int:
+                valid = value if LONG_MIN <= value <= LONG_MAX else None
+            else:
+                valid = cls.get_valid_object(value)
+
+            mask.append(valid is not None)
+            normalized.append(valid)
+
+        return mask, normalized
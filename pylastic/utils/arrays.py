@@ -0,0 +1,13 @@
+from typing import Any
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional
+    numpy = None
+
+
+def is_numpy_array(values: Any) -> bool:
+    """
+    Check if `values` is a NumPy array (always `False` if NumPy is not installed)
+    """
+    return numpy is not None and isinstance(values, numpy.ndarray)
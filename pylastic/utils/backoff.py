@@ -0,0 +1,14 @@
+import random
+
+
+def get_backoff_delay(attempt: int, initial_backoff: float, max_backoff: float) -> float:
+    """
+    Compute a delay before the next retry using exponential backoff with full jitter
+    https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+
+    :param attempt: Number of the attempt that has just failed, starting from 0
+    :param initial_backoff: Delay cap (in seconds) after the first failure
+    :param max_backoff: Max delay in seconds
+    :return: Delay in seconds
+    """
+    return random.uniform(0, min(max_backoff, initial_backoff * 2**attempt))
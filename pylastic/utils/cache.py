@@ -0,0 +1,244 @@
+import json
+import time
+from collections import OrderedDict, deque
+from fnmatch import fnmatchcase
+from threading import Lock
+from typing import Any, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+
+def split_index_names(index: str | Iterable[str]) -> Tuple[str, ...]:
+    """
+    Split an index expression (`"a,b"` or `["a", "b"]`) into a sorted tuple of names
+    """
+    if isinstance(index, str):
+        index = index.split(",")
+    return tuple(sorted({name.strip() for name in index if name and name.strip()}))
+
+
+class _Entry(NamedTuple):
+    indexes: Tuple[str, ...]
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of search and count responses.
+
+    Entries are keyed by the operation, the target indexes and the normalized request (keys are sorted, so the order
+    of kwargs and body keys doesn't matter). The least recently used entries are evicted when there are more than
+    `max_entries` entries or their size exceeds `max_size`, and entries expire after `ttl` seconds. The size of an entry
+    is the length of the response body, or of its JSON encoding if the length isn't known.
+
+    Cached responses are shared between callers and must not be modified.
+    Only changes made through the client the cache is attached to invalidate entries.
+
+    Every invalidation bumps `generation`. A caller takes the generation before sending a request and passes it to `put`,
+    so that a response read before a concurrent write isn't cached after the write has invalidated the index.
+    """
+
+    # Number of recent invalidations kept to check responses against. Older responses are not cached
+    MAX_INVALIDATIONS = 1_024
+
+    def __init__(
+        self,
+        max_entries: int = 1_024,
+        max_size: Optional[int] = 64,
+        ttl: Optional[float] = 60,
+    ):
+        """
+        :param max_entries: Max number of cached responses
+        :param max_size: Max size of the cached responses in MB. Unlimited if `None`
+        :param ttl: How long (in seconds) a response is kept. Forever (until invalidated or evicted) if `None`
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size * 1024 * 1024 if max_size is not None else None
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self.generation = 0
+        # (<generation>, <invalidated index names or `None` for all>)
+        self._invalidations: deque = deque(maxlen=self.MAX_INVALIDATIONS)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(operation: str, index: str | Iterable[str], request: dict) -> Hashable:
+        """
+        Build a cache key
+
+        :param operation: Name of the operation, e.g. `search`
+        :param index: Target index(es)
+        :param request: Request kwargs, without the index
+        """
+        return (
+            operation,
+            split_index_names(index),
+            json.dumps(request, sort_keys=True, separators=(",", ":"), default=str),
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached response and mark it as recently used
+
+        :return: Cached response or `default`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None, size: Optional[int] = None) -> None:
+        """
+        Cache a response. The key must be built with `get_key`.
+        Responses larger than `max_size` are not cached
+
+        :param generation: `generation` taken before the request was sent. If an index the request targeted has been
+         invalidated since, the response may be stale and isn't cached
+        :param size: Size of the response body in bytes (e.g. its `content-length`). Estimated from the JSON encoding
+         of `value` if `None`
+        """
+        if size is None:
+            size = len(json.dumps(value, separators=(",", ":"), default=str))
+        if self.max_size is not None and size > self.max_size:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if generation is not None and self._is_stale(key[1], generation):
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _Entry(key[1], value, size, expires_at)
+            self.size += size
+            while len(self._entries) > self.max_entries or (
+                self.max_size is not None and self.size > self.max_size
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, index: str | Iterable[str]) -> int:
+        """
+        Drop the responses of requests that targeted the index(es), including wildcard patterns that match them
+
+        :param index: Name(s) of the changed index(es)
+        :return: Number of dropped responses
+        """
+        names = split_index_names(index)
+        with self._lock:
+            self.generation += 1
+            self._invalidations.append((self.generation, names))
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if any(_targets(entry.indexes, name) for name in names)
+            ]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Drop all responses. Counters are kept
+        """
+        with self._lock:
+            self.generation += 1
+            self._invalidations.append((self.generation, None))
+            self._entries.clear()
+            self.size = 0
+
+    def _is_stale(self, indexes: Tuple[str, ...], generation: int) -> bool:
+        """
+        Whether any of `indexes` was invalidated after `generation`. Must be called with the lock held
+        """
+        if generation >= self.generation:
+            return False
+        # Invalidations right after `generation` were dropped from the log, so they can't be checked
+        if not self._invalidations or self._invalidations[0][0] > generation + 1:
+            return True
+
+        return any(
+            names is None or any(_targets(indexes, name) for name in names)
+            for invalidated_at, names in self._invalidations
+            if invalidated_at > generation
+        )
+
+    def _remove(self, key: Hashable) -> None:
+        self.size -= self._entries.pop(key).size
+
+
+def _targets(patterns: Tuple[str, ...], name: str) -> bool:
+    """
+    Whether a request to `patterns` may have read `name`. `name` can be a pattern itself, e.g. all partitions of a class
+    """
+    # A request without explicit targets reads every index
+    if not patterns:
+        return True
+    return any(
+        pattern == "_all" or fnmatchcase(name, pattern) or fnmatchcase(pattern, name) for pattern in patterns
+    )
+
+
+class KnownIndexes:
+    """
+    Thread-safe set of index names that are known to exist. Names are forgotten after `ttl` seconds,
+    so indexes deleted by someone else are eventually re-created
+    """
+
+    def __init__(self, ttl: Optional[float] = 300):
+        """
+        :param ttl: How long (in seconds) an index is considered to exist. Forever if `None`
+        """
+        self.ttl = ttl
+        self._expires_at: dict = {}
+        self._next_prune = time.monotonic() + ttl if ttl is not None else None
+        self._lock = Lock()
+
+    def __contains__(self, index_name: str) -> bool:
+        # Names that were never added are expired at 0
+        expires_at = self._expires_at.get(index_name, 0)
+        return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def add(self, index_name: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expires_at[index_name] = now + self.ttl if self.ttl is not None else None
+            # Time-partitioned names keep coming, so expired ones are dropped (at most once per `ttl`)
+            if self._next_prune is not None and now >= self._next_prune:
+                self._next_prune = now + self.ttl
+                for name in [name for name, expires_at in self._expires_at.items() if expires_at <= now]:
+                    del self._expires_at[name]
+
+    def discard(self, index_name: str) -> None:
+        with self._lock:
+            self._expires_at.pop(index_name, None)
+
+    def discard_matching(self, pattern: str) -> None:
+        """
+        Forget every index matching a wildcard pattern, e.g. all partitions of a class
+        """
+        with self._lock:
+            for index_name in [name for name in self._expires_at if fnmatchcase(name, pattern)]:
+                del self._expires_at[index_name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at.clear()
@@ -0,0 +1,60 @@
+import gzip
+from threading import Lock
+from typing import Optional
+
+
+class GzipCompressor:
+    """
+    Gzip-compresses request bodies that are at least `min_size` bytes long and keeps track of how much was saved.
+    Thread-safe, so it can be shared by the worker threads that send requests
+    """
+
+    content_encoding = "gzip"
+
+    def __init__(self, min_size: int = 1024, level: int = 6):
+        """
+        :param min_size: Min body size in bytes. Smaller bodies are sent as is, since compressing them costs more than it saves
+        :param level: Compression level from 1 (fastest) to 9 (smallest)
+        """
+        if not 1 <= level <= 9:
+            raise ValueError(f"Compression level must be between 1 and 9, got {level}")
+
+        self.min_size = min_size
+        self.level = level
+        self.requests = 0  # Number of bodies that were passed to `compress`
+        self.compressed_requests = 0
+        self.bytes_before = 0  # Size of the bodies before compression (including those that weren't compressed)
+        self.bytes_after = 0  # Size of the bodies that were actually sent
+        self._lock = Lock()
+
+    def compress(self, body: bytes) -> Optional[bytes]:
+        """
+        Compress a body if it's large enough
+
+        :return: Compressed body or `None` if the body should be sent as is
+        """
+        compressed = gzip.compress(body, compresslevel=self.level) if len(body) >= self.min_size else None
+        with self._lock:
+            self.requests += 1
+            self.bytes_before += len(body)
+            if compressed is None:
+                self.bytes_after += len(body)
+            else:
+                self.compressed_requests += 1
+                self.bytes_after += len(compressed)
+
+        return compressed
+
+    @property
+    def ratio(self) -> float:
+        """
+        Total size of the bodies before compression divided by the total size of the sent bodies
+        """
+        return self.bytes_before / self.bytes_after if self.bytes_after else 1.0
+
+    def reset(self) -> None:
+        """
+        Reset the counters
+        """
+        with self._lock:
+            self.requests = self.compressed_requests = self.bytes_before = self.bytes_after = 0
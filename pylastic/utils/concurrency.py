@@ -0,0 +1,85 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition
+from typing import Any, Callable, Optional
+
+
+class BoundedExecutor:
+    """
+    Thread pool that limits the number of submitted-but-unfinished tasks and the total size (in bytes) of their payloads.
+    `submit` blocks until there's enough room, so a fast producer can't buffer an unbounded amount of data.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_in_flight: Optional[int] = None,
+        max_in_flight_bytes: Optional[int] = None,
+    ):
+        """
+        :param max_workers: Number of worker threads
+        :param max_in_flight: Max number of tasks that are queued or running. Defaults to `max_workers`
+        :param max_in_flight_bytes: Max total size of the tasks that are queued or running. Unlimited if `None`.
+        A single task larger than this limit is still accepted once nothing else is in flight.
+        """
+        self.max_in_flight = max_in_flight or max_workers
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._condition = Condition()
+        self._tasks = 0
+        self._bytes = 0
+
+    def _has_room_for(self, size: int) -> bool:
+        if not self._tasks:
+            return True
+
+        if self._tasks >= self.max_in_flight:
+            return False
+
+        return (
+            self.max_in_flight_bytes is None
+            or self._bytes + size <= self.max_in_flight_bytes
+        )
+
+    def _release(self, size: int) -> None:
+        with self._condition:
+            self._tasks -= 1
+            self._bytes -= size
+            self._condition.notify_all()
+
+    def submit(self, fn: Callable, *args, size: int = 0, **kwargs) -> Future:
+        """
+        Submit a task, blocking while the executor is full
+
+        :param fn: Function to run
+        :param size: Size of the data the task holds, in bytes
+        :return: Future of the task
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_room_for(size))
+            self._tasks += 1
+            self._bytes += size
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(size)
+            raise
+
+        future.add_done_callback(lambda _: self._release(size))
+        return future
+
+    def wait(self) -> None:
+        """
+        Block until every submitted task is finished
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: not self._tasks)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self) -> "BoundedExecutor":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.shutdown(wait=True, cancel_futures=exc_type is not None)
@@ -1,12 +1,11 @@
-from collections import defaultdict
-from typing import List, Dict, Sequence, Any
+from typing import List, Sequence, Any, Iterable
 
 from pylastic.utils.size import full_size_of
 
 
 def is_iterable(obj) -> bool:
     """
-    Check if an object is iterable
+    Check if an object is iterable. The object is not consumed, so it's safe to pass generators
     NOTE: considers strings and dicts non-iterable objects!
 
     :param obj:
@@ -16,19 +15,12 @@ def is_iterable(obj) -> bool:
         if isinstance(obj, (str, dict)):
             return False
 
-        _ = [i for i in obj]
+        iter(obj)
         return True
     except TypeError:
         return False
 
 
-def group_by_index(entries: List["ElasticIndex"]) -> Dict[str, List["ElasticIndex"]]:
-    indexes = defaultdict(list)
-    for entry in entries:
-        indexes[entry.get_index()].append(entry)
-    return indexes
-
-
 def get_batches_with_size(
     objects: Sequence[Any], max_size_bytes: int
 ) -> List[List[Any]]:
@@ -54,3 +46,27 @@ def get_batches_with_size(
     if current_batch:
         batches.append(current_batch)
     return batches
+
+
+def join_within_length(
+    strings: Iterable[str], max_length: int, separator: str = ","
+) -> List[str]:
+    """
+    Join unique strings into as few `separator`-separated strings as possible, none longer than `max_length`.
+    A string that is longer than `max_length` on its own is returned as is
+
+    :param strings: Strings to join, e.g. index names
+    :param max_length: Max length of a joined string
+    :param separator: Separator
+    :return: List of joined strings
+    """
+    joined = []
+    current = ""
+    for string in dict.fromkeys(strings):
+        if current and len(current) + len(separator) + len(string) > max_length:
+            joined.append(current)
+            current = ""
+        current = f"{current}{separator}{string}" if current else string
+    if current:
+        joined.append(current)
+    return joined
@@ -0,0 +1,129 @@
+import pytest
+
+from pylastic.bulk import BatchRouter, BulkEncoder, get_refresh_policy, route_encoded_batches
+from pylastic.indexes import ElasticIndex
+
+
+class Example(ElasticIndex):
+    a: str
+    b: int
+
+    class Meta:
+        index = "example"
+
+
+documents = [Example(a="x" * i, b=i) for i in range(100)]
+encoded_sizes = [len(BulkEncoder().encode(d)) for d in documents]
+
+
+def test_batches_do_not_exceed_size():
+    max_size = sum(encoded_sizes) // 7
+    batches = list(route_encoded_batches(documents, max_size))
+
+    assert all(batch.nbytes <= max_size for batch in batches)
+    assert [d for batch in batches for d in batch.documents] == documents
+    assert sum(batch.nbytes for batch in batches) == sum(encoded_sizes)
+
+
+def test_max_documents():
+    batches = list(route_encoded_batches(documents, 10**9, max_documents=30))
+    assert [len(batch) for batch in batches] == [30, 30, 30, 10]
+
+
+def test_oversized_document():
+    batches = list(route_encoded_batches(documents[-2:], 1))
+    assert [len(batch) for batch in batches] == [1, 1]
+
+
+def test_documents_are_encoded_once():
+    calls = []
+
+    class CountingEncoder(BulkEncoder):
+        def encode(self, document, index=None):
+            calls.append(document)
+            return super().encode(document, index)
+
+    batches = list(route_encoded_batches(documents, 500, encoder=CountingEncoder()))
+    assert len(calls) == len(documents)
+    assert batches[0].get_request().body == b"".join(batches[0].chunks)
+
+
+class Other(ElasticIndex):
+    a: str
+
+    class Meta:
+        index = "other"
+
+
+def test_route_encoded_batches():
+    def _documents():
+        for i in range(25):
+            yield Example(a="a", b=i)
+            yield Other(a=str(i))
+
+    batches = list(route_encoded_batches(_documents(), 10**9, max_documents=10))
+
+    assert [(batch.index, len(batch)) for batch in batches] == [
+        ("example", 10),
+        ("other", 10),
+        ("example", 10),
+        ("other", 10),
+        ("example", 5),
+        ("other", 5),
+    ]
+    assert [d.b for d in batches[0].documents] == list(range(10))
+
+
+def test_route_encoded_batches_is_lazy():
+    consumed = []
+
+    def _documents():
+        for i in range(100):
+            consumed.append(i)
+            yield Example(a="a", b=i)
+
+    batches = route_encoded_batches(_documents(), 10**9, max_documents=10)
+    next(batches)
+    assert len(consumed) == 11
+
+
+def test_route_encoded_batches_bounds_buffered_memory():
+    class Partitioned(ElasticIndex):
+        a: str
+        day: int
+
+        def get_index(self):
+            return f"events-{self.day}"
+
+    # Documents spread round-robin over 50 indexes
+    documents = [Partitioned(a="x" * 50, day=i % 50) for i in range(2_000)]
+    max_size = 4_096
+    router = BatchRouter(max_size)
+    encoder = BulkEncoder()
+    batches = []
+    for document in documents:
+        batches.extend(router.add(document.get_index(), document, encoder.encode(document)))
+        assert router.buffered_bytes <= max_size
+        assert router.buffered_bytes == sum(batch.nbytes for batch in router.batches.values())
+    batches.extend(router.pop_all())
+
+    assert all(batch.nbytes <= max_size for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(documents)
+    assert len({batch.index for batch in batches}) == 50
+
+    routed = list(route_encoded_batches(documents, max_size, max_buffered_bytes=2 * max_size))
+    assert sum(len(batch) for batch in routed) == len(documents)
+    assert all(len({d.day for d in batch.documents}) == 1 for batch in routed)
+
+
+def test_refresh_policy():
+    assert get_refresh_policy(False) is None
+    assert get_refresh_policy("false") is None
+    assert get_refresh_policy(True) == "true"
+    assert get_refresh_policy("wait_for") == "wait_for"
+    with pytest.raises(ValueError):
+        get_refresh_policy("sometimes")
+
+    (batch,) = route_encoded_batches(documents[:2], 1024 * 1024)
+    assert "refresh" not in batch.get_request().query_params
+    assert batch.get_request(refresh="wait_for").query_params["refresh"] == "wait_for"
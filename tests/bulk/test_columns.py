@@ -0,0 +1,103 @@
+import json
+from typing import Optional
+
+import pytest
+
+from pylastic.bulk import get_column_batches, prepare_columns, validate_columns
+from pylastic.indexes import ElasticIndex
+from pylastic.types import Date, GeoPoint
+
+
+class Measurement(ElasticIndex):
+    sensor: str
+    timestamp: Date
+    value: float
+    location: Optional[GeoPoint] = None
+
+    class Meta:
+        index = "measurements"
+        id_field = "sensor"
+
+
+class ArrayLike:
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def tolist(self):
+        return list(self.values)
+
+
+columns = {
+    "sensor": ["a", "b", "c"],
+    "timestamp": ArrayLike([1, 2, 3]),
+    "value": (0.5, 1.5, 2.5),
+}
+
+
+def test_prepare_columns():
+    prepared = prepare_columns(Measurement, columns)
+    assert list(prepared) == ["sensor", "timestamp", "value", "location"]
+    assert prepared["timestamp"] == [1, 2, 3]
+    assert prepared["location"] == [None, None, None]
+
+
+def test_unknown_column():
+    with pytest.raises(ValueError, match="no fields unknown"):
+        prepare_columns(Measurement, {**columns, "unknown": [1, 2, 3]})
+
+
+def test_missing_column():
+    with pytest.raises(ValueError, match="Measurement.value"):
+        prepare_columns(Measurement, {"sensor": ["a"], "timestamp": [1]})
+
+
+def test_different_lengths():
+    with pytest.raises(ValueError, match="different lengths"):
+        prepare_columns(Measurement, {**columns, "value": [1.0]})
+
+
+def test_validate_columns():
+    validate_columns(Measurement, prepare_columns(Measurement, columns))
+
+    with pytest.raises(ValueError, match=r"Measurement.timestamp in rows 1"):
+        validate_columns(
+            Measurement,
+            prepare_columns(Measurement, {**columns, "timestamp": [1, "x", 3]}),
+        )
+
+    with pytest.raises(ValueError, match=r"Measurement.location in rows 2"):
+        validate_columns(
+            Measurement,
+            prepare_columns(
+                Measurement, {**columns, "location": [None, [1, 1], [1, 100]]}
+            ),
+        )
+
+
+def test_get_column_batches():
+    prepared = prepare_columns(Measurement, columns)
+    batches = list(
+        get_column_batches(Measurement, "measurements", prepared, 10**6, max_documents=2)
+    )
+    assert [batch.documents for batch in batches] == [[0, 1], [2]]
+
+    lines = batches[0].get_body().splitlines()
+    assert json.loads(lines[0]) == {"index": {"_index": "measurements", "_id": "a"}}
+    assert json.loads(lines[1]) == {"timestamp": 1, "value": 0.5, "location": None}
+
+
+@pytest.mark.parametrize("unit", ["ns", "us", "ms"])
+def test_datetime64_columns(unit):
+    numpy = pytest.importorskip("numpy")
+    timestamps = numpy.array(["2024-01-01T00:00:00.001", "NaT"], dtype=f"datetime64[{unit}]")
+    prepared = prepare_columns(Measurement, {"sensor": ["a", "b"], "timestamp": timestamps, "value": [1.0, 2.0]})
+    assert prepared["timestamp"] == [1704067200001, None]
+
+    with pytest.raises(ValueError, match="rows 1"):
+        validate_columns(Measurement, prepared)
+
+    batch = next(get_column_batches(Measurement, "measurements", prepared, 10**6))
+    assert json.loads(batch.get_body().splitlines()[1])["timestamp"] == 1704067200001
@@ -0,0 +1,70 @@
+import json
+
+from pylastic.bulk import BulkEncoder
+from pylastic.indexes import ElasticIndex
+
+
+class Example(ElasticIndex):
+    a: str
+    b: int
+
+    class Meta:
+        index = "example"
+
+
+class CustomIdExample(ElasticIndex):
+    key: str
+    value: int
+
+    class Meta:
+        index = "custom"
+        id_field = "key"
+
+
+def test_encode():
+    encoded = BulkEncoder().encode(Example(a="ü", b=1))
+    action, source, tail = encoded.split(b"\n")
+    assert json.loads(action) == {"index": {"_index": "example"}}
+    assert json.loads(source) == {"a": "ü", "b": 1}
+    assert tail == b""
+
+
+def test_encode_with_id():
+    encoded = BulkEncoder(op_type="create").encode(CustomIdExample(key="k", value=2))
+    action, source, _ = encoded.split(b"\n")
+    assert json.loads(action) == {"create": {"_index": "custom", "_id": "k"}}
+    assert json.loads(source) == {"value": 2}
+
+
+def test_action_prefix_is_cached():
+    encoder = BulkEncoder()
+    assert encoder.get_action_prefix("example") is encoder.get_action_prefix("example")
+
+
+def test_buffer():
+    encoder = BulkEncoder()
+    documents = [Example(a=str(i), b=i) for i in range(10)]
+    written = encoder.extend(documents)
+
+    assert written == encoder.nbytes == len(encoder.getvalue())
+    assert encoder.documents == 10
+    assert encoder.getvalue() == b"".join(encoder.iter_encoded(documents))
+
+    encoder.clear()
+    assert encoder.nbytes == 0
+    assert encoder.documents == 0
+
+
+def test_get_batch_create_request():
+    request = ElasticIndex.get_batch_create_request([Example(a="a", b=1)])
+    assert request.method == "POST"
+    assert request.path == "/_bulk"
+    assert request.headers == {"content-type": "application/x-ndjson"}
+    assert request.body == b'{"index":{"_index":"example"}}\n{"a":"a","b":1}\n'
+
+
+def test_get_batch_create_request_reuses_empty_encoder():
+    # An empty encoder is falsy (its `__len__` is 0), but must still be reused
+    encoder = BulkEncoder()
+    ElasticIndex.get_batch_create_request([Example(a="a", b=1)], encoder)
+    assert encoder.documents == 1
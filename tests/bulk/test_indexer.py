@@ -0,0 +1,234 @@
+import threading
+import time
+from queue import Full
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from elastic_transport import ObjectApiResponse
+
+from pylastic.client import ElasticClient
+from pylastic.indexes import ElasticIndex
+
+
+class Example(ElasticIndex):
+    a: str
+    b: int
+
+    class Meta:
+        index = "example"
+
+
+@pytest.fixture
+def client():
+    with patch("pylastic.client.Elasticsearch", MagicMock()):
+        client = ElasticClient(host="localhost", port=1, username="u", password="p")
+    client.es_client.perform_request.return_value = _response()
+    return client
+
+
+def _response():
+    return ObjectApiResponse(body={"errors": False, "acknowledged": True}, meta=MagicMock())
+
+
+def _bulk_bodies(client):
+    return [
+        c.kwargs["body"]
+        for c in client.es_client.perform_request.call_args_list
+        if c.kwargs["path"] == "/_bulk"
+    ]
+
+
+def test_flush_on_document_count(client):
+    with client.bulk_indexer(max_batch_documents=10, flush_interval=60) as indexer:
+        for i in range(25):
+            indexer.add(Example(a=str(i), b=i))
+
+    bodies = _bulk_bodies(client)
+    assert [body.count(b"\n") // 2 for body in bodies] == [10, 10, 5]
+    assert indexer.report.succeeded == 25
+    # The index is created once, before the first batch
+    assert client.es_client.perform_request.call_args_list[0].kwargs["path"] == "/example"
+
+
+def test_flush_on_size(client):
+    with client.bulk_indexer(max_batch_documents=None, flush_interval=60) as indexer:
+        indexer.max_batch_bytes = 100
+        for i in range(10):
+            indexer.add(Example(a="x" * 40, b=i))
+
+    assert all(len(body) <= 100 for body in _bulk_bodies(client))
+    assert indexer.report.succeeded == 10
+
+
+def test_flush_on_interval(client):
+    indexer = client.bulk_indexer(flush_interval=0.05)
+    indexer.add(Example(a="a", b=1))
+    deadline = time.monotonic() + 2
+    while not _bulk_bodies(client) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(_bulk_bodies(client)) == 1
+    indexer.close()
+
+
+def test_explicit_flush(client):
+    indexer = client.bulk_indexer(flush_interval=60)
+    indexer.add(Example(a="a", b=1))
+    indexer.flush()
+    assert len(_bulk_bodies(client)) == 1
+    assert indexer.close().succeeded == 1
+
+
+def test_concurrent_producers(client):
+    with client.bulk_indexer(max_batch_documents=7, concurrency=3, flush_interval=60) as indexer:
+
+        def _produce(offset):
+            for i in range(100):
+                indexer.add(Example(a=str(offset + i), b=i))
+
+        threads = [threading.Thread(target=_produce, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert indexer.report.succeeded == 400
+    assert sum(body.count(b"\n") // 2 for body in _bulk_bodies(client)) == 400
+
+
+def test_backpressure(client):
+    sending = threading.Event()
+    release = threading.Event()
+
+    def _perform_request(**kwargs):
+        if kwargs["path"] == "/_bulk":
+            sending.set()
+            release.wait()
+        return _response()
+
+    client.es_client.perform_request.side_effect = _perform_request
+    indexer = client.bulk_indexer(max_batch_documents=1, max_queue_size=2, flush_interval=60)
+    indexer.add(Example(a="a", b=0))
+    indexer.add(Example(a="a", b=1))
+    assert sending.wait(2)
+
+    # The background thread is stuck sending, so the queue fills up
+    indexer.add(Example(a="a", b=2))
+    indexer.add(Example(a="a", b=3))
+    with pytest.raises(Full):
+        indexer.add(Example(a="a", b=4), timeout=0.05)
+
+    release.set()
+    assert indexer.close().succeeded == 4
+
+
+def test_timeout_while_another_producer_waits(client):
+    sending = threading.Event()
+    release = threading.Event()
+
+    def _perform_request(**kwargs):
+        if kwargs["path"] == "/_bulk":
+            sending.set()
+            release.wait()
+        return _response()
+
+    client.es_client.perform_request.side_effect = _perform_request
+    indexer = client.bulk_indexer(max_batch_documents=1, max_queue_size=1, flush_interval=60)
+    indexer.add(Example(a="a", b=0))
+    indexer.add(Example(a="a", b=1))
+    assert sending.wait(2)
+    indexer.add(Example(a="a", b=2))
+
+    # Waits for room in the queue without a timeout
+    blocked = threading.Thread(target=indexer.add, args=(Example(a="a", b=3),))
+    blocked.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    with pytest.raises(Full):
+        indexer.add(Example(a="a", b=4), timeout=0.05)
+    assert time.monotonic() - started < 1
+
+    release.set()
+    blocked.join()
+    assert indexer.close().succeeded == 4
+
+
+def test_failed_requests_are_reported(client):
+    client.create_index_for = Mock()
+    client.es_client.perform_request.side_effect = ConnectionError("down")
+    with client.bulk_indexer(max_retries=0) as indexer:
+        documents = [Example(a="a", b=i) for i in range(3)]
+        for document in documents:
+            indexer.add(document)
+
+    report = indexer.report
+    assert [f.document for f in report.failures] == documents
+    assert report.failures[0].error == {"type": "ConnectionError", "reason": "down"}
+
+
+def test_closed_indexer(client):
+    indexer = client.bulk_indexer()
+    indexer.close()
+    indexer.close()
+    with pytest.raises(RuntimeError):
+        indexer.add(Example(a="a", b=1))
+
+
+def test_flush_after_close(client):
+    indexer = client.bulk_indexer()
+    indexer.add(Example(a="a", b=1))
+    assert indexer.close().succeeded == 1
+    with pytest.raises(RuntimeError):
+        indexer.flush()
+
+
+def test_add_racing_with_close(client):
+    indexer = client.bulk_indexer(flush_interval=60)
+    added = []
+
+    def _produce():
+        for i in range(1_000):
+            try:
+                indexer.add(Example(a="a", b=i))
+            except RuntimeError:
+                return
+            added.append(i)
+
+    thread = threading.Thread(target=_produce)
+    thread.start()
+    time.sleep(0.01)
+    report = indexer.close()
+    thread.join()
+
+    # Every document that was accepted is saved
+    assert report.succeeded == len(added)
+
+
+class Other(ElasticIndex):
+    a: str
+
+    class Meta:
+        index = "other"
+
+
+def test_flush_on_interval_under_load(client):
+    def _perform_request(**kwargs):
+        time.sleep(0.01)
+        return _response()
+
+    client.es_client.perform_request.side_effect = _perform_request
+    indexer = client.bulk_indexer(
+        max_batch_documents=5, max_queue_size=20, flush_interval=0.05, create_indexes=False
+    )
+    indexer.add(Other(a="quiet"))
+    # A busy index keeps the queue non-empty for longer than `flush_interval`, since sending is slower than adding
+    deadline = time.monotonic() + 0.5
+    i = 0
+    while time.monotonic() < deadline and not any(b'"other"' in body for body in _bulk_bodies(client)):
+        indexer.add(Example(a="busy", b=i))
+        i += 1
+
+    assert not indexer._queue.empty()
+    assert any(b'"other"' in body for body in _bulk_bodies(client))
+    indexer.close()
@@ -0,0 +1,58 @@
+from pylastic.bulk import BulkBatch, BulkEncoder, parse_bulk_response
+from pylastic.indexes import ElasticIndex
+
+
+class Example(ElasticIndex):
+    a: str
+
+    class Meta:
+        index = "example"
+
+
+encoder = BulkEncoder()
+batch = BulkBatch(index="example")
+for letter in "abc":
+    document = Example(a=letter)
+    batch.add(document, encoder.encode(document))
+
+
+def test_no_errors():
+    assert parse_bulk_response(batch, {"errors": False, "took": 3}) == (3, [])
+
+
+def test_failures():
+    succeeded, failures = parse_bulk_response(
+        batch,
+        {
+            "errors": True,
+            "items": [
+                {"index": {"status": 201}},
+                {
+                    "index": {
+                        "status": 429,
+                        "error": {"type": "es_rejected_execution_exception"},
+                    }
+                },
+                {
+                    "index": {
+                        "status": 400,
+                        "error": {"type": "mapper_parsing_exception"},
+                    }
+                },
+            ],
+        },
+    )
+    assert succeeded == 1
+    assert [(f.position, f.status, f.retryable) for f in failures] == [
+        (1, 429, True),
+        (2, 400, False),
+    ]
+    assert failures[1].document is batch.documents[2]
+    assert failures[1].error_type == "mapper_parsing_exception"
+
+
+def test_subset_reuses_chunks():
+    subset = batch.subset([0, 2])
+    assert subset.documents == [batch.documents[0], batch.documents[2]]
+    assert subset.chunks[1] is batch.chunks[2]
+    assert subset.nbytes == len(batch.chunks[0]) + len(batch.chunks[2])
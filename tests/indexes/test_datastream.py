@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from pylastic.bulk import BulkEncoder, get_column_batches, prepare_columns
+from pylastic.indexes import ElasticIndex
+from pylastic.search.results import get_search_kwargs
+from pylastic.types import Date, Keyword
+
+
+class LogEntry(ElasticIndex):
+    created: Date
+    service: Keyword
+    message: str
+
+    class Meta:
+        is_datastream = True
+        index_prefix = "logs-app"
+        timestamp_field = "created"
+
+
+class Metric(ElasticIndex):
+    value: float
+
+    class Meta:
+        is_datastream = True
+        index = "metrics-app-default"
+
+
+def test_names():
+    entry = LogEntry(created=datetime(2023, 1, 1), service="api", message="hi")
+    assert entry.get_index() == "logs-app-default"
+    assert LogEntry.get_index_pattern() == "logs-app-*"
+    assert Metric.get_static_index() == Metric.get_index_pattern() == "metrics-app-default"
+
+
+def test_timestamp_field():
+    entry = LogEntry(created=1, service="api", message="hi")
+    assert entry.get_body() == {"@timestamp": 1, "service": "api", "message": "hi"}
+    assert "@timestamp" in LogEntry.get_mapping()["mappings"]["properties"]
+
+    hit = {"_id": "x", "_source": {"@timestamp": 1, "service": "api", "message": "hi"}}
+    assert LogEntry.from_hit(hit) == entry
+    assert get_search_kwargs(LogEntry)["source"] == ["@timestamp", "service", "message"]
+    assert get_search_kwargs(LogEntry, source_fields=["created"])["source"] == ["@timestamp"]
+
+
+def test_index_template_request():
+    request = LogEntry.get_index_template_request()
+    assert request.method == "PUT"
+    assert request.path == "/_index_template/logs-app"
+    assert request.body["index_patterns"] == ["logs-app-*"]
+    assert request.body["data_stream"] == {}
+    assert request.body["priority"] == 200
+    assert request.body["template"]["mappings"] == LogEntry.get_mapping()["mappings"]
+    assert "settings" in request.body["template"]
+
+    assert LogEntry.get_static_index_creation_request().path == "/_data_stream/logs-app-default"
+
+
+def test_bulk_op_type():
+    encoder = BulkEncoder()
+    chunk = encoder.encode(LogEntry(created=1, service="api", message="hi"))
+    assert chunk.startswith(b'{"create":{"_index":"logs-app-default"}}\n')
+
+    columns = prepare_columns(LogEntry, {"created": [1], "service": ["api"], "message": ["hi"]})
+    (batch,) = get_column_batches(LogEntry, "logs-app-default", columns, 1024)
+    assert batch.get_body() == (
+        b'{"create":{"_index":"logs-app-default"}}\n'
+        b'{"@timestamp":1,"service":"api","message":"hi"}\n'
+    )
@@ -0,0 +1,98 @@
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pylastic.indexes import ElasticIndex
+from pylastic.indexes.partitioning import HashPartition, Partitioning, TimePartition
+from pylastic.types import Date, Keyword
+
+
+class Event(ElasticIndex):
+    created: Date
+    user: Keyword
+
+    class Meta:
+        index = "events"
+        partitioning = TimePartition("created", interval="day")
+
+
+class UserEvent(ElasticIndex):
+    created: Date
+    user: Keyword
+
+    class Meta:
+        index = "user-events"
+        partitioning = HashPartition("user", partitions=4)
+
+
+def test_time_partition_values():
+    partition = TimePartition("created")
+    moment = datetime(2023, 1, 31, 23, 30)
+    expected = "2023.01.31"
+    assert partition.get_suffix(moment) == expected
+    assert partition.get_suffix(moment.date()) == expected
+    assert partition.get_suffix(moment.replace(tzinfo=timezone.utc).timestamp() * 1000) == expected
+    assert partition.get_suffix(str(int(moment.replace(tzinfo=timezone.utc).timestamp() * 1000))) == expected
+    # Aware datetimes are bucketed in UTC
+    assert partition.get_suffix(datetime(2023, 2, 1, 1, tzinfo=timezone(timedelta(hours=3)))) == expected
+
+    with pytest.raises(ValueError):
+        partition.get_suffix(None)
+    with pytest.raises(ValueError):
+        partition.get_suffix("yesterday")
+
+
+@pytest.mark.parametrize(
+    "interval, expected",
+    [("hour", "2023.01.31.23"), ("week", "2023.05"), ("month", "2023.01"), ("year", "2023")],
+)
+def test_time_partition_intervals(interval, expected):
+    assert TimePartition("created", interval=interval).get_suffix(datetime(2023, 1, 31, 23, 30)) == expected
+
+
+def test_unknown_interval():
+    with pytest.raises(ValueError):
+        TimePartition("created", interval="decade")
+
+
+def test_suffix_is_formatted_once_per_bucket(monkeypatch):
+    partition = TimePartition("created")
+    calls = []
+    format_bucket = partition.format_bucket
+    monkeypatch.setattr(partition, "format_bucket", lambda key: calls.append(key) or format_bucket(key))
+
+    for hour in range(48):
+        partition.get_suffix(datetime(2023, 1, 1) + timedelta(hours=hour))
+    assert len(calls) == 2
+
+
+def test_hash_partition_is_stable():
+    partition = HashPartition("user", partitions=4)
+    assert partition.get_suffix("alice") == str(zlib.crc32(b"alice") % 4)
+    assert partition.get_suffix(6) == "2"
+    with pytest.raises(ValueError):
+        HashPartition("user", partitions=0)
+
+
+def test_index_names():
+    event = Event(created=datetime(2023, 1, 31), user="alice")
+    assert event.get_index() == "events-2023.01.31"
+    assert Event.get_index_pattern() == "events-*"
+    assert UserEvent(created=0, user=5).get_index() == "user-events-1"
+
+
+def test_get_indexes():
+    assert Event.Meta.partitioning.get_indexes("events", [0, 86_400_000]) == [
+        "events-1970.01.01",
+        "events-1970.01.02",
+    ]
+
+
+def test_incomplete_partitioning_cannot_be_instantiated():
+    class Incomplete(Partitioning):
+        def get_bucket_key(self, value):
+            return value
+
+    with pytest.raises(TypeError):
+        Incomplete("a")
@@ -0,0 +1,65 @@
+from typing import Optional
+
+from pylastic.indexes import ElasticIndex
+from pylastic.indexes.schema import IndexSchema
+from pylastic.types import GeoPoint, Keyword
+
+
+class Example(ElasticIndex):
+    key: Keyword()
+    point: GeoPoint
+    count: int | None = None
+    comment: Optional[str] = None
+
+    class Meta:
+        index = "schema-example"
+        id_field = "key"
+
+
+def test_schema_is_built_once():
+    assert isinstance(Example.__schema__, IndexSchema)
+    assert Example.get_schema() is Example.get_schema()
+
+
+def test_fields():
+    schema = Example.get_schema()
+    assert [f.name for f in schema.fields] == ["key", "point", "count", "comment"]
+    assert [f.optional for f in schema.fields] == [False, False, True, True]
+    assert [f.has_default for f in schema.fields] == [False, False, True, True]
+    assert schema.fields[2].type is int
+    assert schema.id_field == "key"
+    assert schema.body_fields == ("point", "count", "comment")
+
+
+def test_mapping_is_copied():
+    mapping = Example.get_mapping()
+    mapping["mappings"]["properties"].clear()
+    assert Example.get_mapping()["mappings"]["properties"] == {
+        "point": {"type": "geo_point"},
+        "count": {"type": "integer"},
+        "comment": {"type": "text"},
+    }
+
+
+def test_get_body():
+    document = Example(key="k", point=[1, 2], count=3)
+    assert document.get_body() == {"point": [1, 2], "count": 3, "comment": None}
+
+
+def test_single_field_body():
+    class Single(ElasticIndex):
+        value: int
+
+    assert Single(value=1).get_body() == {"value": 1}
+
+
+def test_schema_follows_id_field():
+    class Changing(ElasticIndex):
+        a: str
+        b: str
+
+        class Meta:
+            index = "changing"
+
+    Changing.Meta.id_field = "a"
+    assert Changing.get_schema().body_fields == ("b",)
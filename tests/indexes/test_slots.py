@@ -0,0 +1,49 @@
+import pickle
+from typing import Optional
+
+import pytest
+
+from pylastic.indexes import ElasticIndex
+
+
+class SlotsExample(ElasticIndex):
+    key: str
+    value: int
+    comment: Optional[str] = None
+
+    class Meta:
+        index = "slots-example"
+        id_field = "key"
+        slots = True
+
+
+class SlotsSubclass(SlotsExample):
+    extra: int = 0
+
+
+def test_no_dict():
+    instance = SlotsExample(key="k", value=1)
+    assert not hasattr(instance, "__dict__")
+    assert SlotsExample.__slots__ == ("key", "value", "comment")
+
+    with pytest.raises(AttributeError):
+        instance.unknown = 1
+
+
+def test_methods():
+    instance = SlotsExample(key="k", value=1)
+    instance.validate()
+    assert instance.get_id() == "k"
+    assert instance.get_index() == "slots-example"
+    assert instance.get_body() == {"value": 1, "comment": None}
+
+
+def test_subclass():
+    instance = SlotsSubclass(key="k", value=1, extra=2)
+    assert not hasattr(instance, "__dict__")
+    assert instance.get_body() == {"value": 1, "comment": None, "extra": 2}
+
+
+def test_pickle():
+    instance = SlotsExample(key="k", value=1)
+    assert pickle.loads(pickle.dumps(instance)) == instance
@@ -0,0 +1,68 @@
+from typing import Optional
+
+import pytest
+
+from pylastic.indexes import ElasticIndex
+from pylastic.types import Date, GeoPoint, Text
+
+
+class Event(ElasticIndex):
+    name: Text(match_only_text=True)
+    timestamp: Date
+    count: int
+    location: Optional[GeoPoint] = None
+
+    class Meta:
+        index = "events"
+
+
+class Keyed(ElasticIndex):
+    key: str
+    value: float
+
+    class Meta:
+        index = "keyed"
+        id_field = "key"
+
+
+def test_validator_is_generated():
+    validate = Event.get_schema().validate
+    assert validate.__qualname__ == "Event.validate"
+    assert "_type_timestamp.get_valid_object" in validate.__source__
+
+
+def test_valid():
+    Event(name="a", timestamp=1, count=2).validate()
+    Event(name="a", timestamp="1", count="2", location=[10, 10]).validate()
+
+
+def test_invalid_elastic_type():
+    with pytest.raises(ValueError, match=r"Event.timestamp \(abc\)"):
+        Event(name="a", timestamp="abc", count=1).validate()
+
+    with pytest.raises(ValueError, match="Event.location"):
+        Event(name="a", timestamp=1, count=1, location=[10, 100]).validate()
+
+
+def test_invalid_builtin_type():
+    with pytest.raises(ValueError):
+        Event(name="a", timestamp=1, count="x").validate()
+
+
+def test_custom_id():
+    Keyed(key="k", value=1.0).validate()
+    with pytest.raises(ValueError):
+        Keyed(key=None, value=1.0).validate()
+    with pytest.raises(ValueError):
+        Keyed(key="k" * 600, value=1.0).validate()
+
+
+def test_validate_many():
+    objects = [
+        Event(name="a", timestamp=1, count=1),
+        Event(name="a", timestamp="abc", count=1),
+        Keyed(key="k", value=1.0),
+        Keyed(key=None, value=1.0),
+    ]
+    assert ElasticIndex.validate_many(objects) == [1, 3]
+    assert Event.validate_many(objects[:1]) == []
@@ -0,0 +1,157 @@
+import gzip
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig, ObjectApiResponse
+from elasticsearch import NotFoundError
+
+from pylastic.client import ElasticClient
+from pylastic.indexes import ElasticIndex
+from pylastic.instrumentation import MetricsAggregator
+from pylastic.search import SearchResult
+from pylastic.search.batcher import SearchBatcher, split_search_kwargs
+from pylastic.utils.compression import GzipCompressor
+
+
+class Event(ElasticIndex):
+    n: int
+
+    class Meta:
+        index = "events"
+
+
+META = ApiResponseMeta(
+    status=200,
+    http_version="1.1",
+    headers=HttpHeaders(),
+    duration=0,
+    node=NodeConfig("http", "localhost", 9200),
+)
+
+
+def _client(**kwargs):
+    with patch("pylastic.client.Elasticsearch", MagicMock()):
+        client = ElasticClient(host="localhost", port=123, username="user", password="password", **kwargs)
+
+    def _msearch(method, path, params, headers, body):
+        assert (method, path) == ("POST", "/_msearch")
+        assert headers["content-type"] == "application/x-ndjson"
+        if headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        searches = [json.loads(line) for line in body.splitlines()]
+        responses = []
+        for header, body in zip(searches[::2], searches[1::2]):
+            if header["index"] == "missing":
+                responses.append({"status": 404, "error": {"type": "index_not_found_exception"}})
+            else:
+                hit = {"_id": "1", "_source": {"n": body.get("size", 0)}}
+                responses.append({"status": 200, "hits": {"hits": [hit]}})
+        return ObjectApiResponse(body={"responses": responses}, meta=META)
+
+    client.es_client.perform_request.side_effect = _msearch
+    return client
+
+
+def test_split_search_kwargs():
+    header, body = split_search_kwargs(
+        {"index": "a", "routing": "r", "query": {}, "source": ["x"], "from_": 5}
+    )
+    assert header == {"index": "a", "routing": "r"}
+    assert body == {"query": {}, "_source": ["x"], "from": 5}
+
+
+def test_split_source_filter_kwargs():
+    _, body = split_search_kwargs({"source": ["x"], "source_includes": ["a*"], "source_excludes": "b"})
+    assert body == {"_source": {"includes": ["a*"], "excludes": "b"}}
+
+
+def test_context_batches_searches():
+    client = _client()
+    with SearchBatcher(client, max_wait=None) as batcher:
+        raw = batcher.submit("events", size=1)
+        typed = batcher.submit(Event, size=2)
+        missing = batcher.submit("missing")
+        client.es_client.perform_request.assert_not_called()
+
+    client.es_client.perform_request.assert_called_once()
+    assert raw.result()["hits"]["hits"][0]["_source"] == {"n": 1}
+    assert isinstance(typed.result(), SearchResult)
+    assert typed.result()[0].n == 2
+    with pytest.raises(NotFoundError):
+        missing.result()
+
+
+def test_full_batch_is_sent():
+    client = _client()
+    batcher = SearchBatcher(client, max_batch_size=2, max_wait=None)
+    futures = [batcher.submit("events", size=i) for i in range(5)]
+
+    assert client.es_client.perform_request.call_count == 2
+    assert not futures[4].done()
+    batcher.close()
+    assert client.es_client.perform_request.call_count == 3
+    assert [f.result()["hits"]["hits"][0]["_source"]["n"] for f in futures] == list(range(5))
+
+
+def test_max_wait_from_threads():
+    client = _client()
+    results = {}
+    with SearchBatcher(client, max_wait=0.05) as batcher:
+
+        def _search(i):
+            results[i] = batcher.search("events", size=i)
+
+        threads = [threading.Thread(target=_search, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert client.es_client.perform_request.call_count < 10
+    assert {i: r["hits"]["hits"][0]["_source"]["n"] for i, r in results.items()} == {
+        i: i for i in range(10)
+    }
+
+
+def test_request_error_is_propagated():
+    client = _client()
+    client.es_client.perform_request.side_effect = ConnectionError()
+    with SearchBatcher(client, max_wait=None) as batcher:
+        futures = [batcher.submit("events") for _ in range(2)]
+
+    for future in futures:
+        with pytest.raises(ConnectionError):
+            future.result()
+
+
+def test_closed_batcher():
+    batcher = SearchBatcher(MagicMock(), max_wait=None)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("events")
+
+
+def test_requests_are_compressed_and_instrumented():
+    metrics = MetricsAggregator()
+    client = _client(compressor=GzipCompressor(min_size=1), instrumentation=metrics)
+    with SearchBatcher(client, max_wait=None) as batcher:
+        future = batcher.submit("events", size=3)
+
+    assert future.result()["hits"]["hits"][0]["_source"] == {"n": 3}
+    assert client.compressor.compressed_requests == 1
+    assert metrics.get_stats()["endpoints"]["POST /_msearch"]["count"] == 1
+
+
+@pytest.mark.parametrize("body", [{}, {"responses": [{"hits": {"hits": []}}]}])
+def test_malformed_response_fails_every_search(body):
+    client = _client()
+    client.es_client.perform_request.side_effect = None
+    client.es_client.perform_request.return_value = ObjectApiResponse(body=body, meta=META)
+    with SearchBatcher(client, max_wait=None) as batcher:
+        futures = [batcher.submit("events") for _ in range(2)]
+
+    for future in futures:
+        with pytest.raises((KeyError, ValueError)):
+            future.result(timeout=1)
@@ -0,0 +1,88 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pylastic.client import ElasticClient
+from pylastic.indexes import ElasticIndex
+from pylastic.search.iterators import iter_pages
+
+
+class Event(ElasticIndex):
+    n: int
+
+    class Meta:
+        index = "events"
+
+
+def _es_client(total: int):
+    es_client = MagicMock()
+    es_client.open_point_in_time.return_value = MagicMock(body={"id": "pit-0"})
+    calls = []
+
+    def _search(pit, size, search_after=None, **kwargs):
+        calls.append({"pit": pit, "size": size, "search_after": search_after, **kwargs})
+        start = search_after[0] + 1 if search_after else 0
+        hits = [
+            {"_id": str(i), "_source": {"n": i}, "sort": [i]}
+            for i in range(start, min(start + size, total))
+        ]
+        return MagicMock(body={"pit_id": f"pit-{len(calls)}", "hits": {"hits": hits}})
+
+    es_client.search.side_effect = _search
+    return es_client, calls
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_pages(prefetch):
+    es_client, calls = _es_client(25)
+    pages = list(iter_pages(es_client, "events", page_size=10, prefetch=prefetch))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [c["search_after"] for c in calls] == [None, [9], [19]]
+    assert [c["pit"]["id"] for c in calls] == ["pit-0", "pit-1", "pit-2"]
+    assert calls[0]["sort"] == ["_shard_doc"]
+    assert calls[0]["query"] == {"match_all": {}}
+    es_client.open_point_in_time.assert_called_once_with(index="events", keep_alive="1m")
+    es_client.close_point_in_time.assert_called_once_with(id="pit-3")
+
+
+def test_exact_page_multiple():
+    es_client, calls = _es_client(20)
+    pages = list(iter_pages(es_client, "events", page_size=10))
+    assert [len(page) for page in pages] == [10, 10]
+    assert len(calls) == 3
+
+
+def test_prefetch():
+    es_client, calls = _es_client(100)
+    fetched = threading.Event()
+    original = es_client.search.side_effect
+
+    def _search(*args, **kwargs):
+        result = original(*args, **kwargs)
+        if len(calls) == 2:
+            fetched.set()
+        return result
+
+    es_client.search.side_effect = _search
+    pages = iter_pages(es_client, "events", page_size=10)
+    next(pages)
+    # The second page is requested while the caller is still processing the first one
+    assert fetched.wait(timeout=5)
+    pages.close()
+    es_client.close_point_in_time.assert_called_once()
+
+
+def test_iter_documents_closes_pit():
+    with patch("pylastic.client.Elasticsearch", MagicMock()):
+        client = ElasticClient(host="localhost", port=1, username="u", password="p")
+    client.es_client, calls = _es_client(25)
+
+    documents = client.iter_documents(Event, page_size=10)
+    assert [next(documents) for _ in range(3)] == [Event(n=0), Event(n=1), Event(n=2)]
+    documents.close()
+    client.es_client.close_point_in_time.assert_called_once()
+    assert calls[0]["source"] == ["n"]
+
+    assert [e.n for e in client.iter_documents(Event, page_size=10)] == list(range(25))
@@ -0,0 +1,99 @@
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pylastic.client import ElasticClient
+from pylastic.indexes import ElasticIndex
+from pylastic.search import SearchResult
+from pylastic.search.results import get_search_kwargs
+
+
+class Comment(ElasticIndex):
+    key: str
+    author: str
+    text: str
+    rating: Optional[float] = None
+
+    class Meta:
+        index = "comments"
+        id_field = "key"
+
+
+class SlotsComment(ElasticIndex):
+    key: str
+    author: str
+    text: str
+    rating: Optional[float] = None
+
+    class Meta:
+        index = "comments"
+        id_field = "key"
+        slots = True
+
+
+body = {
+    "took": 3,
+    "hits": {
+        "total": {"value": 10, "relation": "eq"},
+        "max_score": 1.0,
+        "hits": [
+            {"_id": "1", "_source": {"author": "a", "text": "x", "rating": 5}},
+            {"_id": "2", "_source": {"author": "b"}},
+        ],
+    },
+}
+
+
+def test_hydration():
+    result = SearchResult(Comment, body)
+    assert len(result) == 2
+    assert result.total == 10
+    assert result.took == 3
+    assert result.max_score == 1.0
+    assert result._documents == [None, None]
+
+    second = result[-1]
+    assert result._documents[0] is None
+    assert second == Comment(key="2", author="b", text=None, rating=None)
+    assert result[1] is second
+
+    assert list(result) == [Comment(key="1", author="a", text="x", rating=5), second]
+    assert result[:1] == [result[0]]
+    with pytest.raises(IndexError):
+        _ = result[2]
+
+
+def test_slots_hydration():
+    document = SearchResult(SlotsComment, body)[0]
+    assert not hasattr(document, "__dict__")
+    assert document.get_id() == "1"
+    assert document.get_body() == {"author": "a", "text": "x", "rating": 5}
+
+
+def test_get_search_kwargs():
+    assert get_search_kwargs(Comment, query={"match_all": {}}) == {
+        "index": "comments",
+        "query": {"match_all": {}},
+        "source": ["author", "text", "rating"],
+    }
+    assert get_search_kwargs(Comment, "comments-*", source_fields=["author"]) == {
+        "index": "comments-*",
+        "source": ["author"],
+    }
+    assert get_search_kwargs(Comment, source=False)["source"] is False
+
+    with pytest.raises(ValueError):
+        get_search_kwargs(Comment, source_fields=["unknown"])
+
+
+def test_client_search():
+    with patch("pylastic.client.Elasticsearch", MagicMock()):
+        client = ElasticClient(host="localhost", port=1, username="u", password="p")
+    client.es_client.search.return_value = MagicMock(body=body)
+
+    result = client.search(Comment, source_fields=["author"])
+    assert isinstance(result, SearchResult)
+    client.es_client.search.assert_called_with(index="comments", source=["author"])
+
+    assert client.search("comments") == body
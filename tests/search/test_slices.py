@@ -0,0 +1,97 @@
+import pickle
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pylastic.client import ElasticClient
+from pylastic.indexes import ElasticIndex
+from pylastic.search.slices import SliceSpec, iter_slices_merged
+
+
+class Event(ElasticIndex):
+    n: int
+
+    class Meta:
+        index = "events"
+
+
+def _es_client(total: int, fail_slice: int = None):
+    """Slice `i` of `max` contains documents where `n % max == i`"""
+    es_client = MagicMock()
+    es_client.open_point_in_time.return_value = MagicMock(body={"id": "pit"})
+
+    def _search(pit, size, slice, search_after=None, **kwargs):
+        if slice["id"] == fail_slice:
+            raise RuntimeError("boom")
+        start = search_after[0] + 1 if search_after else 0
+        numbers = [n for n in range(start, total) if n % slice["max"] == slice["id"]][:size]
+        hits = [{"_id": str(n), "_source": {"n": n}, "sort": [n]} for n in numbers]
+        return MagicMock(body={"hits": {"hits": hits}})
+
+    es_client.search.side_effect = _search
+    return es_client
+
+
+@pytest.fixture
+def client():
+    with patch("pylastic.client.Elasticsearch"):
+        yield ElasticClient(host="localhost", port=1, username="u", password="p")
+
+
+def test_spec_is_picklable():
+    spec = SliceSpec(index_class=Event, pit_id="pit", slice_id=1, max_slices=4)
+    assert pickle.loads(pickle.dumps(spec)) == spec
+
+
+def test_spec_reads_its_slice():
+    es_client = _es_client(20)
+    spec = SliceSpec(index_class=Event, pit_id="pit", slice_id=1, max_slices=4, page_size=2)
+
+    assert [doc.n for doc in spec.iter_documents(es_client)] == [1, 5, 9, 13, 17]
+    # The PIT belongs to whoever opened the slices
+    es_client.open_point_in_time.assert_not_called()
+    es_client.close_point_in_time.assert_not_called()
+
+
+def test_open_slices(client):
+    client.es_client = _es_client(10)
+    with client.open_slices(Event, slices=3, query={"term": {"n": 1}}) as specs:
+        assert [spec.slice_id for spec in specs] == [0, 1, 2]
+        assert {spec.max_slices for spec in specs} == {3}
+        assert specs[0].query == {"term": {"n": 1}}
+        assert specs[0].search_kwargs["source"] == ["n"]
+        client.es_client.close_point_in_time.assert_not_called()
+
+    client.es_client.open_point_in_time.assert_called_once_with(index="events", keep_alive="5m")
+    client.es_client.close_point_in_time.assert_called_once_with(id="pit")
+
+
+def test_open_slices_rejects_non_positive(client):
+    with pytest.raises(ValueError):
+        with client.open_slices(Event, slices=0):
+            pass
+
+
+def test_iter_documents_sliced(client):
+    client.es_client = _es_client(100)
+    documents = list(client.iter_documents_sliced(Event, slices=4, page_size=7))
+
+    assert all(isinstance(doc, Event) for doc in documents)
+    assert sorted(doc.n for doc in documents) == list(range(100))
+    client.es_client.close_point_in_time.assert_called_once_with(id="pit")
+
+
+def test_iter_documents_sliced_stops_early(client):
+    client.es_client = _es_client(10_000)
+    documents = client.iter_documents_sliced(Event, slices=4, page_size=10)
+    assert len([next(documents) for _ in range(5)]) == 5
+    documents.close()
+
+    client.es_client.close_point_in_time.assert_called_once_with(id="pit")
+
+
+def test_merged_raises_slice_errors():
+    es_client = _es_client(100, fail_slice=1)
+    specs = [SliceSpec(index_class=Event, pit_id="pit", slice_id=i, max_slices=2) for i in range(2)]
+    with pytest.raises(RuntimeError, match="boom"):
+        list(iter_slices_merged(es_client, specs))
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from elastic_transport import ObjectApiResponse
+from pytest import fixture
+
+from pylastic.async_client import AsyncElasticClient
+from pylastic.indexes import ElasticIndex
+
+
+class Example(ElasticIndex):
+    a: str
+    b: int
+
+    class Meta:
+        index = "example"
+
+
+@fixture()
+def client():
+    with patch("pylastic.async_client.AsyncElasticsearch", MagicMock()):
+        client = AsyncElasticClient(
+            host="localhost", port=123, username="user", password="password"
+        )
+    client.es_client.perform_request = AsyncMock(
+        return_value=ObjectApiResponse(
+            body={"acknowledged": True, "_shards": {"failed": 0}, "errors": False},
+            meta=MagicMock(),
+        )
+    )
+    return client
+
+
+def test_create_index(client):
+    assert asyncio.run(client.create_index(Example)) is True
+    client.es_client.perform_request.assert_awaited_once()
+    assert client.es_client.perform_request.call_args.kwargs["path"] == "/example"
+
+
+def test_save(client):
+    documents = [Example(a=str(i), b=i) for i in range(50)]
+    asyncio.run(
+        client.save(
+            documents,
+            max_batch_documents=10,
+            concurrency=3,
+            refresh_after=True,
+        )
+    )
+
+    paths = [c.kwargs["path"] for c in client.es_client.perform_request.call_args_list]
+    assert paths == ["/example"] + ["/_bulk"] * 5 + ["/example/_refresh"]
+
+
+def test_refresh_instances(client):
+    class DynamicExample(Example):
+        def get_index(self):
+            return f"example-{self.b}"
+
+    asyncio.run(client.refresh_index([DynamicExample(a="a", b=1), Example]))
+    assert client.es_client.perform_request.call_args.kwargs["path"] == "/example-1,example/_refresh"
+
+
+def test_save_encodes_outside_of_the_event_loop(client):
+    threads = set()
+
+    class Recorded(Example):
+        def get_index(self):
+            threads.add(threading.get_ident())
+            return "example"
+
+    asyncio.run(client.save([Recorded(a="a", b=i) for i in range(3)], create_indexes=False))
+    assert threads and threading.get_ident() not in threads
+
+
+def test_save_raises(client):
+    client.es_client.perform_request.side_effect = RuntimeError()
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.save([Example(a="a", b=1)], create_indexes=False))
+
+
+def test_search(client):
+    client.es_client.search = AsyncMock(return_value=MagicMock(body={"hits": {}}))
+    assert asyncio.run(client.search("example", query={"match_all": {}})) == {
+        "hits": {}
+    }
+
+
+def test_save_retries_rejected_documents(client, monkeypatch):
+    monkeypatch.setattr("pylastic.async_client.get_backoff_delay", lambda *_: 0)
+    rejected = {"index": {"status": 429, "error": {"type": "es_rejected_execution_exception"}}}
+    client.es_client.perform_request.side_effect = [
+        ObjectApiResponse(
+            body={"errors": True, "items": [{"index": {"status": 201}}, rejected]},
+            meta=MagicMock(),
+        ),
+        ObjectApiResponse(body={"errors": False}, meta=MagicMock()),
+    ]
+
+    report = asyncio.run(
+        client.save([Example(a="a", b=1), Example(a="b", b=2)], create_indexes=False)
+    )
+    assert report.succeeded == 2
+    assert report.retried == 1
+    assert report.ok
+
+
+def test_create_index_for_skips_known_indexes(client):
+    asyncio.run(client.create_index_for([Example(a="a", b=1)]))
+    asyncio.run(client.create_index_for([Example(a="b", b=2)]))
+
+    client.es_client.perform_request.assert_awaited_once()
+    assert "example" in client.known_indexes
+
+
+def test_clear_partitioned(client):
+    from pylastic.indexes.partitioning import HashPartition
+
+    class Partitioned(ElasticIndex):
+        a: str
+        b: int
+
+        class Meta:
+            index = "partitioned"
+            partitioning = HashPartition("b", partitions=2)
+
+    client.es_client.perform_request.return_value = ObjectApiResponse(
+        body={"indices": [{"name": "partitioned-0"}]}, meta=MagicMock()
+    )
+    asyncio.run(client.clear(Partitioned))
+    requests = [
+        (c.kwargs["method"], c.kwargs["path"])
+        for c in client.es_client.perform_request.call_args_list
+    ]
+    assert requests == [("GET", "/_resolve/index/partitioned-*"), ("DELETE", "/partitioned-0")]
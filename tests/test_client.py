@@ -1,9 +1,18 @@
+import gzip
+import json
 from unittest.mock import MagicMock, Mock, call, patch
 import pytest
 from pytest import fixture
 
+from elasticsearch import BadRequestError
+from elastic_transport import HttpHeaders, ObjectApiResponse
+
+from pylastic.bulk import route_encoded_batches
 from pylastic.client import ElasticClient
 from pylastic.indexes import ElasticIndex
+from pylastic.instrumentation import Instrumentation, MetricsAggregator
+from pylastic.utils.cache import QueryCache
+from pylastic.utils.compression import GzipCompressor
 
 
 class Example(ElasticIndex):
@@ -128,24 +137,29 @@ def test_create_multiple_indexes_for_dynamic_index(client):
                         "number_of_replicas": 1,
                     },
                 },
-            )
-        ]
-    )
-    client.es_client.perform_request.assert_called_with(
-        method="PUT",
-        path="/dynamic-index",
-        params=None,
-        headers={"accept": "application/json", "content-type": "application/json"},
-        body={
-            "mappings": {
-                "properties": {"a": {"type": "text"}, "b": {"type": "integer"}}
-            },
-            "settings": {
-                "number_of_shards": 1,
-                "codec": "default",
-                "number_of_replicas": 1,
-            },
-        },
+            ),
+            call(  # noqa
+                method="PUT",
+                path="/dynamic-index",
+                params=None,
+                headers={
+                    "accept": "application/json",
+                    "content-type": "application/json",
+                },
+                body={
+                    "mappings": {
+                        "properties": {"a": {"type": "text"}, "b": {"type": "integer"}}
+                    },
+                    "settings": {
+                        "number_of_shards": 1,
+                        "codec": "default",
+                        "number_of_replicas": 1,
+                    },
+                },
+            ),
+        ],
+        # Indexes are created in parallel
+        any_order=True,
     )
     assert (
         client.es_client.perform_request.call_count == 2
@@ -174,3 +188,437 @@ def test_save_one_item(client, monkeypatch):
     client.save(instance, create_indexes=True)
 
     client.create_index_for.assert_called_with([instance], ignore_400=True)
+
+
+def test_save_concurrently(client):
+    documents = [Example(a=str(i), b=i) for i in range(100)]
+    client.save(
+        documents, create_indexes=False, max_batch_documents=10, concurrency=4
+    )
+
+    assert client.es_client.perform_request.call_count == 10
+    bodies = b"".join(
+        c.kwargs["body"] for c in client.es_client.perform_request.call_args_list
+    )
+    assert bodies.count(b"\n") == 200
+
+
+def test_save_concurrently_raises(client):
+    client.es_client.perform_request.side_effect = RuntimeError()
+    with pytest.raises(RuntimeError):
+        client.save(
+            [Example(a="a", b=1), Example(a="b", b=2)],
+            create_indexes=False,
+            max_batch_documents=1,
+            concurrency=2,
+        )
+
+
+def test_save_generator(client, monkeypatch):
+    monkeypatch.setattr(client, "create_index_for", Mock())
+    client.save(
+        (Example(a=str(i), b=i) for i in range(30)),
+        max_batch_documents=10,
+        refresh_after=True,
+    )
+
+    client.create_index_for.assert_called_once()
+    paths = [c.kwargs["path"] for c in client.es_client.perform_request.call_args_list]
+    assert paths == ["/_bulk"] * 3 + ["/example/_refresh"]
+
+
+def test_save_retries_rejected_documents(client, monkeypatch):
+    monkeypatch.setattr("pylastic.client.get_backoff_delay", lambda *_: 0)
+    rejected = {"index": {"status": 429}}
+    invalid = {"index": {"status": 400, "error": {"type": "mapper_parsing_exception"}}}
+    client.es_client.perform_request.side_effect = [
+        Mock(body={"errors": True, "items": [rejected, invalid, rejected]}),
+        Mock(body={"errors": True, "items": [{"index": {"status": 201}}, rejected]}),
+        Mock(body={"errors": True, "items": [rejected]}),
+    ]
+    documents = [Example(a=str(i), b=i) for i in range(3)]
+
+    report = client.save(documents, create_indexes=False, max_retries=2)
+
+    assert report.succeeded == 1
+    assert report.retried == 3
+    assert [f.document for f in report.failures] == [documents[1], documents[2]]
+
+    bodies = [c.kwargs["body"] for c in client.es_client.perform_request.call_args_list]
+    assert bodies[1].count(b"\n") == 4
+    assert bodies[2].count(b"\n") == 2
+    assert client.es_client.perform_request.call_args.kwargs["params"] == {
+        "filter_path": "errors,took,items.*.status,items.*.error"
+    }
+
+
+def test_save_columns(client, monkeypatch):
+    monkeypatch.setattr(client, "create_index", Mock())
+    client.save_columns(Example, {"a": ["x", "y"], "b": [1, 2]})
+
+    client.create_index.assert_called_once_with(Example, index_name="example")
+    assert client.es_client.perform_request.call_args.kwargs["body"] == (
+        b'{"index":{"_index":"example"}}\n{"a":"x","b":1}\n'
+        b'{"index":{"_index":"example"}}\n{"a":"y","b":2}\n'
+    )
+
+
+def test_save_columns_dynamic_index(client):
+    with pytest.raises(RuntimeError):
+        client.save_columns(DynamicIndexExample, {"a": ["x"], "b": [1]})
+
+
+def test_query_cache(client):
+    client.query_cache = QueryCache()
+    client.es_client.search.return_value = Mock(body={"hits": {"hits": []}})
+    client.es_client.count.return_value = Mock(body={"count": 0})
+
+    for _ in range(3):
+        client.search("example", query={"match_all": {}})
+        client.count("example")
+    client.search(Example)
+
+    assert client.es_client.search.call_count == 2
+    assert client.es_client.count.call_count == 1
+    assert client.query_cache.hits == 4
+
+    client.save(Example(a="a", b=1), create_indexes=False)
+    client.count("example")
+    assert client.es_client.count.call_count == 2
+
+    client.refresh_index("example")
+    client.count("example")
+    assert client.es_client.count.call_count == 3
+
+
+def test_search_during_refresh_is_not_cached(client):
+    client.query_cache = QueryCache()
+    client.es_client.search.return_value = Mock(body={"hits": {"hits": []}})
+
+    def _refresh(**kwargs):
+        # Another thread searches while the refresh is in flight
+        client.search("example")
+        return {"_shards": {"failed": 0}}
+
+    client.es_client.perform_request.side_effect = _refresh
+    client.refresh_index("example")
+    client.search("example")
+    assert client.es_client.search.call_count == 2
+
+
+def test_cache_size_from_content_length(client):
+    client.query_cache = QueryCache()
+    client.es_client.search.return_value = ObjectApiResponse(
+        body={"hits": {"hits": []}}, meta=Mock(headers=HttpHeaders({"content-length": "1234"}))
+    )
+    client.search("a")
+    assert client.query_cache.size == 1234
+
+    # The length of a compressed body isn't the size of the response
+    client.es_client.search.return_value = ObjectApiResponse(
+        body={"hits": {"hits": []}},
+        meta=Mock(headers=HttpHeaders({"content-length": "10", "content-encoding": "gzip"})),
+    )
+    client.search("b")
+    assert client.query_cache.size == 1234 + len('{"hits":{"hits":[]}}')
+
+
+def test_cached_raw_responses_are_copies(client):
+    client.query_cache = QueryCache()
+    client.es_client.search.return_value = Mock(body={"hits": {"hits": [{"_id": "1"}, {"_id": "2"}]}})
+
+    client.search("example")["hits"]["hits"].pop()
+    response = client.search("example")
+    assert len(response["hits"]["hits"]) == 2
+    response["hits"]["hits"].clear()
+    assert len(client.search("example")["hits"]["hits"]) == 2
+    assert client.es_client.search.call_count == 1
+
+
+def test_cached_class_search_results_are_copies(client):
+    class Tagged(ElasticIndex):
+        tags: list
+
+        class Meta:
+            index = "tagged"
+
+    client.query_cache = QueryCache()
+    client.es_client.search.return_value = Mock(body={"hits": {"hits": [{"_id": "1", "_source": {"tags": ["a"]}}]}})
+
+    client.search(Tagged)[0].tags.append("modified")
+    assert client.search(Tagged)[0].tags == ["a"]
+    assert client.es_client.search.call_count == 1
+
+
+def test_response_read_before_a_write_is_not_cached(client):
+    client.query_cache = QueryCache()
+
+    def _search(**kwargs):
+        # Another thread saves to the index while the search is in flight
+        client.save(Example(a="a", b=1), create_indexes=False)
+        return Mock(body={"hits": {"hits": []}})
+
+    client.es_client.search.side_effect = _search
+    client.search("example")
+    client.es_client.search.side_effect = None
+    client.es_client.search.return_value = Mock(body={"hits": {"hits": []}})
+    client.search("example")
+    assert client.es_client.search.call_count == 2
+
+
+def test_send_batch_invalidates_cache_on_error(client):
+    client.query_cache = QueryCache()
+    client.es_client.count.return_value = Mock(body={"count": 0})
+    client.count("example")
+
+    client.es_client.perform_request.side_effect = ConnectionError("down")
+    batch = next(route_encoded_batches([Example(a="a", b=1)], max_size_bytes=1024))
+    with pytest.raises(ConnectionError):
+        client.send_batch(batch)
+
+    # The request may have written documents before it failed
+    client.count("example")
+    assert client.es_client.count.call_count == 2
+
+
+def test_create_index_for_skips_known_indexes(client):
+    documents = [Example(a="a", b=1), DynamicIndexExample(a="b", b=2)]
+    assert client.create_index_for(documents) == ["example", "dynamic-index"]
+    assert client.es_client.perform_request.call_count == 2
+
+    client.create_index_for(documents)
+    client.save(documents, create_indexes=True)
+    paths = [c.kwargs["path"] for c in client.es_client.perform_request.call_args_list]
+    assert paths[2:] == ["/_bulk", "/_bulk"]
+
+
+def test_create_index_for_existing_index(client):
+    client.es_client.perform_request.side_effect = BadRequestError(
+        "resource_already_exists_exception", meta=Mock(status=400), body={}
+    )
+    client.create_index_for(Example(a="a", b=1), ignore_400=False)
+    assert "example" in client.known_indexes
+
+
+def test_create_index_for_invalid_index(client):
+    client.es_client.perform_request.side_effect = BadRequestError(
+        "mapper_parsing_exception", meta=Mock(status=400), body={}
+    )
+    client.create_index_for(Example(a="a", b=1))
+    assert "example" not in client.known_indexes
+
+    with pytest.raises(BadRequestError):
+        client.create_index_for(Example(a="a", b=1), ignore_400=False)
+
+
+def test_refresh_merges_indexes(client):
+    client.refresh_index(["a", "b", Example, "a"])
+    paths = [c.kwargs["path"] for c in client.es_client.perform_request.call_args_list]
+    assert paths == ["/a,b,example/_refresh"]
+
+    client.refresh_index(["index-1", "index-2", "index-3"], max_path_length=30)
+    paths = [c.kwargs["path"] for c in client.es_client.perform_request.call_args_list[1:]]
+    assert paths == ["/index-1,index-2/_refresh", "/index-3/_refresh"]
+
+
+def test_refresh_instances(client):
+    client.refresh_index([DynamicIndexExample(a="a", b=1), Example(a="a", b=1)])
+    assert client.es_client.perform_request.call_args.kwargs["path"] == "/dynamic-index,example/_refresh"
+
+
+def test_save_with_refresh_policy(client):
+    client.save(
+        [Example(a=str(i), b=i) for i in range(3)],
+        create_indexes=False,
+        max_batch_documents=2,
+        refresh="wait_for",
+    )
+
+    calls = client.es_client.perform_request.call_args_list
+    assert [c.kwargs["path"] for c in calls] == ["/_bulk", "/_bulk"]
+    assert all(c.kwargs["params"]["refresh"] == "wait_for" for c in calls)
+
+
+class DataStreamExample(ElasticIndex):
+    a: str
+
+    class Meta:
+        is_datastream = True
+        index_prefix = "logs-example"
+
+
+def test_create_data_stream(client):
+    client.save(DataStreamExample(a="a"), refresh_after=True)
+    client.clear(DataStreamExample)
+
+    requests = [
+        (c.kwargs["method"], c.kwargs["path"])
+        for c in client.es_client.perform_request.call_args_list
+    ]
+    assert requests == [
+        ("PUT", "/_index_template/logs-example"),
+        ("PUT", "/_data_stream/logs-example-default"),
+        ("POST", "/_bulk"),
+        ("POST", "/logs-example-default/_refresh"),
+        ("DELETE", "/_data_stream/logs-example-default"),
+        ("PUT", "/_index_template/logs-example"),
+        ("PUT", "/_data_stream/logs-example-default"),
+    ]
+    bulk_body = client.es_client.perform_request.call_args_list[2].kwargs["body"]
+    assert bulk_body.startswith(b'{"create":')
+
+
+def test_save_columns_partitioned(client):
+    from pylastic.indexes.partitioning import HashPartition
+
+    class Partitioned(ElasticIndex):
+        a: str
+        b: int
+
+        class Meta:
+            index = "partitioned"
+            partitioning = HashPartition("b", partitions=2)
+
+    client.save_columns(Partitioned, {"a": ["x", "y", "z"], "b": [1, 2, 3]})
+    calls = client.es_client.perform_request.call_args_list
+    assert [c.kwargs["path"] for c in calls if c.kwargs["method"] == "PUT"] == [
+        "/partitioned-1",
+        "/partitioned-0",
+    ]
+    bodies = b"".join(c.kwargs["body"] for c in calls if c.kwargs["path"] == "/_bulk")
+    assert bodies.count(b'"_index":"partitioned-1"') == 2
+
+
+def test_save_columns_partitioned_with_prefix(client):
+    from pylastic.indexes.partitioning import HashPartition
+
+    class Prefixed(ElasticIndex):
+        a: str
+        b: int
+
+        class Meta:
+            index_prefix = "prefixed"
+            partitioning = HashPartition("b", partitions=2)
+
+    report = client.save_columns(Prefixed, {"a": ["x", "y"], "b": [1, 2]})
+    assert report.succeeded == 2
+    calls = client.es_client.perform_request.call_args_list
+    assert sorted(c.kwargs["path"] for c in calls if c.kwargs["method"] == "PUT") == [
+        "/prefixed-0",
+        "/prefixed-1",
+    ]
+
+
+def test_clear_partitioned(client):
+    from pylastic.indexes.partitioning import HashPartition
+
+    class Partitioned(ElasticIndex):
+        a: str
+        b: int
+
+        class Meta:
+            index_prefix = "partitioned"
+            partitioning = HashPartition("b", partitions=2)
+
+    def _perform_request(**kwargs):
+        if kwargs["path"].startswith("/_resolve/index/"):
+            body = {"indices": [{"name": "partitioned-0"}, {"name": "partitioned-1"}]}
+        else:
+            body = {"acknowledged": True}
+        return ObjectApiResponse(body=body, meta=MagicMock())
+
+    client.es_client.perform_request.side_effect = _perform_request
+    client.query_cache = QueryCache()
+    client.es_client.count.return_value = Mock(body={"count": 0})
+    client.count("partitioned-1")
+    client.save(Partitioned(a="a", b=1))
+    assert "partitioned-1" in client.known_indexes
+
+    client.es_client.perform_request.reset_mock()
+    client.clear(Partitioned)
+    requests = [
+        (c.kwargs["method"], c.kwargs["path"])
+        for c in client.es_client.perform_request.call_args_list
+    ]
+    # Partitions are deleted and not re-created, and no unpartitioned index is touched
+    assert requests == [
+        ("GET", "/_resolve/index/partitioned-*"),
+        ("DELETE", "/partitioned-0,partitioned-1"),
+    ]
+    assert "partitioned-1" not in client.known_indexes
+    client.count("partitioned-1")
+    assert client.es_client.count.call_count == 2
+
+    # A single partition is re-created under its own name
+    client.es_client.perform_request.reset_mock()
+    client.clear(Partitioned(a="a", b=1))
+    requests = [
+        (c.kwargs["method"], c.kwargs["path"])
+        for c in client.es_client.perform_request.call_args_list
+    ]
+    assert requests == [("DELETE", "/partitioned-1"), ("PUT", "/partitioned-1")]
+
+
+def test_compression(client):
+    client.compressor = GzipCompressor(min_size=200)
+    client.save([Example(a="x" * 10, b=i) for i in range(20)], create_indexes=False)
+    client.refresh_index("example")
+    client.create_index(Example)
+
+    bulk, refresh, create = client.es_client.perform_request.call_args_list
+    assert bulk.kwargs["headers"]["content-encoding"] == "gzip"
+    assert gzip.decompress(bulk.kwargs["body"]).count(b"\n") == 40
+    assert refresh.kwargs["body"] is None
+    # Small bodies are serialized but not compressed
+    assert "content-encoding" not in create.kwargs["headers"]
+    assert json.loads(create.kwargs["body"])["mappings"] == Example.get_mapping()["mappings"]
+    assert client.compressor.requests == 2
+    assert client.compressor.compressed_requests == 1
+
+
+def test_instrumentation(client):
+    hook = Mock(spec=Instrumentation)
+    metrics = MetricsAggregator()
+    client.instrumentation = [hook, metrics]
+    meta = MagicMock(status=200, headers={"content-length": "42"})
+    client.es_client.perform_request.return_value = ObjectApiResponse(
+        body={"took": 7, "errors": False, "items": []}, meta=meta
+    )
+
+    client.save([Example(a="x", b=i) for i in range(3)], create_indexes=False)
+    event = hook.before_request.call_args.args[0]
+    assert hook.after_request.call_args.args[0] is event
+    assert event.endpoint == "POST /_bulk"
+    assert event.index == "example"
+    assert event.documents == 3
+    assert event.request_bytes == len(client.es_client.perform_request.call_args.kwargs["body"])
+    assert event.response_bytes == 42
+    assert event.took == 7
+    assert event.status == 200
+    assert event.duration >= 0
+
+    error = BadRequestError(message="invalid", meta=meta, body={"error": "invalid"})
+    client.es_client.perform_request.side_effect = error
+    with pytest.raises(BadRequestError):
+        client.create_index(Example)
+    event = hook.on_error.call_args.args[0]
+    assert event.error is error
+    assert event.endpoint == "PUT /{index}"
+    assert event.index == "example"
+
+    stats = metrics.get_stats()
+    assert stats["bulk"]["documents"] == 3
+    assert stats["errors"] == {"PUT /{index}": 1}
+    assert stats["indexes"]["example"]["count"] == 2
+
+
+def test_compressor_with_http_compress():
+    with patch("pylastic.client.Elasticsearch", MagicMock()):
+        with pytest.raises(ValueError):
+            ElasticClient(
+                host="localhost", port=123, username="user", password="password",
+                compressor=GzipCompressor(), http_compress=True,
+            )
+
+        # The transport compresses bodies on its own
+        ElasticClient(host="localhost", port=123, username="user", password="password", http_compress=True)
@@ -0,0 +1,85 @@
+from pylastic.instrumentation import (
+    Instrumentation,
+    LatencyHistogram,
+    MetricsAggregator,
+    RequestEvent,
+    get_endpoint,
+    get_instrumentation,
+    get_path_index,
+)
+from pylastic.request_template import RequestTemplate
+
+
+def get_event(path="/_bulk", duration=0.01, index=None, documents=None, error=None) -> RequestEvent:
+    return RequestEvent(
+        template=RequestTemplate(path=path),
+        method="POST",
+        path=path,
+        endpoint=get_endpoint("POST", path),
+        index=index or get_path_index(path),
+        documents=documents,
+        request_bytes=100,
+        response_bytes=10,
+        duration=duration,
+        error=error,
+    )
+
+
+def test_get_endpoint():
+    assert get_endpoint("post", "/_bulk") == "POST /_bulk"
+    assert get_endpoint("PUT", "/events-2023.01.31/_doc/1") == "PUT /{index}/_doc/{id}"
+    assert get_endpoint("PUT", "/events") == "PUT /{index}"
+    assert get_endpoint("PUT", "/_index_template/logs?create=true") == "PUT /_index_template/{id}"
+
+
+def test_get_path_index():
+    assert get_path_index("/a,b/_refresh") == "a,b"
+    assert get_path_index("/_bulk") is None
+    assert get_path_index("/") is None
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+
+    for milliseconds in [0.5, 3, 3, 4, 150, 100_000]:
+        histogram.add(milliseconds)
+
+    assert histogram.count == 6
+    assert histogram.percentile(0) == 1
+    assert histogram.percentile(50) == 5
+    assert histogram.percentile(80) == 200
+    assert histogram.percentile(100) == 100_000
+    stats = histogram.to_dict()
+    assert stats["min"] == 0.5 and stats["max"] == 100_000
+    assert stats["buckets"]["5"] == 3 and stats["buckets"]["inf"] == 1
+
+
+def test_metrics_aggregator():
+    metrics = MetricsAggregator()
+    metrics.after_request(get_event(index="logs", documents=50, duration=0.5))
+    metrics.after_request(get_event(index="logs", documents=50, duration=0.5))
+    metrics.after_request(get_event(path="/logs/_refresh"))
+    metrics.on_error(get_event(index="logs", documents=50, error=RuntimeError()))
+
+    stats = metrics.get_stats()
+    assert stats["endpoints"]["POST /_bulk"]["count"] == 3
+    assert stats["endpoints"]["POST /{index}/_refresh"]["count"] == 1
+    assert stats["indexes"]["logs"]["count"] == 4
+    assert stats["errors"] == {"POST /_bulk": 1}
+    assert stats["request_bytes"] == 400
+    assert stats["bulk"]["requests"] == 2
+    assert stats["bulk"]["documents"] == 100
+    assert stats["bulk"]["time"] == 1.0
+    assert stats["bulk"]["documents_per_second"] > 0
+
+    metrics.reset()
+    assert metrics.get_stats()["endpoints"] == {}
+    assert metrics.documents_per_second is None
+
+
+def test_get_instrumentation():
+    hook = Instrumentation()
+    assert get_instrumentation(None) == []
+    assert get_instrumentation(hook) == [hook]
+    assert get_instrumentation((hook, hook)) == [hook, hook]
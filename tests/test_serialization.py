@@ -0,0 +1,109 @@
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from pylastic.bulk import BulkEncoder
+from pylastic.indexes import ElasticIndex
+from pylastic.serialization import (
+    JSONSerializer,
+    get_serializer,
+    get_transport_serializers,
+)
+from pylastic.types import Date, GeoPoint
+
+Location = namedtuple("Location", ["lat", "lon"])
+
+
+class Point:
+    __geo_interface__ = {"type": "Point", "coordinates": [1.0, 2.0]}
+
+
+def _serializers():
+    serializers = [JSONSerializer()]
+    try:
+        serializers.append(get_serializer("orjson"))
+    except RuntimeError:
+        pass
+    return serializers
+
+
+@pytest.mark.parametrize("serializer", _serializers(), ids=lambda s: s.name)
+def test_dumps(serializer):
+    timestamp = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    assert serializer.loads(
+        serializer.dumps(
+            {
+                "datetime": timestamp,
+                "date": date(2023, 1, 1),
+                "decimal": Decimal("1.5"),
+                "location": Location(lat=1, lon=2),
+                "point": Point(),
+                "text": "ü",
+            }
+        )
+    ) == {
+        "datetime": 1672531200000,
+        "date": Date.get_valid_object(date(2023, 1, 1)),
+        "decimal": 1.5,
+        "location": [1, 2],
+        "point": {"type": "Point", "coordinates": [1.0, 2.0]},
+        "text": "ü",
+    }
+
+
+@pytest.mark.parametrize("serializer", _serializers(), ids=lambda s: s.name)
+def test_lat_lon_object(serializer):
+    class LatLon:
+        lat, lon = 1, 2
+
+    assert serializer.loads(serializer.dumps([LatLon()])) == [{"lat": 1, "lon": 2}]
+
+
+@pytest.mark.parametrize("serializer", _serializers(), ids=lambda s: s.name)
+def test_unsupported(serializer):
+    with pytest.raises(TypeError):
+        serializer.dumps({"a": object()})
+
+
+@pytest.mark.parametrize("serializer", _serializers(), ids=lambda s: s.name)
+def test_numpy(serializer):
+    numpy = pytest.importorskip("numpy")
+    assert serializer.loads(
+        serializer.dumps({"a": numpy.int64(3), "b": numpy.array([1.5, 2.5])})
+    ) == {"a": 3, "b": [1.5, 2.5]}
+
+
+def test_get_serializer():
+    assert get_serializer("json").name == "json"
+    serializer = JSONSerializer()
+    assert get_serializer(serializer) is serializer
+
+    with pytest.raises(ValueError):
+        get_serializer("unknown")
+
+
+def test_bulk_encoder_dates():
+    class Event(ElasticIndex):
+        timestamp: Date
+        location: GeoPoint
+
+        class Meta:
+            index = "events"
+
+    timestamp = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    encoded = BulkEncoder(serializer="json").encode(
+        Event(timestamp=timestamp, location=Location(lat=1, lon=2))
+    )
+    assert encoded.endswith(b'{"timestamp":1672531200000,"location":[1,2]}\n')
+
+
+def test_transport_serializers():
+    serializers = get_transport_serializers(JSONSerializer())
+    date_ = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    assert serializers["application/json"].dumps({"d": date_}) == b'{"d":1672531200000}'
+    assert serializers["application/json"].loads(b"") is None
+    assert serializers["application/x-ndjson"].dumps([{"a": 1}, {"b": 2}]) == (
+        b'{"a":1}\n{"b":2}\n'
+    )
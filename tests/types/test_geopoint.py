@@ -64,3 +64,12 @@ def test_lonlat_list():
 def test_latlon_string():
     assert GeoPoint.is_valid_value("45.34, 124.43") is True
     assert GeoPoint.is_valid_value("145.34, 14.43", raise_exception=False) is False
+
+
+def test_zero_coordinates():
+    # Points on the equator or the prime meridian used to be rejected as missing coordinates
+    assert GeoPoint.is_valid_value({"lat": 0, "lon": 0}, raise_exception=False) is True
+    assert GeoPoint.is_valid_value({"lat": 0.0, "lon": 12.5}, raise_exception=False) is True
+    assert GeoPoint.is_valid_value([0, 51.48], raise_exception=False) is True
+    assert GeoPoint.is_valid_value("0,0", raise_exception=False) is True
+    assert GeoPoint.is_valid_value({"lat": 0}, raise_exception=False) is False
@@ -0,0 +1,34 @@
+import pytest
+
+from pylastic.types import Long
+from pylastic.types.long import LONG_MAX, LONG_MIN
+
+
+def test_valid_values():
+    assert Long.get_valid_object(42) == 42
+    assert Long.get_valid_object(LONG_MIN) == LONG_MIN
+    assert Long.get_valid_object(LONG_MAX) == LONG_MAX
+    # Coerced like ES does
+    assert Long.get_valid_object(1.9) == 1
+    assert Long.get_valid_object("-12") == -12
+
+
+@pytest.mark.parametrize(
+    "value", [True, False, "x", "1.5", None, [1], {"a": 1}, float("nan"), float("inf"), LONG_MAX + 1, LONG_MIN - 1]
+)
+def test_invalid_values(value):
+    # Any value used to be accepted
+    assert Long.is_valid_value(value, raise_exception=False) is False
+    with pytest.raises(ValueError):
+        Long.is_valid_value(value)
+
+
+def test_numpy_scalars():
+    numpy = pytest.importorskip("numpy")
+
+    assert Long.get_valid_object(numpy.int64(5)) == 5
+    assert type(Long.get_valid_object(numpy.uint32(5))) is int
+    assert Long.get_valid_object(numpy.float32(2.5)) == 2
+    assert Long.get_valid_object(numpy.uint64(LONG_MAX + 1)) is None
+    assert Long.get_valid_object(numpy.float64("nan")) is None
+    assert Long.get_valid_object(numpy.bool_(True)) is None
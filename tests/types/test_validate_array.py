@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from pylastic.types import Date, GeoPoint, Keyword, Long
+
+
+def test_base_validate_array():
+    assert Keyword.validate_array(["a", None]) == ([True, False], ["a", None])
+
+
+def test_date_validate_array():
+    now = datetime.now(tz=timezone.utc)
+    values = [now, 1234567, 1234567.634, "1234567", "1.5", None]
+    mask, normalized = Date.validate_array(values)
+
+    assert mask == [True, True, True, True, False, False]
+    assert normalized == [Date.get_valid_object(v) for v in values]
+
+
+def test_long_validate_array():
+    values = [1, 2**63, -(2**63), 1.9, float("nan"), "12", "x", True]
+    mask, normalized = Long.validate_array(values)
+
+    assert mask == [True, False, True, True, False, True, False, False]
+    assert normalized[:4] == [1, None, -(2**63), 1]
+    assert mask == [Long.is_valid_value(v, raise_exception=False) for v in values]
+
+
+def test_geopoint_validate_array():
+    values = [
+        {"lat": 0, "lon": 0},
+        [124.35, 45.34],
+        [24.35, 145.34],
+        "45.34, 124.43",
+        "POINT (-71.34 )",
+        {"lat": 14.3535},
+    ]
+    mask, normalized = GeoPoint.validate_array(values)
+
+    assert mask == [True, True, False, True, False, False]
+    assert mask == [GeoPoint.is_valid_value(v, raise_exception=False) for v in values]
+    assert normalized[1] is values[1]
+    assert normalized[2] is None
+
+
+def test_numpy_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    mask, normalized = Date.validate_array(
+        numpy.array(["2023-01-01T00:00:00", "NaT"], dtype="datetime64[s]")
+    )
+    assert mask.tolist() == [True, False]
+    assert normalized[0] == 1672531200000
+
+    mask, normalized = Long.validate_array(numpy.array([1.5, numpy.inf, 1e19]))
+    assert mask.tolist() == [True, False, False]
+    assert normalized[0] == 1
+
+    mask, _ = GeoPoint.validate_array(numpy.array([[10.0, 20.0], [10.0, 95.0]]))
+    assert mask.tolist() == [True, False]
+
+
+def test_numpy_date_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    mask, normalized = Date.validate_array(numpy.array([1, 2], dtype=numpy.int32))
+    assert mask.tolist() == [True, True]
+    assert normalized.dtype == numpy.int64 and normalized.tolist() == [1, 2]
+
+    mask, normalized = Date.validate_array(numpy.array([3], dtype=numpy.uint16))
+    assert mask.tolist() == [True] and normalized.tolist() == [3]
+
+    mask, normalized = Date.validate_array(numpy.array([1.7, numpy.nan, numpy.inf]))
+    assert mask.tolist() == [True, False, False]
+    assert normalized[0] == 1
+
+    # Other dtypes go through the per-value path
+    values = numpy.array(["1234", "x"], dtype=object)
+    assert Date.validate_array(values) == ([True, False], [1234, None])
+
+
+def test_numpy_long_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    mask, normalized = Long.validate_array(numpy.array([-1, 2], dtype=numpy.int8))
+    assert mask.tolist() == [True, True]
+    assert normalized.dtype == numpy.int64
+
+    mask, normalized = Long.validate_array(numpy.array([1, 2**64 - 1], dtype=numpy.uint64))
+    assert mask.tolist() == [True, False]
+    assert normalized[0] == 1
+
+    mask, normalized = Long.validate_array(numpy.array([-(2.0**63), 2.0**63]))
+    assert mask.tolist() == [True, False]
+
+    assert Long.validate_array(numpy.array(["5", True], dtype=object)) == ([True, False], [5, None])
+
+
+def test_numpy_geopoint_arrays():
+    numpy = pytest.importorskip("numpy")
+
+    # Anything but (N, 2) is validated point by point
+    values = numpy.array([{"lat": 0, "lon": 0}, {"lat": 95, "lon": 0}], dtype=object)
+    mask, normalized = GeoPoint.validate_array(values)
+    assert mask == [True, False]
+    assert normalized[1] is None
@@ -0,0 +1,18 @@
+import pytest
+
+from pylastic.utils import arrays
+from pylastic.utils.arrays import is_numpy_array
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(arrays, "numpy", None)
+    assert is_numpy_array([1, 2]) is False
+    assert is_numpy_array(None) is False
+
+
+def test_with_numpy():
+    numpy = pytest.importorskip("numpy")
+
+    assert is_numpy_array(numpy.array([1, 2])) is True
+    assert is_numpy_array([1, 2]) is False
+    assert arrays.numpy is numpy
@@ -0,0 +1,145 @@
+from pylastic.utils import cache as cache_module
+from pylastic.utils.cache import KnownIndexes, QueryCache, split_index_names
+
+
+def test_split_index_names():
+    assert split_index_names("b, a,b") == ("a", "b")
+    assert split_index_names(["x", "y"]) == ("x", "y")
+
+
+def test_key_is_normalized():
+    a = QueryCache.get_key("search", "a,b", {"query": {"term": {"x": 1}}, "size": 10})
+    b = QueryCache.get_key("search", "b,a", {"size": 10, "query": {"term": {"x": 1}}})
+    assert a == b
+    assert a != QueryCache.get_key("count", "a,b", {"size": 10, "query": {"term": {"x": 1}}})
+
+
+def test_hits_and_misses():
+    cache = QueryCache()
+    key = cache.get_key("search", "a", {})
+    assert cache.get(key) is None
+    cache.put(key, {"hits": []})
+    assert cache.get(key) == {"hits": []}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    keys = [cache.get_key("search", "a", {"n": i}) for i in range(3)]
+    cache.put(keys[0], 0)
+    cache.put(keys[1], 1)
+    cache.get(keys[0])
+    cache.put(keys[2], 2)
+
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0
+
+
+def test_given_size():
+    cache = QueryCache(max_size=1)
+    cache.put(cache.get_key("search", "a", {}), {"hits": []}, size=2 * 1024 * 1024)
+    assert len(cache) == 0
+
+    cache.put(cache.get_key("search", "a", {}), {"hits": []}, size=100)
+    assert cache.size == 100
+
+
+def test_size_eviction():
+    cache = QueryCache(max_size=1)
+    big = "x" * (600 * 1024)
+    keys = [cache.get_key("search", "a", {"n": i}) for i in range(2)]
+    cache.put(keys[0], big)
+    cache.put(keys[1], big)
+
+    assert len(cache) == 1
+    assert cache.size <= 1024 * 1024
+    cache.put(cache.get_key("search", "a", {}), "x" * (2 * 1024 * 1024))
+    assert len(cache) == 1
+
+
+def test_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = QueryCache(ttl=10)
+    key = cache.get_key("search", "a", {})
+    cache.put(key, 1)
+    now[0] += 9
+    assert cache.get(key) == 1
+    now[0] += 2
+    assert cache.get(key) is None
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = QueryCache()
+    cache.put(cache.get_key("search", "logs-1", {}), 1)
+    cache.put(cache.get_key("search", "logs-*", {}), 2)
+    cache.put(cache.get_key("search", "logs-1,other", {}), 3)
+    cache.put(cache.get_key("search", "other", {}), 4)
+
+    assert cache.invalidate("logs-1") == 3
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_known_indexes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    known = KnownIndexes(ttl=10)
+    assert "a" not in known
+    known.add("a")
+    assert "a" in known
+    now[0] += 11
+    assert "a" not in known
+
+    known.add("a")
+    known.discard("a")
+    assert "a" not in known
+
+
+def test_known_indexes_are_pruned(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    known = KnownIndexes(ttl=10)
+    for hour in range(100):
+        known.add(f"events-{hour}")
+        now[0] += 1
+
+    # Only the names added within the last `ttl` (and since the last prune) are kept
+    assert len(known) <= 20
+    assert "events-99" in known
+
+
+def test_put_after_invalidation_is_skipped():
+    cache = QueryCache()
+    key = cache.get_key("search", "logs-*", {})
+    other = cache.get_key("search", "users", {})
+    generation = cache.generation
+
+    # A write lands while the requests are in flight
+    cache.invalidate("logs-1")
+    cache.put(key, "stale", generation=generation)
+    cache.put(other, "fresh", generation=generation)
+    assert cache.get(key) is None
+    assert cache.get(other) == "fresh"
+
+    cache.put(key, "fresh", generation=cache.generation)
+    assert cache.get(key) == "fresh"
+
+    generation = cache.generation
+    cache.clear()
+    cache.put(other, "stale", generation=generation)
+    assert cache.get(other) is None
+
+
+def test_put_with_forgotten_generation_is_skipped():
+    cache = QueryCache()
+    key = cache.get_key("search", "a", {})
+    generation = cache.generation
+    for i in range(QueryCache.MAX_INVALIDATIONS + 1):
+        cache.invalidate(f"other-{i}")
+
+    cache.put(key, "maybe stale", generation=generation)
+    assert cache.get(key) is None
@@ -0,0 +1,33 @@
+import gzip
+
+import pytest
+
+from pylastic.utils.compression import GzipCompressor
+
+
+def test_small_bodies_are_not_compressed():
+    compressor = GzipCompressor(min_size=100)
+    assert compressor.compress(b"x" * 99) is None
+    assert (compressor.requests, compressor.compressed_requests) == (1, 0)
+    assert compressor.bytes_before == compressor.bytes_after == 99
+    assert compressor.ratio == 1
+
+
+def test_compress():
+    compressor = GzipCompressor(min_size=100, level=1)
+    body = b'{"index":{"_index":"example"}}\n{"a":"x","b":1}\n' * 100
+    compressed = compressor.compress(body)
+
+    assert gzip.decompress(compressed) == body
+    assert compressor.compressed_requests == 1
+    assert compressor.bytes_before == len(body)
+    assert compressor.bytes_after == len(compressed)
+    assert compressor.ratio > 10
+
+    compressor.reset()
+    assert compressor.requests == compressor.bytes_before == 0
+
+
+def test_invalid_level():
+    with pytest.raises(ValueError):
+        GzipCompressor(level=0)
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from pylastic.utils.concurrency import BoundedExecutor
+
+
+def _track(state, lock, duration=0.01):
+    with lock:
+        state["current"] += 1
+        state["max"] = max(state["max"], state["current"])
+    time.sleep(duration)
+    with lock:
+        state["current"] -= 1
+
+
+def test_max_in_flight():
+    state, lock = {"current": 0, "max": 0}, threading.Lock()
+    with BoundedExecutor(max_workers=4, max_in_flight=2) as executor:
+        futures = [executor.submit(_track, state, lock) for _ in range(10)]
+
+    assert all(f.done() for f in futures)
+    assert state["max"] <= 2
+
+
+def test_max_in_flight_bytes():
+    state, lock = {"current": 0, "max": 0}, threading.Lock()
+    with BoundedExecutor(max_workers=4, max_in_flight_bytes=100) as executor:
+        for _ in range(10):
+            executor.submit(_track, state, lock, size=50)
+
+    assert state["max"] <= 2
+
+
+def test_oversized_task_is_accepted():
+    with BoundedExecutor(max_workers=1, max_in_flight_bytes=1) as executor:
+        assert executor.submit(lambda: 1, size=100).result() == 1
+
+
+def test_exception_is_propagated():
+    def _fail():
+        raise ValueError()
+
+    with BoundedExecutor(max_workers=2) as executor:
+        future = executor.submit(_fail)
+
+    with pytest.raises(ValueError):
+        future.result()
+
+
+def test_wait():
+    state, lock = {"current": 0, "max": 0}, threading.Lock()
+    executor = BoundedExecutor(max_workers=2)
+    futures = [executor.submit(_track, state, lock) for _ in range(4)]
+    executor.wait()
+    assert all(f.done() for f in futures)
+    executor.shutdown()
@@ -2,7 +2,7 @@ import random
 from itertools import chain
 from math import ceil
 
-from pylastic.utils.iterables import is_iterable, get_batches_with_size
+from pylastic.utils.iterables import is_iterable, get_batches_with_size, join_within_length
 from pylastic.utils.size import full_size_of
 
 
@@ -28,3 +28,16 @@ def test_get_batches_with_size():
         <= abs(len(get_batches_with_size(objects, batch_size)) - expected_batches)
         <= 1
     )
+
+
+def test_generator_is_not_consumed():
+    generator = (i for i in range(3))
+    assert is_iterable(generator) is True
+    assert list(generator) == [0, 1, 2]
+
+
+def test_join_within_length():
+    assert join_within_length(["a", "bb", "a", "ccc"], 6) == ["a,bb", "ccc"]
+    assert join_within_length(["a", "bb", "ccc"], 100) == ["a,bb,ccc"]
+    assert join_within_length(["long-name", "a"], 3) == ["long-name", "a"]
+    assert join_within_length([], 10) == []